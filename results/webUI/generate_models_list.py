@@ -5,6 +5,32 @@ import json
 from pathlib import Path
 import sys
 
+# Function to summarize one model's results for the leaderboard index
+def summarize_results(data):
+    """
+    Reduce a benchmark_results.json to what the leaderboard needs: the averages and
+    one score per question, in question order (None for questions without a result).
+
+    Args:
+        data (dict): The contents of a benchmark_results.json
+
+    Returns:
+        dict: The model's leaderboard entry
+    """
+    entries = data.get('question_scores', [])
+    total_questions = data.get('total_questions') or len(entries)
+    scores = [None] * max(total_questions, max((entry['question_index'] + 1 for entry in entries), default=0))
+    for entry in entries:
+        scores[entry['question_index']] = round(entry['score'], 4)
+    return {
+        'model': data.get('model'),
+        'average_score': data.get('average_score', 0.0),
+        'duration': data.get('duration'),
+        'total_questions': total_questions,
+        'end_timestamp': data.get('end_timestamp'),
+        'scores': scores
+    }
+
 # Function to generate the model list for the webUI
 def generate_models_list(results_dir=None, output_dir=None, verbose=True):
     """
@@ -13,7 +39,7 @@ def generate_models_list(results_dir=None, output_dir=None, verbose=True):
     Args:
         results_dir (str or Path, optional): Path to the results directory. 
                                            If None, uses the parent directory of this file.
-        output_dir (str or Path, optional): Directory to write models.json to.
+        output_dir (str or Path, optional): Directory to write models.json and leaderboard.json to.
                                           If None, uses the directory of this file.
         verbose (bool): Whether to print progress messages.
     
@@ -32,12 +58,35 @@ def generate_models_list(results_dir=None, output_dir=None, verbose=True):
     
     models = []
     
+    # Reuse the summaries of results files that have not changed since the last index
+    leaderboard_file = output_dir / 'leaderboard.json'
+    previous = {}
+    if leaderboard_file.exists():
+        try:
+            with open(leaderboard_file, 'r') as f:
+                previous = json.load(f).get('models', {})
+        except (json.JSONDecodeError, OSError):
+            previous = {}
+    leaderboard = {}
+    
     # Scan all directories in results
     for item in results_dir.iterdir():
         if item.is_dir() and item.name != 'webUI':  # Skip the webUI directory
             # Check if the directory contains benchmark_results.json
             benchmark_file = item / 'benchmark_results.json'
             if benchmark_file.exists():
+                mtime = benchmark_file.stat().st_mtime
+                entry = previous.get(item.name)
+                if entry is None or entry.get('mtime') != mtime:
+                    try:
+                        with open(benchmark_file, 'r') as f:
+                            entry = summarize_results(json.load(f))
+                    except (json.JSONDecodeError, KeyError, OSError) as e:
+                        if verbose:
+                            print(f"Warning: Could not read {benchmark_file} ({e}). Skipping.")
+                        continue
+                    entry['mtime'] = mtime
+                leaderboard[item.name] = entry
                 models.append(item.name)
     
     # Sort models alphabetically
@@ -48,6 +97,10 @@ def generate_models_list(results_dir=None, output_dir=None, verbose=True):
     with open(models_file, 'w') as f:
         json.dump({'models': models}, f, indent=2)
     
+    # Write the compact leaderboard index the webUI loads instead of every results file
+    with open(leaderboard_file, 'w') as f:
+        json.dump({'models': {model: leaderboard[model] for model in models}}, f, separators=(',', ':'))
+    
     if verbose:
         print(f"Generated models list with {len(models)} models:")
         for model in models:
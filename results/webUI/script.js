@@ -2,7 +2,25 @@
 let allModels = [];
 let currentModel = null;
 let allResults = {};
+let leaderboard = {};
 let filteredQuestions = [];
+let previewObserver = null;
+
+// Virtualized grid: only the cards of visible rows (plus a few rows around them) are in the DOM
+const GRID_OVERSCAN_ROWS = 3;
+let gridLayout = null;
+let renderedRange = null;
+let cardCache = new WeakMap();
+let gridUpdatePending = false;
+
+// Search runs in a Web Worker over an index built once per model
+const SEARCH_DEBOUNCE_MS = 200;
+let searchWorker = null;
+let searchWorkerFailed = false;
+let searchRequest = 0;
+let searchTimer = null;
+const indexedModels = new Set();
+const pendingSearches = new Map();
 
 // Initialize the application
 document.addEventListener('DOMContentLoaded', function() {
@@ -12,7 +30,6 @@ document.addEventListener('DOMContentLoaded', function() {
 async function initializeApp() {
     try {
         await loadAvailableModels();
-        await loadAllResults();
         setupEventListeners();
         
         // Load first model by default
@@ -31,31 +48,24 @@ async function initializeApp() {
 
 async function loadAvailableModels() {
     try {
-        // Load the dynamically generated models list
-        const response = await fetch('models.json');
-        if (!response.ok) {
-            throw new Error('Could not load models list');
+        // Load the precomputed leaderboard index instead of every model's full results
+        const response = await fetch('leaderboard.json');
+        if (response.ok) {
+            const data = await response.json();
+            leaderboard = data.models || {};
+        } else {
+            leaderboard = await buildLeaderboard();
         }
-        
-        const data = await response.json();
-        const modelDirs = data.models || [];
+        allModels = Object.keys(leaderboard);
         
         const modelSelect = document.getElementById('model-select');
         modelSelect.innerHTML = '';
         
-        for (const dir of modelDirs) {
-            try {
-                const response = await fetch(`../${dir}/benchmark_results.json`);
-                if (response.ok) {
-                    allModels.push(dir);
-                    const option = document.createElement('option');
-                    option.value = dir;
-                    option.textContent = formatModelName(dir);
-                    modelSelect.appendChild(option);
-                }
-            } catch (error) {
-                console.warn(`Could not load model ${dir}:`, error);
-            }
+        for (const dir of allModels) {
+            const option = document.createElement('option');
+            option.value = dir;
+            option.textContent = formatModelName(dir);
+            modelSelect.appendChild(option);
         }
         
         if (allModels.length === 0) {
@@ -67,26 +77,69 @@ async function loadAvailableModels() {
     }
 }
 
-async function loadAllResults() {
-    for (const model of allModels) {
-        try {
-            const response = await fetch(`../${model}/benchmark_results.json`);
-            if (response.ok) {
-                allResults[model] = await response.json();
-            }
-        } catch (error) {
-            console.warn(`Could not load results for ${model}:`, error);
+// Build the leaderboard from every model's results when no index has been generated
+async function buildLeaderboard() {
+    const response = await fetch('models.json');
+    if (!response.ok) {
+        throw new Error('Could not load models list');
+    }
+    
+    const data = await response.json();
+    const modelDirs = data.models || [];
+    
+    // Fetch all results at once rather than one after another
+    const results = await Promise.all(modelDirs.map(dir => loadModelResults(dir).catch(error => {
+        console.warn(`Could not load model ${dir}:`, error);
+        return null;
+    })));
+    
+    const index = {};
+    modelDirs.forEach((dir, i) => {
+        if (results[i]) {
+            index[dir] = summarizeResults(results[i]);
         }
+    });
+    return index;
+}
+
+// Reduce a model's results to its leaderboard entry (as generate_models_list.py does)
+function summarizeResults(data) {
+    const entries = data.question_scores || [];
+    const totalQuestions = data.total_questions || entries.length;
+    const scores = new Array(totalQuestions).fill(null);
+    entries.forEach(entry => {
+        scores[entry.question_index] = entry.score;
+    });
+    return {
+        model: data.model,
+        average_score: data.average_score,
+        duration: data.duration,
+        total_questions: totalQuestions,
+        end_timestamp: data.end_timestamp,
+        scores: scores
+    };
+}
+
+// Fetch a model's full results the first time they are needed
+async function loadModelResults(modelName) {
+    if (!allResults[modelName]) {
+        const response = await fetch(`../${modelName}/benchmark_results.json`);
+        if (!response.ok) {
+            throw new Error(`Could not load results for ${modelName}`);
+        }
+        allResults[modelName] = await response.json();
     }
+    return allResults[modelName];
 }
 
 async function loadModelData(modelName) {
     try {
         currentModel = modelName;
-        const data = allResults[modelName];
+        const data = await loadModelResults(modelName);
         
-        if (!data) {
-            throw new Error(`No data found for model: ${modelName}`);
+        // Another model may have been selected while these results were loading
+        if (currentModel !== modelName) {
+            return;
         }
         
         updateOverview(data);
@@ -115,9 +168,10 @@ function setupEventListeners() {
         showDetailed();
     });
     
-    // Search and filter
+    // Search and filter (search waits until typing pauses)
     document.getElementById('search-input').addEventListener('input', function(e) {
-        applyFilters();
+        clearTimeout(searchTimer);
+        searchTimer = setTimeout(applyFilters, SEARCH_DEBOUNCE_MS);
     });
     
     document.getElementById('score-filter').addEventListener('change', function(e) {
@@ -129,6 +183,13 @@ function setupEventListeners() {
         closeModal();
     });
     
+    // Grid virtualization
+    window.addEventListener('scroll', scheduleGridUpdate, { passive: true });
+    window.addEventListener('resize', function() {
+        gridLayout = null;
+        scheduleGridUpdate();
+    });
+    
     window.addEventListener('click', function(e) {
         const modal = document.getElementById('question-modal');
         if (e.target === modal) {
@@ -150,6 +211,7 @@ function updateOverview(data) {
 }
 
 function updateDetailedView(data) {
+    indexQuestions(currentModel, data.question_scores);
     filteredQuestions = data.question_scores;
     renderQuestions();
 }
@@ -209,12 +271,12 @@ function updateScoreChart(scores) {
 function updateModelComparison() {
     const chart = document.getElementById('comparison-chart');
     
-    if (Object.keys(allResults).length < 2) {
+    if (Object.keys(leaderboard).length < 2) {
         chart.innerHTML = '<p style="text-align: center; color: #666; font-style: italic;">Load multiple models to see comparison</p>';
         return;
     }
     
-    const comparison = Object.entries(allResults).map(([modelKey, data]) => ({
+    const comparison = Object.entries(leaderboard).map(([modelKey, data]) => ({
         modelKey: modelKey,
         model: formatModelName(modelKey),
         score: data.average_score,
@@ -267,13 +329,75 @@ function updatePerformanceTimeChart() {
 }
 
 function renderQuestions() {
+    // Cards are created as their rows scroll into view (see updateVisibleCards)
+    renderedRange = null;
+    updateVisibleCards();
+}
+
+function scheduleGridUpdate() {
+    if (!gridUpdatePending) {
+        gridUpdatePending = true;
+        requestAnimationFrame(() => {
+            gridUpdatePending = false;
+            updateVisibleCards();
+        });
+    }
+}
+
+// Measure the number of columns and the height of a row (cards have a fixed height)
+function measureGrid(grid) {
+    const style = getComputedStyle(grid);
+    grid.style.paddingTop = '0px';
+    grid.replaceChildren(getQuestionCard(filteredQuestions[0], 0));
+    return {
+        columns: Math.max(1, style.gridTemplateColumns.split(' ').length),
+        rowHeight: grid.firstElementChild.offsetHeight + (parseFloat(style.rowGap) || 0)
+    };
+}
+
+// Render the cards of the rows in and near the viewport, padding the grid to the height of the rest
+function updateVisibleCards() {
     const grid = document.getElementById('questions-grid');
-    grid.innerHTML = '';
-    
-    filteredQuestions.forEach((question, index) => {
-        const card = createQuestionCard(question, index);
-        grid.appendChild(card);
-    });
+    if (filteredQuestions.length === 0) {
+        grid.replaceChildren();
+        grid.style.paddingTop = grid.style.paddingBottom = '0px';
+        renderedRange = null;
+        return;
+    }
+    // The grid cannot be measured while the detailed view is hidden
+    if (grid.offsetParent === null) {
+        return;
+    }
+    if (!gridLayout) {
+        gridLayout = measureGrid(grid);
+        renderedRange = null;
+    }
+    const { columns, rowHeight } = gridLayout;
+    const rows = Math.ceil(filteredQuestions.length / columns);
+    const gridTop = grid.getBoundingClientRect().top + window.scrollY;
+    const firstRow = Math.max(0, Math.floor((window.scrollY - gridTop) / rowHeight) - GRID_OVERSCAN_ROWS);
+    const lastRow = Math.min(rows, Math.ceil((window.scrollY + window.innerHeight - gridTop) / rowHeight) + GRID_OVERSCAN_ROWS);
+    if (renderedRange && renderedRange.firstRow === firstRow && renderedRange.lastRow === lastRow) {
+        return;
+    }
+    renderedRange = { firstRow, lastRow };
+    grid.style.paddingTop = `${firstRow * rowHeight}px`;
+    grid.style.paddingBottom = `${(rows - lastRow) * rowHeight}px`;
+    const fragment = document.createDocumentFragment();
+    for (let index = firstRow * columns; index < Math.min(lastRow * columns, filteredQuestions.length); index++) {
+        fragment.appendChild(getQuestionCard(filteredQuestions[index], index));
+    }
+    grid.replaceChildren(fragment);
+}
+
+// Reuse a question's card (and its loaded preview) when it scrolls back into view or survives a filter
+function getQuestionCard(question, index) {
+    let card = cardCache.get(question);
+    if (!card) {
+        card = createQuestionCard(question, index);
+        cardCache.set(question, card);
+    }
+    return card;
 }
 
 function createQuestionCard(question, index) {
@@ -289,34 +413,49 @@ function createQuestionCard(question, index) {
             <span class="question-score ${scoreClass}">${(question.score * 100).toFixed(1)}%</span>
         </div>
         <div class="question-prompt">${question.prompt}</div>
-        <div class="question-preview" id="preview-${index}">
+        <div class="question-preview">
             <span style="color: #999;">Loading preview...</span>
         </div>
     `;
     
-    // Load SVG preview
-    loadSVGPreview(question.question_index, index);
+    // Load the preview once the card is near the viewport
+    if (!previewObserver) {
+        previewObserver = new IntersectionObserver(entries => {
+            entries.forEach(entry => {
+                if (entry.isIntersecting) {
+                    previewObserver.unobserve(entry.target);
+                    loadPreview(entry.target);
+                }
+            });
+        }, { rootMargin: '200px' });
+    }
+    const previewElement = card.querySelector('.question-preview');
+    previewElement.dataset.artifact = `../${currentModel}/${artifactName(question)}`;
+    previewObserver.observe(previewElement);
     
     return card;
 }
 
-async function loadSVGPreview(questionIndex, cardIndex) {
-    try {
-        const response = await fetch(`../${currentModel}/question_${questionIndex}.svg`);
-        if (response.ok) {
-            const svgContent = await response.text();
-            const previewElement = document.getElementById(`preview-${cardIndex}`);
-            if (previewElement) {
-                previewElement.innerHTML = svgContent;
-            }
-        }
-    } catch (error) {
-        console.warn(`Could not load SVG preview for question ${questionIndex}:`, error);
-        const previewElement = document.getElementById(`preview-${cardIndex}`);
-        if (previewElement) {
+// Artifacts are named by question ID (results from older runs by question index)
+function artifactName(question) {
+    return `question_${question.question_id ?? question.question_index}`;
+}
+
+// Show a card's thumbnail, falling back to the full-size render for results without thumbnails
+function loadPreview(previewElement) {
+    const artifact = previewElement.dataset.artifact;
+    const image = document.createElement('img');
+    image.alt = 'Preview';
+    image.decoding = 'async';
+    image.onload = () => previewElement.replaceChildren(image);
+    image.onerror = () => {
+        if (image.src.endsWith('.thumb.webp')) {
+            image.src = `${artifact}.png`;
+        } else {
             previewElement.innerHTML = '<span style="color: #999;">Preview not available</span>';
         }
-    }
+    };
+    image.src = `${artifact}.thumb.webp`;
 }
 
 async function openQuestionModal(question, index) {
@@ -343,7 +482,7 @@ async function openQuestionModal(question, index) {
     svgPreview.innerHTML = '<span style="color: #999;">Loading SVG...</span>';
     
     try {
-        const response = await fetch(`../${currentModel}/question_${question.question_index}.svg`);
+        const response = await fetch(`../${currentModel}/${artifactName(question)}.svg`);
         if (response.ok) {
             const svgContent = await response.text();
             svgPreview.innerHTML = svgContent;
@@ -362,19 +501,77 @@ function closeModal() {
     document.getElementById('question-modal').style.display = 'none';
 }
 
-function applyFilters() {
+// Send a model's questions to the search worker (once per model)
+function indexQuestions(modelName, questions) {
+    const worker = getSearchWorker();
+    if (worker && !indexedModels.has(modelName)) {
+        indexedModels.add(modelName);
+        worker.postMessage({
+            type: 'index',
+            model: modelName,
+            questions: questions.map(q => ({ prompt: q.prompt, requirements: q.requirements }))
+        });
+    }
+}
+
+function getSearchWorker() {
+    if (!searchWorker && !searchWorkerFailed && window.Worker) {
+        try {
+            searchWorker = new Worker('search-worker.js');
+            searchWorker.onmessage = function(e) {
+                const resolve = pendingSearches.get(e.data.id);
+                pendingSearches.delete(e.data.id);
+                if (resolve) {
+                    resolve(new Set(e.data.matches));
+                }
+            };
+        } catch (error) {
+            // Workers are unavailable (e.g. the page was opened from a file): search on the main thread
+            console.warn('Could not start the search worker:', error);
+            searchWorkerFailed = true;
+        }
+    }
+    return searchWorker;
+}
+
+// Find the positions of the questions matching a search term
+function searchQuestions(modelName, questions, searchTerm) {
+    const worker = getSearchWorker();
+    if (!worker) {
+        const matches = new Set();
+        questions.forEach((question, position) => {
+            if (question.prompt.toLowerCase().includes(searchTerm) ||
+                question.requirements.some(req => req.toLowerCase().includes(searchTerm))) {
+                matches.add(position);
+            }
+        });
+        return Promise.resolve(matches);
+    }
+    const id = searchRequest;
+    return new Promise(resolve => {
+        pendingSearches.set(id, resolve);
+        worker.postMessage({ type: 'search', id, model: modelName, term: searchTerm });
+    });
+}
+
+async function applyFilters() {
     if (!currentModel || !allResults[currentModel]) return;
     
-    const searchTerm = document.getElementById('search-input').value.toLowerCase();
+    const modelName = currentModel;
+    const request = ++searchRequest;
+    const searchTerm = document.getElementById('search-input').value.trim().toLowerCase();
     const scoreFilter = document.getElementById('score-filter').value;
     
     const allQuestions = allResults[currentModel].question_scores;
     
-    filteredQuestions = allQuestions.filter(question => {
-        // Search filter
-        const matchesSearch = searchTerm === '' || 
-            question.prompt.toLowerCase().includes(searchTerm) ||
-            question.requirements.some(req => req.toLowerCase().includes(searchTerm));
+    // Search filter
+    const matches = searchTerm === '' ? null : await searchQuestions(modelName, allQuestions, searchTerm);
+    
+    // Ignore results overtaken by a newer search or another model
+    if (request !== searchRequest || modelName !== currentModel) return;
+    
+    filteredQuestions = allQuestions.filter((question, position) => {
+        const matchesSearch = matches === null || matches.has(position);
         
         // Score filter
         let matchesScore = true;
@@ -404,6 +601,10 @@ function showDetailed() {
     document.getElementById('detailed-btn').classList.add('active');
     document.getElementById('overview-section').style.display = 'none';
     document.getElementById('detailed-section').style.display = 'block';
+    
+    // The grid is laid out once it is visible
+    gridLayout = null;
+    updateVisibleCards();
 }
 
 function getScoreClass(score) {
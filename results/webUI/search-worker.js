@@ -0,0 +1,60 @@
+// Search index for the question grid, built and queried off the main thread.
+// Messages:
+//   { type: 'index', model, questions: [{ prompt, requirements }] }  builds a model's index
+//   { type: 'search', id, model, term }  replies { id, matches: [question positions] }
+
+// Indexes by model: { tokens: Map(token -> positions), texts: [lowercased text] }
+const indexes = new Map();
+
+function tokenize(text) {
+    return text.toLowerCase().split(/[^\p{L}\p{N}]+/u).filter(Boolean);
+}
+
+function buildIndex(questions) {
+    const tokens = new Map();
+    const texts = questions.map((question, position) => {
+        const text = [question.prompt, ...question.requirements].join('\n').toLowerCase();
+        for (const token of new Set(tokenize(text))) {
+            if (!tokens.has(token)) {
+                tokens.set(token, []);
+            }
+            tokens.get(token).push(position);
+        }
+        return text;
+    });
+    return { tokens, texts };
+}
+
+function search(index, term) {
+    const queryTokens = tokenize(term);
+    if (queryTokens.length === 0) {
+        // Punctuation only: match it literally
+        const needle = term.toLowerCase();
+        return index.texts.flatMap((text, position) => text.includes(needle) ? [position] : []);
+    }
+    // A question matches if every query token appears within one of its words
+    let matches = null;
+    for (const queryToken of queryTokens) {
+        const positions = new Set();
+        for (const [token, tokenPositions] of index.tokens) {
+            if (token.includes(queryToken)) {
+                tokenPositions.forEach(position => positions.add(position));
+            }
+        }
+        matches = matches === null ? positions : new Set([...matches].filter(position => positions.has(position)));
+        if (matches.size === 0) {
+            break;
+        }
+    }
+    return [...matches].sort((a, b) => a - b);
+}
+
+self.onmessage = function(e) {
+    const message = e.data;
+    if (message.type === 'index') {
+        indexes.set(message.model, buildIndex(message.questions));
+    } else if (message.type === 'search') {
+        const index = indexes.get(message.model);
+        self.postMessage({ id: message.id, matches: index ? search(index, message.term) : [] });
+    }
+};
@@ -1,15 +1,77 @@
+import asyncio
 import json
+import math
 import os
 import sys
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 import time
 from tqdm import tqdm
 
 # Import the LLM and SVGRenderer classes
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from utils.llm import LLM
+from utils.llm import LLM, AsyncLLM
 from utils.svg_renderer import SVGRenderer
+from utils.content_cache import ContentCache
+from utils.rate_limit import RateLimiter
+from utils.svg_stream import SVGStreamExtractor
+from utils.svg_document import SVGDocument
+from utils.svg_validation import SVGValidator, SVGValidationError
+from utils.image_upload import ImagePreparer
+from utils.artifact_store import ArtifactStore, STORE_FILENAME
+from benchmark.journal import ResultsJournal
+from benchmark.questions import question_id
+from benchmark.pipeline import BenchmarkPipeline, PipelineJob, MAX_ATTEMPTS, init_render_worker, render_svg_in_worker
+
+# JSON schema for the evaluator's structured response
+EVALUATION_SCHEMA = {
+    "$schema": "https://json-schema.org/draft/2020-12/schema",
+    "type": "object",
+    "properties": {
+        "number_of_fulfilled_requirements": {
+        "type": "number",
+        "minimum": 0,
+        "description": "The count of requirements that have been fulfilled"
+        }
+    },
+    "required": ["number_of_fulfilled_requirements"],
+    "additionalProperties": False
+}
+
+# JSON schema for the evaluator's structured response when grading several images at once
+BATCH_EVALUATION_SCHEMA = {
+    "$schema": "https://json-schema.org/draft/2020-12/schema",
+    "type": "object",
+    "properties": {
+        "results": {
+            "type": "array",
+            "description": "One entry per image, in image order",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "image_number": {
+                        "type": "integer",
+                        "minimum": 1,
+                        "description": "The number of the image being graded"
+                    },
+                    "number_of_fulfilled_requirements": {
+                        "type": "number",
+                        "minimum": 0,
+                        "description": "The count of that image's requirements that have been fulfilled"
+                    }
+                },
+                "required": ["image_number", "number_of_fulfilled_requirements"],
+                "additionalProperties": False
+            }
+        }
+    },
+    "required": ["results"],
+    "additionalProperties": False
+}
+
+# Ways of storing each question's SVG and render in the results directory
+ARTIFACT_STORES = ("files", "packed")
 
 # Class to run a benchmark
 class Benchmark:
@@ -24,7 +86,17 @@ class Benchmark:
             open_router_endpoint: str="https://openrouter.ai/api/v1",
             reasoning_effort: str=None,
             reasoning_max_tokens: int=None,
-            max_output_tokens: int=None
+            max_output_tokens: int=None,
+            judge_model: str="google/gemini-2.5-flash",
+            judge_endpoint: str=None,
+            judge_api_key: str=None,
+            judge_concurrency: int=None,
+            cache: ContentCache=None,
+            stream: bool=False,
+            results_root: str="results",
+            validator: SVGValidator=None,
+            image_preparer: ImagePreparer=None,
+            artifact_store: str="files"
     ):
         # Initialize the LLM
         self.llm = LLM(
@@ -41,6 +113,50 @@ class Benchmark:
             self.open_router_api_key = api_key
         # Store the OpenRouter endpoint
         self.open_router_endpoint = open_router_endpoint
+        # Initialize the evaluator once, shared by every worker thread (and every
+        # Benchmark in the process using the same judge model, endpoint and key)
+        self.judge_model = judge_model
+        self.judge_endpoint = judge_endpoint or self.open_router_endpoint
+        self.judge_api_key = judge_api_key or self.open_router_api_key
+        self.judge_concurrency = judge_concurrency
+        self.evaluator_llm = LLM.get_shared(
+            model=self.judge_model,
+            endpoint=self.judge_endpoint,
+            api_key=self.judge_api_key,
+            max_concurrency=self.judge_concurrency
+        )
+        # Cache generations, renders and verdicts by content (disabled if no cache is given)
+        self.cache = cache or ContentCache(cache_dir=None)
+        self.cache_stats = {layer: {"hits": 0, "misses": 0} for layer in ContentCache.LAYERS}
+        self._cache_lock = threading.Lock()
+        # Directory holding every model's results directory
+        self.results_root = results_root
+        # Stream generations and stop reading once the SVG is complete
+        self.stream = stream
+        # Limits checked before rendering (rejected SVGs score 0 without a render or judge call)
+        self.validator = validator or SVGValidator()
+        # Downscales and re-encodes rendered images before they are sent to the judge
+        self.image_preparer = image_preparer or ImagePreparer()
+        # Per-question generation statistics, added to each question's entry when it is recorded
+        self.question_stats = {}
+        self._stats_lock = threading.Lock()
+        # Question IDs of the current run by question index (see _start_run)
+        self._question_ids = {}
+        # Write SVGs and renders as loose files, or packed into one SQLite file per model
+        if artifact_store not in ARTIFACT_STORES:
+            raise ValueError(f"Unknown artifact store '{artifact_store}'. Available stores: {', '.join(ARTIFACT_STORES)}")
+        self.artifact_store = artifact_store
+        self._store = None
+
+    # Property with this model's results directory
+    @property
+    def results_dir(self) -> str:
+        return os.path.join(self.results_root, self.llm.model.replace('/', '-'))
+
+    # Property with the file holding this model's scores from its judge model (see rejudge.py)
+    @property
+    def judge_scores_path(self) -> str:
+        return os.path.join(self.results_dir, f"judge_scores_{self.judge_model.replace('/', '-')}.json")
 
     # Function to load cached results from a previous benchmark run
     def _load_cached_results(self, results_dir: str) -> dict:
@@ -58,51 +174,111 @@ class Benchmark:
             print(f"Warning: Could not load cached results ({e}). Starting fresh.")
         return None
 
-    # Function to get the set of successfully completed question indices from cached results
-    def _get_completed_indices(self, cached_results: dict) -> set:
-        """Return the set of question indices that completed successfully (have a score and no error)."""
+    # Function to get the ID of a results entry (entries from before IDs were recorded are hashed from their content)
+    @staticmethod
+    def _entry_id(entry: dict) -> str:
+        return entry.get("question_id") or question_id(entry)
+
+    # Function to get the set of successfully completed question IDs from cached results
+    def _get_completed_ids(self, cached_results: dict) -> set:
+        """Return the set of question IDs that completed successfully (have a score and no error)."""
         completed = set()
         for entry in cached_results.get("question_scores", []):
-            # Consider a question completed if it has a score > 0 and no error
+            # Consider a question completed if it has a score and no error
             # Questions that errored out (score 0 with error key) will be retried
             if "error" not in entry:
-                completed.add(entry["question_index"])
+                completed.add(self._entry_id(entry))
         return completed
 
-    # Function to run a benchmark
-    def run(
-            self,
-            run_full_benchmark: bool = True,
-            max_workers: int = 25
-    ):
-        # Load questions JSON
+    # Function to get the file name of a question's artifact (e.g. its .svg or .png)
+    def _artifact_name(self, index: int, extension: str) -> str:
+        # Artifacts are named by question ID; the index is only used outside a run
+        return f"question_{self._question_ids.get(index, index)}.{extension}"
+
+    # Function to get the path of a question's artifact in the results directory
+    def _artifact_path(self, index: int, extension: str) -> str:
+        return os.path.join(self.results_dir, self._artifact_name(index, extension))
+
+    # Property with this model's packed artifact store
+    @property
+    def store(self) -> ArtifactStore:
+        if self._store is None:
+            self._store = ArtifactStore(os.path.join(self.results_dir, STORE_FILENAME))
+        return self._store
+
+    # Function to checkpoint and close the packed store once the run no longer writes to it
+    def close_store(self):
+        if self._store is not None:
+            self._store.close()
+
+    # Function to read a question's artifact from a loose file or, failing that, the packed store
+    def _read_artifact(self, index: int, extension: str) -> bytes:
+        path = self._artifact_path(index, extension)
+        if os.path.exists(path):
+            with open(path, "rb") as file:
+                return file.read()
+        data = None
+        if os.path.exists(self.store.path):
+            data = self.store.get(self._artifact_name(index, extension))
+        if data is None:
+            raise FileNotFoundError(f"No {extension} artifact for question {index} in {self.results_dir}")
+        return data
+
+    # Function to load the benchmark questions
+    def _load_questions(self, run_full_benchmark: bool) -> list:
         script_dir = os.path.dirname(os.path.abspath(__file__))
         project_root = os.path.join(script_dir, '..', '..')
         json_filename = "questions.json" if run_full_benchmark else "test_questions.json"
         json_path = os.path.join(project_root, "questions", json_filename)
         with open(json_path, "r") as file:
-            questions = json.load(file)
+            return json.load(file)
+
+    # Function to set up results tracking for a run, resuming from cached results
+    def _start_run(self, questions: list, start_time: datetime) -> tuple:
+        """Return (results, questions_to_run) where questions_to_run is a list of (index, question)."""
         # Create results directory
-        results_dir = f"results/{self.llm.model.replace('/', '-')}"
+        results_dir = self.results_dir
         os.makedirs(results_dir, exist_ok=True)
+        # Key questions by content, so adding or reordering questions only runs the new ones
+        self._question_ids = {index: question_id(question) for index, question in enumerate(questions)}
+        positions = {qid: index for index, qid in self._question_ids.items()}
         # Check for cached results from a previous run
         cached_results = self._load_cached_results(results_dir)
-        cached_scores = {}  # Map of question_index -> score entry
+        # Replay questions journaled by an interrupted run on top of the last summary
+        self.journal = ResultsJournal(results_dir)
+        journal_entries = self.journal.replay()
+        if journal_entries:
+            if cached_results is None:
+                cached_results = {"model": self.llm.model, "question_scores": []}
+            entries_by_id = {self._entry_id(entry): entry for entry in cached_results["question_scores"]}
+            for entry in journal_entries:
+                entries_by_id[self._entry_id(entry)] = entry
+            cached_results["question_scores"] = list(entries_by_id.values())
+            print(f"Replayed {len(journal_entries)} journaled results for {self.llm.model}.")
+        cached_scores = {}  # Map of question_id -> score entry
         if cached_results is not None:
-            completed_indices = self._get_completed_indices(cached_results)
-            # Build a lookup of cached scores by question index
+            completed_ids = self._get_completed_ids(cached_results)
+            legacy = 0
+            # Build a lookup of cached scores by question ID, dropping questions no longer in the question list
             for entry in cached_results.get("question_scores", []):
-                if entry["question_index"] in completed_indices:
-                    cached_scores[entry["question_index"]] = entry
+                qid = self._entry_id(entry)
+                if qid in completed_ids and qid in positions:
+                    legacy += "question_id" not in entry
+                    entry["question_id"] = qid
+                    entry["question_index"] = positions[qid]
+                    cached_scores[qid] = entry
+            if legacy:
+                print(f"Warning: {legacy} cached results for {self.llm.model} have no question ID; run src/migrate_results.py to rename their images and SVGs.")
             if cached_scores:
                 print(f"Resuming benchmark for {self.llm.model}: {len(cached_scores)}/{len(questions)} questions already completed.")
         # Determine which questions still need to be run
         questions_to_run = [
             (index, question) for index, question in enumerate(questions)
-            if index not in cached_scores
+            if self._question_ids[index] not in cached_scores
         ]
-        # Record start time
-        start_time = datetime.now()
+        # Reset the cache counters for this run
+        with self._cache_lock:
+            self.cache_stats = {layer: {"hits": 0, "misses": 0} for layer in ContentCache.LAYERS}
         # Initialize results tracking
         results = {
             "model": self.llm.model,
@@ -113,52 +289,40 @@ class Benchmark:
         }
         # Add cached scores to results
         results["question_scores"].extend(cached_scores.values())
-        # Only run remaining questions if there are any
-        if questions_to_run:
-            # Initialize progress bar for remaining questions
-            progress_bar = tqdm(
-                total=len(questions_to_run), 
-                desc=f"Running benchmark for {self.llm.model}", 
-                unit="question",
-                ncols=100
-            )
-            # Run questions in parallel with max workers
-            with ThreadPoolExecutor(
-                max_workers=max_workers
-            ) as executor:
-                # Submit only the remaining questions to the executor
-                future_to_question = {
-                    executor.submit(self._run_question_with_retry, question, index): (question, index)
-                    for index, question in questions_to_run
-                }
-                # Process completed futures
-                for future in as_completed(future_to_question):
-                    question, index = future_to_question[future]
-                    try:
-                        score = future.result()
-                        results["question_scores"].append({
-                            "question_index": index,
-                            "prompt": question["prompt"],
-                            "requirements": question["requirements"],
-                            "score": score
-                        })
-                    except Exception as e:
-                        progress_bar.write(f"Failed to complete question {index} after retries: {e}")
-                        results["question_scores"].append({
-                            "question_index": index,
-                            "prompt": question["prompt"],
-                            "requirements": question["requirements"],
-                            "score": 0.0,
-                            "error": str(e)
-                        })
-                    finally:
-                        progress_bar.update(1)
-                        # Save intermediate results after each question completes
-                        self._save_results(results, results_dir)
-            # Close the progress bar
-            progress_bar.close()
-        else:
+        if not questions_to_run:
             print(f"All {len(questions)} questions already completed. Using cached results.")
+        return results, questions_to_run
+
+    # Function to record a finished job in the results and the journal
+    def _record_job(self, results: dict, job: PipelineJob, progress_bar: tqdm):
+        question, index = job.question, job.index
+        entry = {
+            "question_index": index,
+            "question_id": self._question_ids[index],
+            "prompt": question["prompt"],
+            "requirements": question["requirements"],
+            "score": job.score
+        }
+        with self._stats_lock:
+            stats = self.question_stats.pop(index, {})
+        if "timings" in stats:
+            stats["timings"] = {stage: round(seconds, 4) for stage, seconds in stats["timings"].items()}
+        entry.update(stats)
+        entry["attempts"] = job.attempts
+        if job.rejection is not None:
+            # Rejected before rendering: scored without a render or judge call
+            entry["score"] = 0.0
+            entry["rejected"] = job.rejection
+        elif job.error is not None:
+            progress_bar.write(f"Failed to complete question {index} after retries: {job.error}")
+            entry["score"] = 0.0
+            entry["error"] = str(job.error)
+        results["question_scores"].append(entry)
+        # Append the result to the journal as soon as the question completes
+        self.journal.append(entry)
+
+    # Function to compute final scores, save and print the results of a run
+    def _finish_run(self, results: dict, start_time: datetime) -> dict:
         # Sort results by question index to maintain order
         results["question_scores"].sort(key=lambda x: x["question_index"])
         # Calculate average score
@@ -168,15 +332,420 @@ class Benchmark:
         end_time = datetime.now()
         results["end_timestamp"] = end_time.isoformat()
         results["duration"] = (end_time - start_time).total_seconds()
-        # Save final results to JSON file
-        results_file_path = self._save_results(results, results_dir)
+        # Summarize per-stage latency and token usage over every question that recorded them
+        stage_timings = {}
+        for item in results["question_scores"]:
+            for stage, seconds in item.get("timings", {}).items():
+                stage_timings.setdefault(stage, []).append(seconds)
+        if stage_timings:
+            results["stage_latency"] = {
+                stage: {
+                    "count": len(timings),
+                    "mean": round(sum(timings) / len(timings), 4),
+                    "p50": self._percentile(timings, 50),
+                    "p95": self._percentile(timings, 95),
+                    "p99": self._percentile(timings, 99)
+                }
+                for stage, timings in stage_timings.items()
+            }
+            print("Latency p50/p95/p99: " + ", ".join(
+                f"{stage}={latency['p50']:.2f}/{latency['p95']:.2f}/{latency['p99']:.2f}s"
+                for stage, latency in results["stage_latency"].items()
+            ))
+        token_usage = {}
+        for item in results["question_scores"]:
+            for section, name in (("generation_usage", "generation"), ("judge_usage", "judging")):
+                for key, value in item.get(section, {}).items():
+                    token_usage.setdefault(name, {})
+                    token_usage[name][key] = token_usage[name].get(key, 0) + value
+        if token_usage:
+            results["token_usage"] = token_usage
+        # Report how quickly streamed generations produced a complete SVG
+        streamed = [item["streaming"] for item in results["question_scores"] if "streaming" in item]
+        if streamed:
+            times_to_svg = [item["time_to_svg"] for item in streamed if item["time_to_svg"] is not None]
+            results["streaming"] = {
+                "questions_streamed": len(streamed),
+                "stopped_early": sum(1 for item in streamed if item["stopped_early"]),
+                "stream_tokens": sum(item["stream_tokens"] for item in streamed),
+                "mean_time_to_svg": round(sum(times_to_svg) / len(times_to_svg), 3) if times_to_svg else None
+            }
+        # Report how much smaller the images sent to the judge were than the renders
+        uploads = [item["judge_upload"] for item in results["question_scores"] if "judge_upload" in item]
+        if uploads:
+            results["judge_upload"] = {
+                "images": len(uploads),
+                "original_bytes": sum(item["original_bytes"] for item in uploads),
+                "uploaded_bytes": sum(item["uploaded_bytes"] for item in uploads)
+            }
+            print(
+                f"Judge uploads: {results['judge_upload']['original_bytes'] / 1e6:.1f}MB rendered, "
+                f"{results['judge_upload']['uploaded_bytes'] / 1e6:.1f}MB sent"
+            )
+        # Count the SVGs rejected before rendering, by reason
+        rejections = {}
+        for item in results["question_scores"]:
+            if "rejected" in item:
+                rejections[item["rejected"]] = rejections.get(item["rejected"], 0) + 1
+        if rejections:
+            results["rejections"] = rejections
+            print("Rejected before rendering: " + ", ".join(f"{reason}={count}" for reason, count in rejections.items()))
+        # Report cache hits and misses for this run
+        if self.cache.enabled:
+            with self._cache_lock:
+                results["cache"] = {layer: dict(counters) for layer, counters in self.cache_stats.items()}
+            print("Cache hits: " + ", ".join(
+                f"{layer}={counters['hits']}/{counters['hits'] + counters['misses']}"
+                for layer, counters in results["cache"].items()
+            ))
+        # Report throttling by the model's and the judge's endpoints (cumulative for the process)
+        results["rate_limits"] = {
+            endpoint: RateLimiter.for_endpoint(endpoint).stats()
+            for endpoint in dict.fromkeys([self.llm.endpoint, self.judge_endpoint])
+        }
+        for endpoint, stats in results["rate_limits"].items():
+            if stats["throttled"] or stats["retries"]:
+                print(f"{endpoint}: {stats['throttled']} throttled, {stats['retries']} retried, "
+                      f"{stats['failures']} failed requests; concurrency limit fell to {stats['lowest_concurrency_limit']}")
+        # Compact the results into the JSON summary; the journal is no longer needed once it is written
+        results_file_path = self._save_results(results, self.results_dir)
+        self.journal.clear()
         # Print & return results
         print(f"Benchmark completed for {self.llm.model}!")
         print(f"Average score: {results['average_score']:.3f}")
         print(f"Results saved to: {results_file_path}")
         return results
 
-    # Function to save results to JSON file (used for both intermediate and final saves)
+    # Function to get a percentile (nearest rank) of a list of values
+    @staticmethod
+    def _percentile(values: list, percent: float) -> float:
+        ordered = sorted(values)
+        rank = max(1, math.ceil(percent / 100 * len(ordered)))
+        return round(ordered[rank - 1], 4)
+
+    # Function to run a benchmark
+    def run(
+            self,
+            run_full_benchmark: bool = True,
+            max_workers: int = 25,
+            render_workers: int = None,
+            evaluation_workers: int = None,
+            queue_size: int = None,
+            max_renders_per_driver: int = 200,
+            judge_batch_size: int = 1
+    ):
+        return Benchmark.run_all(
+            [self],
+            run_full_benchmark=run_full_benchmark,
+            max_workers=max_workers,
+            render_workers=render_workers,
+            evaluation_workers=evaluation_workers,
+            queue_size=queue_size,
+            max_renders_per_driver=max_renders_per_driver,
+            judge_batch_size=judge_batch_size
+        )[0]
+
+    # Function to run several benchmarks through one shared pipeline
+    @staticmethod
+    def run_all(
+            benchmarks: list,
+            run_full_benchmark: bool = True,
+            max_workers: int = 25,
+            render_workers: int = None,
+            evaluation_workers: int = None,
+            queue_size: int = None,
+            max_renders_per_driver: int = 200,
+            judge_batch_size: int = 1,
+            model_concurrency: int = None
+    ) -> list:
+        """
+        Run every model's questions through one pipeline. A scheduler interleaves the
+        models in a single work queue, slowest first, so a sweep takes about as long as
+        its slowest model rather than the sum of all of them. Each model's results are
+        saved as soon as its last question finishes.
+
+        Args:
+            benchmarks (list): Benchmark instances to run
+            run_full_benchmark (bool): Use questions.json instead of test_questions.json
+            max_workers (int): Generation threads shared by all models
+            render_workers (int): Render processes (default: number of CPUs)
+            evaluation_workers (int): Evaluation threads shared by all models
+            queue_size (int): Capacity of each stage's input queue
+            max_renders_per_driver (int): Renders after which a render process restarts its browser
+            judge_batch_size (int): Rendered images graded per judge request
+            model_concurrency (int): Maximum questions being generated per model (default: no cap)
+
+        Returns:
+            list: The results of each benchmark, in order
+        """
+        # Record start time
+        start_time = datetime.now()
+        # Initialize results tracking for every model
+        results = {}
+        remaining = {}
+        jobs = []
+        for benchmark in benchmarks:
+            questions = benchmark._load_questions(run_full_benchmark)
+            results[benchmark], questions_to_run = benchmark._start_run(questions, start_time)
+            remaining[benchmark] = len(questions_to_run)
+            jobs.extend(PipelineJob(benchmark, index, question) for index, question in questions_to_run)
+        # Only run remaining questions if there are any
+        if jobs:
+            # Generate, render and evaluate in separate stages, each with its own workers and queue
+            pipeline = BenchmarkPipeline(
+                generation_workers=max_workers,
+                render_workers=render_workers,
+                evaluation_workers=evaluation_workers or benchmarks[0].judge_concurrency or max_workers,
+                queue_size=queue_size,
+                max_renders_per_driver=max_renders_per_driver,
+                judge_batch_size=judge_batch_size,
+                model_concurrency=model_concurrency
+            )
+            # Initialize progress bars: one per model, plus a combined one when running several
+            multiple = len(benchmarks) > 1
+            progress_bar = tqdm(
+                total=len(jobs),
+                desc=f"Running benchmark for {len(benchmarks)} models" if multiple else f"Running benchmark for {benchmarks[0].llm.model}",
+                unit="question",
+                ncols=100
+            )
+            model_bars = {}
+            if multiple:
+                for position, benchmark in enumerate(benchmarks, start=1):
+                    model_bars[benchmark] = tqdm(
+                        total=remaining[benchmark],
+                        desc=benchmark.llm.model,
+                        unit="question",
+                        ncols=100,
+                        position=position,
+                        leave=False
+                    )
+            # Process jobs as they complete
+            for job in pipeline.run(jobs):
+                benchmark = job.benchmark
+                benchmark._record_job(results[benchmark], job, progress_bar)
+                # Show how many questions are waiting at each stage
+                depths = pipeline.queue_depths()
+                progress_bar.set_postfix_str(f"queued gen={depths['generation']} render={depths['rendering']} eval={depths['evaluation']}")
+                progress_bar.update(1)
+                if benchmark in model_bars:
+                    model_bars[benchmark].update(1)
+                # Save each model's results as soon as its last question is done
+                remaining[benchmark] -= 1
+                if remaining[benchmark] == 0:
+                    # Report render throughput and queue depths (shared by every model in the run)
+                    results[benchmark]["render_stats"] = pipeline.render_stats(
+                        wall_seconds=(datetime.now() - start_time).total_seconds()
+                    )
+                    results[benchmark]["pipeline"] = {
+                        "workers": pipeline.workers,
+                        "max_queue_depth": pipeline.max_queue_depth,
+                        "judge_requests": pipeline.judge_requests
+                    }
+                    results[benchmark] = benchmark._finish_run(results[benchmark], start_time)
+            # Close the progress bars
+            for bar in model_bars.values():
+                bar.close()
+            progress_bar.close()
+            render_stats = pipeline.render_stats(wall_seconds=(datetime.now() - start_time).total_seconds())
+            print(f"Rendered {render_stats['renders']} SVGs with {render_stats['backend']} at "
+                  f"{render_stats['renders_per_second']:.2f} renders/sec "
+                  f"({render_stats['mean_render_seconds']:.3f}s per render)")
+            print(f"Max queue depth: " + ", ".join(f"{stage}={depth}" for stage, depth in pipeline.max_queue_depth.items()))
+        # Save the results of models that had nothing left to run
+        for benchmark in benchmarks:
+            if remaining[benchmark] == 0 and "end_timestamp" not in results[benchmark]:
+                results[benchmark] = benchmark._finish_run(results[benchmark], start_time)
+        # Fold each packed store's write-ahead log back into its single file
+        for benchmark in benchmarks:
+            benchmark.close_store()
+        return [results[benchmark] for benchmark in benchmarks]
+
+    # Function to create an async client for the judge model
+    def _create_async_judge(self) -> AsyncLLM:
+        return AsyncLLM(
+            model=self.judge_model,
+            endpoint=self.judge_endpoint,
+            api_key=self.judge_api_key
+        )
+
+    # Function to run a benchmark with asyncio instead of worker threads
+    async def run_async(
+            self,
+            run_full_benchmark: bool = True,
+            max_concurrency: int = 25,
+            evaluation_concurrency: int = None,
+            render_workers: int = None,
+            render_executor: ProcessPoolExecutor = None,
+            max_renders_per_driver: int = 200,
+            progress_position: int = 0,
+            evaluator_llm: AsyncLLM = None,
+            evaluation_semaphore: asyncio.Semaphore = None,
+            close_clients: bool = True
+    ):
+        """
+        Run the benchmark on the event loop. Generation and evaluation requests are
+        coroutines on pooled async clients, so hundreds of questions can be in flight
+        without an OS thread each; rendering still runs in a process pool.
+
+        Args:
+            run_full_benchmark (bool): Use questions.json instead of test_questions.json
+            max_concurrency (int): Maximum generation requests in flight for this model
+            evaluation_concurrency (int): Maximum evaluation requests in flight (default: max_concurrency)
+            render_workers (int): Render processes if no render_executor is given
+            render_executor (ProcessPoolExecutor): Shared render process pool (e.g. across models)
+            max_renders_per_driver (int): Renders after which a render process restarts its browser
+            progress_position (int): Line offset of this model's progress bar
+            evaluator_llm (AsyncLLM): Shared judge client (e.g. across models, default: one for this run)
+            evaluation_semaphore (asyncio.Semaphore): Shared limit on evaluation requests in flight
+                (default: one for this run, allowing evaluation_concurrency)
+            close_clients (bool): Close the pooled async clients when the run ends (run_all_async
+                passes False and closes them once every model has finished)
+        """
+        # Load questions JSON
+        questions = self._load_questions(run_full_benchmark)
+        # Record start time
+        start_time = datetime.now()
+        # Initialize results tracking
+        results, questions_to_run = self._start_run(questions, start_time)
+        if not questions_to_run:
+            return self._finish_run(results, start_time)
+        # Create async clients with the same configuration as the synchronous ones
+        async_llm = AsyncLLM(
+            model=self.llm.model,
+            endpoint=self.llm.endpoint,
+            api_key=self.llm.api_key,
+            reasoning_effort=self.llm.reasoning_effort,
+            reasoning_max_tokens=self.llm.reasoning_max_tokens,
+            max_output_tokens=self.llm.max_output_tokens
+        )
+        if evaluator_llm is None:
+            evaluator_llm = self._create_async_judge()
+        generation_semaphore = asyncio.Semaphore(max_concurrency)
+        if evaluation_semaphore is None:
+            evaluation_semaphore = asyncio.Semaphore(evaluation_concurrency or self.judge_concurrency or max_concurrency)
+        # Use the shared render pool or start one for this run
+        owns_executor = render_executor is None
+        if owns_executor:
+            render_executor = ProcessPoolExecutor(
+                max_workers=render_workers or os.cpu_count() or 4,
+                initializer=init_render_worker,
+                initargs=(SVGRenderer.backend.name, max_renders_per_driver)
+            )
+        loop = asyncio.get_running_loop()
+
+        # Function to run one question through generation, rendering and evaluation
+        async def run_job(job: PipelineJob) -> PipelineJob:
+            while True:
+                job.attempts += 1
+                try:
+                    if job.png_bytes is None:
+                        # Generate the SVG code (or load it from the cache)
+                        if job.document is None:
+                            async with generation_semaphore:
+                                job.document, job.png_bytes = await self.generate_svg_async(
+                                    job.question["prompt"], job.requirements, job.index, async_llm
+                                )
+                        # Render the SVG in the process pool
+                        if job.png_bytes is None:
+                            try:
+                                png_bytes, elapsed = await loop.run_in_executor(render_executor, render_svg_in_worker, job.document)
+                                self.record_question_stats(job.index, "timings", {"rendering": elapsed})
+                            except Exception:
+                                # A failed render means the SVG is regenerated, as a whole-question retry would
+                                self.invalidate_generation(job.question["prompt"], job.requirements)
+                                job.document = None
+                                raise
+                            self.save_render(job.document, png_bytes, job.index)
+                            job.png_bytes = png_bytes
+                    # Evaluate the rendered image (unless the judge has already graded an identical one)
+                    job.score = self.load_cached_verdict(job.png_bytes, job.requirements, job.index)
+                    if job.score is None:
+                        async with evaluation_semaphore:
+                            job.score = await self.evaluate_svg_async(
+                                job.question, job.index, job.requirements, job.requirements_num,
+                                png_bytes=job.png_bytes, evaluator_llm=evaluator_llm
+                            )
+                    return job
+                except SVGValidationError as e:
+                    # A rejected SVG is scored 0 without retrying
+                    self.log(f"Rejected SVG for question {job.index}: {e}")
+                    job.rejection = e.reason
+                    return job
+                except Exception as e:
+                    self.log(f"Error running question {job.index} (attempt {job.attempts}): {e}")
+                    if job.attempts >= MAX_ATTEMPTS:
+                        job.error = e
+                        return job
+
+        # Initialize progress bar for remaining questions
+        progress_bar = tqdm(
+            total=len(questions_to_run), 
+            desc=f"Running benchmark for {self.llm.model}", 
+            unit="question",
+            ncols=100,
+            position=progress_position
+        )
+        try:
+            jobs = [PipelineJob(self, index, question) for index, question in questions_to_run]
+            # Process jobs as they complete
+            for next_job in asyncio.as_completed([run_job(job) for job in jobs]):
+                job = await next_job
+                self._record_job(results, job, progress_bar)
+                progress_bar.update(1)
+        finally:
+            progress_bar.close()
+            if owns_executor:
+                render_executor.shutdown(wait=True, cancel_futures=True)
+            self.close_store()
+            # Pooled clients are tied to this event loop, so don't leave them open for the next one
+            if close_clients:
+                await AsyncLLM.close_all()
+        return self._finish_run(results, start_time)
+
+    # Function to run several benchmarks concurrently on one event loop
+    @staticmethod
+    async def run_all_async(
+            benchmarks: list,
+            run_full_benchmark: bool = True,
+            max_concurrency: int = 25,
+            evaluation_concurrency: int = None,
+            render_workers: int = None,
+            max_renders_per_driver: int = 200
+    ) -> list:
+        # Share one render process pool between all models
+        render_executor = ProcessPoolExecutor(
+            max_workers=render_workers or os.cpu_count() or 4,
+            initializer=init_render_worker,
+            initargs=(SVGRenderer.backend.name, max_renders_per_driver)
+        )
+        # Share the judge clients and one limit on evaluation requests between all models, as run_all does
+        judges = {}
+        evaluator_llms = []
+        for benchmark in benchmarks:
+            judge_key = (benchmark.judge_model, benchmark.judge_endpoint, benchmark.judge_api_key)
+            if judge_key not in judges:
+                judges[judge_key] = benchmark._create_async_judge()
+            evaluator_llms.append(judges[judge_key])
+        evaluation_semaphore = asyncio.Semaphore(evaluation_concurrency or benchmarks[0].judge_concurrency or max_concurrency)
+        try:
+            return await asyncio.gather(*[
+                benchmark.run_async(
+                    run_full_benchmark=run_full_benchmark,
+                    max_concurrency=max_concurrency,
+                    render_executor=render_executor,
+                    progress_position=position,
+                    evaluator_llm=evaluator_llm,
+                    evaluation_semaphore=evaluation_semaphore,
+                    close_clients=False
+                )
+                for position, (benchmark, evaluator_llm) in enumerate(zip(benchmarks, evaluator_llms))
+            ])
+        finally:
+            render_executor.shutdown(wait=True, cancel_futures=True)
+            await AsyncLLM.close_all()
+
+    # Function to save results to the JSON summary file
     def _save_results(self, results: dict, results_dir: str) -> str:
         """Save results to the benchmark_results.json file. Returns the file path."""
         # Sort before saving to maintain consistent order
@@ -184,29 +753,11 @@ class Benchmark:
         # Recalculate average score
         total_score = sum(item["score"] for item in results["question_scores"])
         results["average_score"] = total_score / len(results["question_scores"]) if results["question_scores"] else 0.0
-        # Write to file
+        # Write to file atomically so an interrupted save never leaves a truncated summary
         results_file_path = os.path.join(results_dir, "benchmark_results.json")
-        with open(results_file_path, "w") as file:
-            json.dump(results, file, indent=2)
+        ResultsJournal.write_json_atomic(results_file_path, results)
         return results_file_path
 
-    # Function to run a single question with retry logic
-    def _run_question_with_retry(
-            self, 
-            question: dict, 
-            index: int
-    ) -> float:
-        # Retry 3 times if failed
-        for attempt in range(3):
-            try:
-                return self.run_question(question, index)
-            except Exception as e:
-                tqdm.write(f"Error running question {index} (attempt {attempt + 1}): {e}")
-                if attempt == 2:  # Last attempt
-                    # Return score of 0 if failed
-                    return 0.0
-                continue
-
     # Function to run a single question
     def run_question(
             self, 
@@ -216,37 +767,218 @@ class Benchmark:
         # Formulate requirements
         requirements = "\n".join([f"{i+1}. {req}" for i, req in enumerate(question["requirements"])])
         requirements_num = len(question["requirements"])
-        # Generate the SVG code
-        self.generate_svg_code(question["prompt"], requirements, index)
-        # Evaluate the generated SVG
-        score = self.evaluate_svg(question, index, requirements, requirements_num)
+        # Generate the SVG code and render it (an SVG rejected before rendering scores 0)
+        try:
+            png_bytes = self.generate_svg_code(question["prompt"], requirements, index)
+        except SVGValidationError as e:
+            self.log(f"Rejected SVG for question {index}: {e}")
+            return 0.0
+        # Evaluate the generated SVG (unless the judge has already graded an identical image)
+        score = self.load_cached_verdict(png_bytes, requirements, index)
+        if score is None:
+            score = self.evaluate_svg(question, index, requirements, requirements_num, png_bytes=png_bytes)
         # Return the score
         return score
     
-    # Function to generate the SVG code
+    # Function to write progress messages without breaking the progress bar
+    def log(self, message: str):
+        tqdm.write(message)
+
+    # Function to generate the SVG code and render it
     def generate_svg_code(
             self, 
             prompt: str, 
             requirements: str, 
             index: int
-    ):
-        # Check if SVG and PNG already exist from a previous run
-        results_dir = f"results/{self.llm.model.replace('/', '-')}"
-        svg_path = os.path.join(results_dir, f"question_{index}.svg")
-        png_path = os.path.join(results_dir, f"question_{index}.png")
-        # If both files exist, skip generation entirely
-        if os.path.exists(svg_path) and os.path.exists(png_path):
-            tqdm.write(f"Using cached SVG/PNG for question {index}")
-            return
-        # If only SVG exists, re-render the PNG from it
-        if os.path.exists(svg_path):
-            tqdm.write(f"Re-rendering PNG from cached SVG for question {index}")
-            with open(svg_path, "r") as file:
-                svg_code = file.read()
-            SVGRenderer.render_svg(svg_code, results_dir, f"question_{index}")
-            return
-        # Otherwise, generate from scratch
-        generate_prompt = f"""
+    ) -> bytes:
+        # Generate the SVG code (or load it and its render from the cache)
+        document, png_bytes = self.generate_svg(prompt, requirements, index)
+        # Render the SVG code to an image if no cached PNG was found
+        if png_bytes is None:
+            start = time.perf_counter()
+            try:
+                png_bytes = SVGRenderer.render_svg_to_bytes(document)
+                self.record_question_stats(index, "timings", {"rendering": time.perf_counter() - start})
+            except Exception:
+                # Do not serve an SVG that cannot be rendered to the next attempt
+                self.invalidate_generation(prompt, requirements)
+                raise
+            self.save_render(document, png_bytes, index)
+        # Return the rendered image so it can be evaluated without reading it back
+        return png_bytes
+
+    # Function to generate the SVG code without rendering it
+    def generate_svg(
+            self, 
+            prompt: str, 
+            requirements: str, 
+            index: int
+    ) -> tuple:
+        """Return (document, png_bytes): the validated SVGDocument, and None for png_bytes if the SVG still needs to be rendered. Raises SVGValidationError if the SVG is rejected."""
+        generation_prompt = self._build_generation_prompt(prompt, requirements)
+        # Reuse the model's response to an identical request, or generate from scratch
+        text = self._cache_get("generations", self._generation_key(generation_prompt), index)
+        if text is None:
+            usage = {}
+            start = time.perf_counter()
+            if self.stream:
+                # Stop reading as soon as the first complete SVG has arrived
+                text, stream_stats = self.llm.generate_text_stream(generation_prompt, stop_condition=SVGStreamExtractor(), usage=usage)
+                self._record_stream_stats(index, stream_stats)
+            else:
+                text = self.llm.generate_text(generation_prompt, usage=usage)
+            self.record_question_stats(index, "timings", {"generation": time.perf_counter() - start})
+            self.record_question_stats(index, "generation_usage", usage)
+            document = self._store_generation(generation_prompt, text, index)
+        else:
+            document = self._timed_extract_svg(text, index)
+        # Check the SVG before spending a render on it
+        document = self.validate_svg(document, index)
+        return document, self._load_cached_render(document, index)
+
+    # Function to generate the SVG code without rendering it, using an async client
+    async def generate_svg_async(
+            self, 
+            prompt: str, 
+            requirements: str, 
+            index: int,
+            async_llm: AsyncLLM
+    ) -> tuple:
+        """Return (document, png_bytes): the validated SVGDocument, and None for png_bytes if the SVG still needs to be rendered. Raises SVGValidationError if the SVG is rejected."""
+        generation_prompt = self._build_generation_prompt(prompt, requirements)
+        # Reuse the model's response to an identical request, or generate from scratch
+        text = self._cache_get("generations", self._generation_key(generation_prompt), index)
+        if text is None:
+            usage = {}
+            start = time.perf_counter()
+            if self.stream:
+                # Stop reading as soon as the first complete SVG has arrived
+                text, stream_stats = await async_llm.generate_text_stream(generation_prompt, stop_condition=SVGStreamExtractor(), usage=usage)
+                self._record_stream_stats(index, stream_stats)
+            else:
+                text = await async_llm.generate_text(generation_prompt, usage=usage)
+            self.record_question_stats(index, "timings", {"generation": time.perf_counter() - start})
+            self.record_question_stats(index, "generation_usage", usage)
+            document = self._store_generation(generation_prompt, text, index)
+        else:
+            document = self._timed_extract_svg(text, index)
+        # Check the SVG before spending a render on it
+        document = self.validate_svg(document, index)
+        return document, self._load_cached_render(document, index)
+
+    # Function to add counters or timings to a question's entry (values are summed across attempts)
+    def record_question_stats(self, index: int, section: str, values: dict):
+        with self._stats_lock:
+            target = self.question_stats.setdefault(index, {}).setdefault(section, {})
+            for key, value in values.items():
+                target[key] = target.get(key, 0) + value
+
+    # Function to validate and sanitize an SVG before rendering, recording what was changed
+    def validate_svg(self, document: SVGDocument, index: int) -> SVGDocument:
+        start = time.perf_counter()
+        try:
+            document, changes = self.validator.validate(document)
+        finally:
+            self.record_question_stats(index, "timings", {"validation": time.perf_counter() - start})
+        if changes:
+            self.record_question_stats(index, "sanitized", changes)
+        return document
+
+    # Function to extract the SVG code into a document shared by the later stages, recording how long it took
+    def _timed_extract_svg(self, text: str, index: int) -> SVGDocument:
+        start = time.perf_counter()
+        try:
+            return SVGDocument(self._extract_svg_code(text, index))
+        finally:
+            self.record_question_stats(index, "timings", {"extraction": time.perf_counter() - start})
+
+    # Function to keep the statistics of a streamed generation for the question's entry
+    def _record_stream_stats(self, index: int, stream_stats: dict):
+        with self._stats_lock:
+            self.question_stats.setdefault(index, {})["streaming"] = {
+                "time_to_svg": stream_stats["stop_seconds"],
+                "first_token_seconds": stream_stats["first_token_seconds"],
+                "generation_seconds": stream_stats["seconds"],
+                "stream_tokens": stream_stats["stream_tokens"],
+                "stopped_early": stream_stats["stopped_early"]
+            }
+
+    # Function to read an entry from the cache, counting hits and misses for the run summary
+    def _cache_get(self, layer: str, key: str, index: int = None):
+        if not self.cache.enabled:
+            return None
+        data = self.cache.get(layer, key)
+        with self._cache_lock:
+            self.cache_stats[layer]["hits" if data is not None else "misses"] += 1
+        if data is not None and index is not None:
+            self.record_question_stats(index, "cache_hits", {layer: 1})
+        return data.decode("utf-8") if layer == "generations" and data is not None else data
+
+    # Function to get the cache key of a generation request
+    def _generation_key(self, generation_prompt: str) -> str:
+        # Every setting that changes the model's answer is part of the key
+        return ContentCache.key(
+            "generation",
+            self.llm.endpoint,
+            self.llm.model,
+            {
+                "reasoning_effort": self.llm.reasoning_effort,
+                "reasoning_max_tokens": self.llm.reasoning_max_tokens,
+                "max_output_tokens": self.llm.max_output_tokens
+            },
+            generation_prompt
+        )
+
+    # Function to extract the SVG code from a fresh response and cache the response
+    def _store_generation(self, generation_prompt: str, text: str, index: int) -> SVGDocument:
+        # Only responses containing an SVG are cached, so a failed extraction is retried against the model
+        document = self._timed_extract_svg(text, index)
+        self.cache.put("generations", self._generation_key(generation_prompt), text.encode("utf-8"))
+        return document
+
+    # Function to drop a cached generation (e.g. because its SVG failed to render)
+    def invalidate_generation(self, prompt: str, requirements: str):
+        self.cache.delete("generations", self._generation_key(self._build_generation_prompt(prompt, requirements)))
+
+    # Function to get the cache key of a render
+    @staticmethod
+    def _render_key(document: SVGDocument) -> str:
+        # Different rasterizers produce different images from the same SVG, and the canvas
+        # size depends on the validator's limits (an oversized canvas is clamped), not just the code
+        return ContentCache.key("render", SVGRenderer.backend.name, document.canvas_size, document.code)
+
+    # Function to load the render of an identical SVG from the cache, writing it to the results directory
+    def _load_cached_render(self, document: SVGDocument, index: int):
+        png_bytes = self._cache_get("renders", self._render_key(document), index)
+        if png_bytes is not None:
+            self._write_artifacts(document, png_bytes, index)
+        return png_bytes
+
+    # Function to get the cache key of a judge verdict
+    def _verdict_key(self, png_bytes: bytes, requirements: str) -> str:
+        # The judge sees the prepared image, so its settings are part of the key, and the
+        # evaluation prompt (which includes the requirements) is too, so editing it
+        # invalidates earlier verdicts (the requirement count follows from the requirements)
+        evaluation_prompt = self._build_evaluation_prompt(requirements, 0)
+        return ContentCache.key("verdict", self.judge_model, self.image_preparer.settings, evaluation_prompt, png_bytes)
+
+    # Function to load the score the judge gave an identical image for the same requirements
+    def load_cached_verdict(self, png_bytes: bytes, requirements: str, index: int = None):
+        """Return the cached score, or None if this image has not been graded against these requirements."""
+        if png_bytes is None:
+            return None
+        data = self._cache_get("verdicts", self._verdict_key(png_bytes, requirements), index)
+        return json.loads(data)["score"] if data is not None else None
+
+    # Function to cache a judge verdict
+    def _store_verdict(self, png_bytes: bytes, requirements: str, score: float):
+        if png_bytes is not None:
+            self.cache.put("verdicts", self._verdict_key(png_bytes, requirements), json.dumps({"score": score}).encode("utf-8"))
+
+    # Function to build the generation prompt
+    @staticmethod
+    def _build_generation_prompt(prompt: str, requirements: str) -> str:
+        return f"""
 {prompt} Wrap the SVG code in an SVG code block following the example below.
 
 Example:
@@ -259,8 +991,10 @@ Example:
 Requirements:
 {requirements}
 """
-        # Generate text from the image
-        text = self.llm.generate_text(generate_prompt)
+
+    # Function to extract the SVG code from a model response
+    @staticmethod
+    def _extract_svg_code(text: str, index: int) -> str:
         # Extract the SVG code from the text with proper error handling
         try:
             if "```svg" in text:
@@ -283,13 +1017,36 @@ Requirements:
             tqdm.write(f"Full response: {text}")
             # Throw an error
             raise ValueError("Error extracting SVG code")
+        return svg_code
+
+    # Function to save a rendered SVG and its PNG to the results directory
+    def save_render(
+            self, 
+            document: SVGDocument, 
+            png_bytes: bytes, 
+            index: int
+    ):
+        self._write_artifacts(document, png_bytes, index)
+        # Cache the render for any identical SVG
+        self.cache.put("renders", self._render_key(document), png_bytes)
+
+    # Function to write an SVG and its PNG to the results directory
+    def _write_artifacts(self, document: SVGDocument, png_bytes: bytes, index: int):
         # Create the results directory if it doesn't exist
-        os.makedirs(results_dir, exist_ok=True)
-        # Render the SVG code to an image
-        SVGRenderer.render_svg(svg_code, results_dir, f"question_{index}")
+        os.makedirs(self.results_dir, exist_ok=True)
+        if self.artifact_store == "packed":
+            # Both are stored in one transaction, so a stored SVG always has its render
+            self.store.put_many([
+                (self._artifact_name(index, "png"), png_bytes),
+                (self._artifact_name(index, "svg"), document.code.encode("utf-8"))
+            ])
+            return
+        # Save the image first so an SVG on disk always means its render succeeded
+        with open(self._artifact_path(index, "png"), "wb") as file:
+            file.write(png_bytes)
         # Save the SVG code to a file
-        with open(f"{results_dir}/question_{index}.svg", "w") as file:
-            file.write(svg_code)
+        with open(self._artifact_path(index, "svg"), "w") as file:
+            file.write(document.code)
 
     # Function to evaluate the generated SVG
     def evaluate_svg(
@@ -297,12 +1054,124 @@ Requirements:
             question: dict, 
             index: int, 
             requirements: str, 
-            requirements_num: int
+            requirements_num: int,
+            png_bytes: bytes = None
+    ) -> float:
+        # Read the PNG only if the rendered image was not passed in
+        if png_bytes is None:
+            png_bytes = self._read_artifact(index, "png")
+        # Evaluate the PNG with the shared evaluator
+        usage = {}
+        start = time.perf_counter()
+        json_response = self.evaluator_llm.generate_text(
+            self._build_evaluation_prompt(requirements, requirements_num),
+            image_bytes=self._prepare_judge_image(png_bytes, index),
+            json_schema=EVALUATION_SCHEMA,
+            usage=usage
+        )
+        self.record_question_stats(index, "timings", {"judging": time.perf_counter() - start})
+        self.record_question_stats(index, "judge_usage", usage)
+        # Parse the response, calculate and cache the score
+        score = self._parse_evaluation(json_response, requirements_num)
+        self._store_verdict(png_bytes, requirements, score)
+        return score
+
+    # Function to evaluate the generated SVG, using an async client
+    async def evaluate_svg_async(
+            self, 
+            question: dict, 
+            index: int, 
+            requirements: str, 
+            requirements_num: int,
+            png_bytes: bytes,
+            evaluator_llm: AsyncLLM
     ) -> float:
-        # Get the PNG path
-        png_path = f"results/{self.llm.model.replace('/', '-')}/question_{index}.png"
+        # Evaluate the PNG
+        usage = {}
+        start = time.perf_counter()
+        json_response = await evaluator_llm.generate_text(
+            self._build_evaluation_prompt(requirements, requirements_num),
+            image_bytes=self._prepare_judge_image(png_bytes, index),
+            json_schema=EVALUATION_SCHEMA,
+            usage=usage
+        )
+        self.record_question_stats(index, "timings", {"judging": time.perf_counter() - start})
+        self.record_question_stats(index, "judge_usage", usage)
+        # Parse the response, calculate and cache the score
+        score = self._parse_evaluation(json_response, requirements_num)
+        self._store_verdict(png_bytes, requirements, score)
+        return score
+
+    # Function to prepare a rendered image for the judge, recording how much it shrank
+    def _prepare_judge_image(self, png_bytes: bytes, index: int) -> bytes:
+        image_bytes = self.image_preparer.prepare(png_bytes)
+        self.record_question_stats(index, "judge_upload", {
+            "original_bytes": len(png_bytes),
+            "uploaded_bytes": len(image_bytes)
+        })
+        return image_bytes
+
+    # Function to evaluate several rendered SVGs in one judge request
+    def evaluate_svg_batch(self, jobs: list) -> list:
+        """
+        Grade several rendered images, each against its own requirements, in a single request.
+
+        Args:
+            jobs (list): PipelineJob instances with png_bytes set
+
+        Returns:
+            list: One score per job, or None where the judge's answer was missing or invalid
+        """
         # Formulate prompt
+        sections = "\n".join(
+            f"Image {number} ({job.requirements_num} requirements):\n{job.requirements}\n"
+            for number, job in enumerate(jobs, start=1)
+        )
         evaluate_prompt = f"""
+Examine the {len(jobs)} generated images below. Each image has its own list of requirements. For each image, how many of its requirements were fulfilled?
+
+Respond with one result per image, and be strict about the requirements.
+
+{sections}"""
+        # Evaluate all PNGs with the shared evaluator
+        usage = {}
+        start = time.perf_counter()
+        try:
+            json_response = self.evaluator_llm.generate_text(
+                evaluate_prompt,
+                images=[job.benchmark._prepare_judge_image(job.png_bytes, job.index) for job in jobs],
+                json_schema=BATCH_EVALUATION_SCHEMA,
+                usage=usage
+            )
+        finally:
+            # Every job waited for the whole request; tokens are split evenly between them
+            elapsed = time.perf_counter() - start
+            for job in jobs:
+                job.benchmark.record_question_stats(job.index, "timings", {"judging": elapsed})
+                job.benchmark.record_question_stats(job.index, "judge_usage", {
+                    key: value / len(jobs) for key, value in usage.items()
+                })
+        # Map each result back to its job, rejecting counts that cannot be right
+        counts = {}
+        for result in json.loads(json_response).get("results", []):
+            try:
+                counts[int(result["image_number"])] = float(result["number_of_fulfilled_requirements"])
+            except (KeyError, TypeError, ValueError):
+                continue
+        scores = []
+        for number, job in enumerate(jobs, start=1):
+            count = counts.get(number)
+            if count is None or count < 0 or count > job.requirements_num:
+                scores.append(None)
+            else:
+                scores.append(count / job.requirements_num)
+                self._store_verdict(job.png_bytes, job.requirements, scores[-1])
+        return scores
+
+    # Function to build the evaluation prompt
+    @staticmethod
+    def _build_evaluation_prompt(requirements: str, requirements_num: int) -> str:
+        return f"""
 Examine the generated image. How many of the following {requirements_num} requirements were fulfilled? 
 
 Respond with a number ONLY, and be strict about the requirements.
@@ -310,30 +1179,10 @@ Respond with a number ONLY, and be strict about the requirements.
 Requirements:
 {requirements}
 """
-        # Init evaluator LLM
-        evaluator_llm = LLM(
-            model="google/gemini-2.5-flash",
-            endpoint=self.open_router_endpoint,
-            api_key=self.open_router_api_key
-        )
-        # Evaluate the PNG
-        json_response = evaluator_llm.generate_text(
-            evaluate_prompt,
-            image_path=png_path, 
-            json_schema={
-                "$schema": "https://json-schema.org/draft/2020-12/schema",
-                "type": "object",
-                "properties": {
-                    "number_of_fulfilled_requirements": {
-                    "type": "number",
-                    "minimum": 0,
-                    "description": "The count of requirements that have been fulfilled"
-                    }
-                },
-                "required": ["number_of_fulfilled_requirements"],
-                "additionalProperties": False
-            }
-        )
+
+    # Function to turn the evaluator's response into a score
+    @staticmethod
+    def _parse_evaluation(json_response: str, requirements_num: int) -> float:
         # Parse the JSON response
         parsed_json = json.loads(json_response)
         # Calculate the score
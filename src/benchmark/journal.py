@@ -0,0 +1,69 @@
+import json
+import os
+import threading
+
+# Class to record per-question results in an append-only JSONL file
+class ResultsJournal:
+
+    # Function to initialize the journal
+    def __init__(self, results_dir: str, filename: str = "benchmark_journal.jsonl"):
+        """
+        Journal of finished questions for one model. Each entry is appended and
+        fsync'd as soon as its question finishes, so a crash loses at most the
+        line being written and never corrupts earlier results.
+
+        Args:
+            results_dir (str): The model's results directory
+            filename (str): Name of the journal file inside results_dir
+        """
+        self.path = os.path.join(results_dir, filename)
+        self._lock = threading.Lock()
+
+    # Function to append one entry and flush it to disk
+    def append(self, entry: dict):
+        line = json.dumps(entry) + "\n"
+        with self._lock:
+            with open(self.path, "a") as file:
+                file.write(line)
+                file.flush()
+                os.fsync(file.fileno())
+
+    # Function to read every complete entry in the journal, in order
+    def replay(self) -> list:
+        if not os.path.exists(self.path):
+            return []
+        entries = []
+        with self._lock:
+            with open(self.path, "rb+") as file:
+                end = 0
+                for line in file:
+                    # A last line without a newline means the process died mid-write
+                    if not line.endswith(b"\n"):
+                        break
+                    end += len(line)
+                    try:
+                        entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue
+                # Cut off the torn line, so the next append starts on a line of its own
+                if end < os.fstat(file.fileno()).st_size:
+                    file.truncate(end)
+                    file.flush()
+                    os.fsync(file.fileno())
+        return entries
+
+    # Function to remove the journal once its entries have been compacted into the summary
+    def clear(self):
+        with self._lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    # Function to write a JSON file atomically (write to a temporary file, then rename over the target)
+    @staticmethod
+    def write_json_atomic(path: str, data: dict):
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w") as file:
+            json.dump(data, file, indent=2)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
@@ -0,0 +1,254 @@
+import argparse
+import glob
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Default canned SVGs (the renderer parity corpus)
+DEFAULT_SVG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'assets', 'parity')
+
+# Function to parse a latency distribution such as "fixed:0.5", "uniform:0.2,1.5", "lognormal:0.8,0.5" or "exponential:0.5"
+def parse_latency(spec: str):
+    """
+    Parse a latency distribution into a function returning a delay in seconds.
+
+    Args:
+        spec (str): "fixed:SECONDS", "uniform:LOW,HIGH", "lognormal:MEDIAN,SIGMA" or "exponential:MEAN"
+
+    Returns:
+        callable: Function that samples one delay
+    """
+    name, _, arguments = spec.partition(":")
+    values = [float(value) for value in arguments.split(",")] if arguments else []
+    if name == "fixed" and len(values) == 1:
+        return lambda: values[0]
+    if name == "uniform" and len(values) == 2:
+        return lambda: random.uniform(values[0], values[1])
+    if name == "lognormal" and len(values) == 2:
+        return lambda: random.lognormvariate(math.log(values[0]), values[1])
+    if name == "exponential" and len(values) == 1:
+        return lambda: random.expovariate(1 / values[0]) if values[0] > 0 else 0.0
+    raise ValueError(f"Invalid latency distribution '{spec}'")
+
+# Class to serve canned chat completions in place of an OpenAI compatible endpoint
+class MockLLMServer:
+
+    # Function to initialize the mock server
+    def __init__(
+            self,
+            host: str = "127.0.0.1",
+            port: int = 0,
+            generation_latency: str = "fixed:0.5",
+            judge_latency: str = "fixed:0.3",
+            error_rate: float = 0.0,
+            rate_limit_rate: float = 0.0,
+            retry_after: float = 1.0,
+            svg_dir: str = DEFAULT_SVG_DIR,
+            trailing_text: str = "This SVG draws the requested scene.\n",
+            seed: int = None
+    ):
+        """
+        Local stand-in for an OpenAI compatible /chat/completions endpoint, for measuring
+        the pipeline without paying for API calls. Generation requests get one of the
+        canned SVGs in a code block; judge requests (anything with a response_format) get
+        a random count of fulfilled requirements. Both stream if asked to.
+
+        Args:
+            host (str): Interface to listen on
+            port (int): Port to listen on (0 picks a free port)
+            generation_latency (str): Latency distribution of generation requests (see parse_latency)
+            judge_latency (str): Latency distribution of judge requests
+            error_rate (float): Fraction of requests answered with HTTP 500
+            rate_limit_rate (float): Fraction of requests answered with HTTP 429
+            retry_after (float): Retry-After seconds sent with each 429
+            svg_dir (str): Directory of canned .svg responses
+            trailing_text (str): Prose written after the SVG code block
+            seed (int): Random seed, for reproducible runs
+        """
+        self.generation_latency = parse_latency(generation_latency)
+        self.judge_latency = parse_latency(judge_latency)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.trailing_text = trailing_text
+        self.random = random.Random(seed)
+        self.svgs = []
+        for svg_path in sorted(glob.glob(os.path.join(svg_dir, "*.svg"))):
+            with open(svg_path, "r") as file:
+                self.svgs.append(file.read().strip())
+        if not self.svgs:
+            raise ValueError(f"No .svg files found in {svg_dir}")
+        self._lock = threading.Lock()
+        # Statistics
+        self.requests = {"generation": 0, "judge": 0, "errors": 0, "rate_limited": 0}
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    # Property with the base URL to pass as the endpoint
+    @property
+    def endpoint(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    # Function to start serving in a background thread
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    # Function to stop serving
+    def shutdown(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    # Function to count a request
+    def _count(self, kind: str):
+        with self._lock:
+            self.requests[kind] += 1
+
+    # Function to build the content of a judge response
+    def _judge_content(self, body: dict) -> str:
+        prompt = ""
+        for message in body.get("messages", []):
+            content = message.get("content")
+            if isinstance(content, str):
+                prompt += content
+            else:
+                prompt += "".join(part.get("text", "") for part in content if part.get("type") == "text")
+        with self._lock:
+            # Batched requests list each image's requirement count
+            batch = re.findall(r"Image (\d+) \((\d+) requirements\)", prompt)
+            if batch:
+                return json.dumps({"results": [
+                    {"image_number": int(number), "number_of_fulfilled_requirements": self.random.randint(0, int(count))}
+                    for number, count in batch
+                ]})
+            match = re.search(r"following (\d+) requirements", prompt)
+            count = int(match.group(1)) if match else 1
+            return json.dumps({"number_of_fulfilled_requirements": self.random.randint(0, count)})
+
+    # Function to build the content of a generation response
+    def _generation_content(self) -> str:
+        with self._lock:
+            svg_code = self.random.choice(self.svgs)
+        return f"Here is the SVG code:\n```svg\n{svg_code}\n```\n{self.trailing_text}"
+
+    # Function to create the request handler class bound to this server
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status: int, payload: dict, headers: dict = None):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_stream(self, model: str, content: str, usage: dict):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                # Send roughly one token (four characters) per event
+                pieces = [content[i:i + 4] for i in range(0, len(content), 4)]
+                events = [
+                    {"id": "mock", "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                     "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+                    for piece in pieces
+                ]
+                events.append({"id": "mock", "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                               "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "usage": usage})
+                try:
+                    for event in events:
+                        self._write_chunk(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+                    self._write_chunk(b"data: [DONE]\n\n")
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client closed the stream early
+                    pass
+
+            def _write_chunk(self, data: bytes):
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send_json(404, {"error": {"message": "Not found"}})
+                    return
+                # Judge requests ask for structured output
+                is_judge = "response_format" in body
+                server._count("judge" if is_judge else "generation")
+                time.sleep(max(0.0, server.judge_latency() if is_judge else server.generation_latency()))
+                # Inject failures
+                with server._lock:
+                    roll = server.random.random()
+                if roll < server.rate_limit_rate:
+                    server._count("rate_limited")
+                    self._send_json(429, {"error": {"message": "Rate limit exceeded", "code": 429}},
+                                    headers={"Retry-After": str(server.retry_after)})
+                    return
+                if roll < server.rate_limit_rate + server.error_rate:
+                    server._count("errors")
+                    self._send_json(500, {"error": {"message": "Internal server error", "code": 500}})
+                    return
+                content = server._judge_content(body) if is_judge else server._generation_content()
+                usage = {"prompt_tokens": 100, "completion_tokens": max(1, len(content) // 4),
+                         "total_tokens": 100 + max(1, len(content) // 4)}
+                model = body.get("model", "mock")
+                if body.get("stream"):
+                    # Like OpenAI compatible endpoints, only report usage in a stream if asked to
+                    include_usage = (body.get("stream_options") or {}).get("include_usage")
+                    self._send_stream(model, content, usage if include_usage else None)
+                    return
+                self._send_json(200, {
+                    "id": "mock",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+                    "usage": usage
+                })
+
+        return Handler
+
+# Run the mock server from the command line
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Serve canned chat completions in place of an OpenAI compatible endpoint.')
+    parser.add_argument('--port', type=int, default=8001, help='Port to listen on (default: 8001)')
+    parser.add_argument('--generation-latency', default='fixed:0.5', help='Generation latency distribution, e.g. fixed:0.5, uniform:0.2,1.5, lognormal:0.8,0.5, exponential:0.5 (default: fixed:0.5)')
+    parser.add_argument('--judge-latency', default='fixed:0.3', help='Judge latency distribution (default: fixed:0.3)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with HTTP 500 (default: 0)')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Fraction of requests answered with HTTP 429 (default: 0)')
+    parser.add_argument('--svg-dir', default=DEFAULT_SVG_DIR, help='Directory of canned SVG responses (default: assets/parity)')
+    args = parser.parse_args()
+    server = MockLLMServer(
+        port=args.port,
+        generation_latency=args.generation_latency,
+        judge_latency=args.judge_latency,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        svg_dir=args.svg_dir
+    )
+    server.start()
+    print(f"Mock endpoint listening at {server.endpoint}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,355 @@
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import util as multiprocessing_util
+
+# Import the SVGRenderer and SVGDocument classes
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from utils.svg_renderer import SVGRenderer
+from utils.svg_document import SVGDocument
+from utils.svg_validation import SVGValidationError
+from benchmark.scheduler import ModelScheduler
+
+# Maximum number of attempts per question (shared across all stages)
+MAX_ATTEMPTS = 3
+
+# Function to set up the rasterizer in a render worker process
+def init_render_worker(backend_name: str, max_renders_per_driver: int):
+    backend = SVGRenderer.set_backend(backend_name)
+    # Each process renders one SVG at a time, so it needs at most one driver
+    backend.start(concurrency=1, max_renders_per_driver=max_renders_per_driver)
+    # Quit the driver when the worker process exits
+    multiprocessing_util.Finalize(None, backend.shutdown, exitpriority=10)
+
+# Function to render an SVG in a render worker process
+def render_svg_in_worker(document: SVGDocument) -> tuple:
+    start = time.perf_counter()
+    png_bytes = SVGRenderer.render_svg_to_bytes(document)
+    return png_bytes, time.perf_counter() - start
+
+# Class holding the state of one question as it moves through the pipeline
+class PipelineJob:
+
+    # Function to initialize the job
+    def __init__(self, benchmark, index: int, question: dict):
+        self.benchmark = benchmark
+        self.index = index
+        self.question = question
+        # Formulate requirements
+        self.requirements = "\n".join([f"{i+1}. {req}" for i, req in enumerate(question["requirements"])])
+        self.requirements_num = len(question["requirements"])
+        # Stage outputs
+        self.document = None
+        self.png_bytes = None
+        self.score = None
+        self.error = None
+        # Reason the SVG was rejected before rendering, if it was
+        self.rejection = None
+        self.attempts = 0
+        self.scheduled = False
+
+# Class to run questions through generation, rendering and evaluation stages
+class BenchmarkPipeline:
+
+    # Names of the pipeline stages, in order
+    STAGES = ("generation", "rendering", "evaluation")
+
+    # Function to initialize the pipeline
+    def __init__(
+            self,
+            generation_workers: int = 25,
+            render_workers: int = None,
+            evaluation_workers: int = 25,
+            queue_size: int = None,
+            max_renders_per_driver: int = 200,
+            judge_batch_size: int = 1,
+            judge_batch_wait: float = 2.0,
+            model_concurrency: int = None
+    ):
+        """
+        Create a three-stage pipeline. LLM generation and evaluation run in thread
+        pools, while CPU-bound rendering runs in a process pool so it does not
+        compete with the I/O threads for the GIL.
+
+        Args:
+            generation_workers (int): Threads waiting on the model under test
+            render_workers (int): Render processes (default: number of CPUs)
+            evaluation_workers (int): Threads waiting on the judge model
+            queue_size (int): Capacity of each stage's input queue (default: 2x that stage's workers)
+            max_renders_per_driver (int): Renders after which a render process restarts its browser
+            judge_batch_size (int): Rendered images graded per judge request (1 disables batching)
+            judge_batch_wait (float): Seconds an evaluation worker waits to fill a batch
+            model_concurrency (int): Maximum questions being generated per model when jobs from several models are run
+        """
+        self.workers = {
+            "generation": max(1, generation_workers),
+            "rendering": max(1, render_workers or os.cpu_count() or 4),
+            "evaluation": max(1, evaluation_workers)
+        }
+        self.queues = {
+            stage: queue.Queue(maxsize=queue_size or 2 * self.workers[stage])
+            for stage in self.STAGES
+        }
+        self.max_renders_per_driver = max_renders_per_driver
+        self.judge_batch_size = max(1, judge_batch_size)
+        self.judge_batch_wait = judge_batch_wait
+        # Decides which model's question enters the generation queue next
+        self.scheduler = ModelScheduler(model_concurrency=model_concurrency)
+        # Jobs that failed rendering go back to generation (unbounded so re-queuing never blocks)
+        self._retry_queue = queue.Queue()
+        self._results = queue.Queue()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        # Statistics
+        self.max_queue_depth = {stage: 0 for stage in self.STAGES}
+        self.renders = 0
+        self.render_seconds = 0.0
+        self.judge_requests = 0
+
+    # Function to get the current depth of every stage queue
+    def queue_depths(self) -> dict:
+        depths = {stage: self.queues[stage].qsize() for stage in self.STAGES}
+        depths["generation"] += self._retry_queue.qsize()
+        for stage, depth in depths.items():
+            self.max_queue_depth[stage] = max(self.max_queue_depth[stage], depth)
+        return depths
+
+    # Function to put a job on a queue without blocking forever once stopped
+    def _put(self, target: queue.Queue, job: PipelineJob):
+        while not self._stop.is_set():
+            try:
+                target.put(job, timeout=0.1)
+                self.queue_depths()
+                return
+            except queue.Full:
+                continue
+
+    # Function to take the next job from a queue, or None once stopped
+    def _get(self, source: queue.Queue, retry_first: bool = False):
+        while not self._stop.is_set():
+            if retry_first:
+                try:
+                    return self._retry_queue.get_nowait()
+                except queue.Empty:
+                    pass
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return None
+
+    # Function to mark a job as finished
+    def _finish(self, job: PipelineJob, error: Exception = None):
+        if error is not None:
+            job.error = error
+        self._results.put(job)
+
+    # Worker loop for the generation stage
+    def _generation_worker(self):
+        while True:
+            job = self._get(self.queues["generation"], retry_first=True)
+            if job is None:
+                return
+            start = time.perf_counter()
+            while True:
+                job.attempts += 1
+                try:
+                    job.document, job.png_bytes = job.benchmark.generate_svg(
+                        job.question["prompt"], job.requirements, job.index
+                    )
+                    self.scheduler.job_done(job, time.perf_counter() - start)
+                    break
+                except SVGValidationError as e:
+                    # A rejected SVG is scored 0 without rendering, judging or retrying
+                    job.benchmark.log(f"Rejected SVG for question {job.index}: {e}")
+                    self.scheduler.job_done(job, time.perf_counter() - start)
+                    job.rejection = e.reason
+                    self._finish(job)
+                    job = None
+                    break
+                except Exception as e:
+                    job.benchmark.log(f"Error generating question {job.index} (attempt {job.attempts}): {e}")
+                    if job.attempts >= MAX_ATTEMPTS:
+                        self.scheduler.job_done(job)
+                        self._finish(job, e)
+                        job = None
+                        break
+            if job is None:
+                continue
+            # Skip rendering if the cache already holds a render of this SVG
+            if job.png_bytes is not None:
+                self._put(self.queues["evaluation"], job)
+            else:
+                self._put(self.queues["rendering"], job)
+
+    # Worker loop for the rendering stage (dispatches to the process pool)
+    def _render_worker(self, executor: ProcessPoolExecutor):
+        while True:
+            job = self._get(self.queues["rendering"])
+            if job is None:
+                return
+            try:
+                png_bytes, elapsed = executor.submit(render_svg_in_worker, job.document).result()
+                job.benchmark.save_render(job.document, png_bytes, job.index)
+                job.benchmark.record_question_stats(job.index, "timings", {"rendering": elapsed})
+                job.png_bytes = png_bytes
+                with self._lock:
+                    self.renders += 1
+                    self.render_seconds += elapsed
+            except Exception as e:
+                job.benchmark.log(f"Error rendering question {job.index} (attempt {job.attempts}): {e}")
+                # A failed render means the SVG is regenerated, as a whole-question retry would
+                job.benchmark.invalidate_generation(job.question["prompt"], job.requirements)
+                if job.attempts >= MAX_ATTEMPTS:
+                    self._finish(job, e)
+                else:
+                    self._retry_queue.put(job)
+                continue
+            self._put(self.queues["evaluation"], job)
+
+    # Worker loop for the evaluation stage
+    def _evaluation_worker(self):
+        while True:
+            job = self._get(self.queues["evaluation"])
+            if job is None:
+                return
+            # Skip the judge if it has already graded an identical image against the same requirements
+            job.score = job.benchmark.load_cached_verdict(job.png_bytes, job.requirements, job.index)
+            if job.score is not None:
+                self._finish(job)
+                continue
+            # Grade single images, or collect a batch and fall back to single grading for what it missed
+            if self.judge_batch_size > 1:
+                pending = self._evaluate_batch(self._collect_batch(job))
+            else:
+                pending = [job]
+            for job in pending:
+                self._evaluate_single(job)
+
+    # Function to collect up to judge_batch_size jobs, waiting at most judge_batch_wait for more
+    def _collect_batch(self, first_job: PipelineJob) -> list:
+        batch = [first_job]
+        deadline = time.monotonic() + self.judge_batch_wait
+        while len(batch) < self.judge_batch_size and not self._stop.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                job = self.queues["evaluation"].get(timeout=remaining)
+            except queue.Empty:
+                break
+            job.score = job.benchmark.load_cached_verdict(job.png_bytes, job.requirements, job.index)
+            if job.score is not None:
+                self._finish(job)
+            else:
+                batch.append(job)
+        return batch
+
+    # Function to grade a batch in one request per judge, returning the jobs it could not grade
+    def _evaluate_batch(self, batch: list) -> list:
+        # Only jobs sharing a judge can go in the same request
+        groups = {}
+        for job in batch:
+            groups.setdefault(id(job.benchmark.evaluator_llm), []).append(job)
+        pending = []
+        for group in groups.values():
+            if len(group) == 1:
+                pending.extend(group)
+                continue
+            with self._lock:
+                self.judge_requests += 1
+            try:
+                scores = group[0].benchmark.evaluate_svg_batch(group)
+            except Exception as e:
+                group[0].benchmark.log(f"Error evaluating batch of {len(group)} questions, grading them one by one: {e}")
+                pending.extend(group)
+                continue
+            for job, score in zip(group, scores):
+                if score is None:
+                    pending.append(job)
+                else:
+                    job.score = score
+                    self._finish(job)
+        return pending
+
+    # Function to grade one job, retrying until it runs out of attempts
+    def _evaluate_single(self, job: PipelineJob):
+        while True:
+            with self._lock:
+                self.judge_requests += 1
+            try:
+                job.score = job.benchmark.evaluate_svg(
+                    job.question, job.index, job.requirements, job.requirements_num,
+                    png_bytes=job.png_bytes
+                )
+                self._finish(job)
+                return
+            except Exception as e:
+                job.benchmark.log(f"Error evaluating question {job.index} (attempt {job.attempts}): {e}")
+                if job.attempts >= MAX_ATTEMPTS:
+                    self._finish(job, e)
+                    return
+                job.attempts += 1
+
+    # Function to run jobs through the pipeline, yielding each job as it finishes
+    def run(self, jobs: list):
+        """
+        Run jobs through all stages.
+
+        Args:
+            jobs (list): PipelineJob instances to run
+
+        Yields:
+            PipelineJob: Each job once it has a score or has exhausted its attempts
+        """
+        if not jobs:
+            return
+        self._stop.clear()
+        executor = ProcessPoolExecutor(
+            max_workers=self.workers["rendering"],
+            initializer=init_render_worker,
+            initargs=(SVGRenderer.backend.name, self.max_renders_per_driver)
+        )
+        # Start the worker threads for each stage
+        threads = [threading.Thread(target=self._generation_worker, daemon=True) for _ in range(self.workers["generation"])]
+        threads += [threading.Thread(target=self._render_worker, args=(executor,), daemon=True) for _ in range(self.workers["rendering"])]
+        threads += [threading.Thread(target=self._evaluation_worker, daemon=True) for _ in range(self.workers["evaluation"])]
+        # Feed the generation queue from the scheduler in a separate thread, so the queue
+        # stays bounded and the next model is only chosen when a slot frees up
+        self.scheduler.add(jobs)
+        def feed():
+            while True:
+                job = self.scheduler.next_job(self._stop)
+                if job is None:
+                    return
+                self._put(self.queues["generation"], job)
+        threads.append(threading.Thread(target=feed, daemon=True))
+        for thread in threads:
+            thread.start()
+        completed = False
+        try:
+            for _ in range(len(jobs)):
+                yield self._results.get()
+            completed = True
+        finally:
+            # Stop the workers and the render processes (idle workers exit within 0.1s;
+            # on interruption, in-flight requests are abandoned to the daemon threads)
+            self._stop.set()
+            if completed:
+                for thread in threads:
+                    thread.join()
+            executor.shutdown(wait=completed, cancel_futures=True)
+
+    # Function to get render statistics
+    def render_stats(self, wall_seconds: float = None) -> dict:
+        with self._lock:
+            return {
+                "backend": SVGRenderer.backend.name,
+                "renders": self.renders,
+                "render_seconds": round(self.render_seconds, 3),
+                "mean_render_seconds": round(self.render_seconds / self.renders, 3) if self.renders else 0.0,
+                "renders_per_second": round(self.renders / wall_seconds, 3) if wall_seconds else 0.0
+            }
@@ -0,0 +1,26 @@
+import hashlib
+import json
+
+# Length of a question ID, in hex characters
+QUESTION_ID_LENGTH = 16
+
+# Function to compute the stable ID of a question from its content
+def question_id(question: dict) -> str:
+    """
+    Content hash of a question's prompt and requirements. Results entries and artifact
+    files are keyed by it, so they stay valid when questions are inserted, removed or
+    reordered. Results entries store the prompt and requirements too, so the same
+    function gives the ID of an entry.
+
+    Args:
+        question (dict): A question (or results entry) with "prompt" and "requirements"
+
+    Returns:
+        str: The question ID
+    """
+    content = json.dumps(
+        {"prompt": question["prompt"], "requirements": question["requirements"]},
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()[:QUESTION_ID_LENGTH]
@@ -0,0 +1,104 @@
+import os
+import sys
+import threading
+from collections import deque
+
+# Import the rate limiter
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from utils.rate_limit import RateLimiter
+
+# Class to decide which model's question is generated next when several models share a pipeline
+class ModelScheduler:
+
+    # Function to initialize the scheduler
+    def __init__(self, model_concurrency: int = None, latency_smoothing: float = 0.3):
+        """
+        Interleave questions from every model in one work queue. The model with the
+        longest expected generation latency goes first, so slow models start early and
+        their tail overlaps the fast ones instead of running after them. Models whose
+        latency is not known yet are tried first, to measure it.
+
+        Args:
+            model_concurrency (int): Maximum questions being generated per model (None for no cap)
+            latency_smoothing (float): Weight of the newest measurement in each model's expected latency
+        """
+        self.model_concurrency = model_concurrency
+        self.latency_smoothing = latency_smoothing
+        self._condition = threading.Condition()
+        self._pending = {}
+        self._model_in_flight = {}
+        self._endpoint_in_flight = {}
+        # Expected generation latency per benchmark, in seconds
+        self.expected_latency = {}
+
+    # Function to add jobs to the queue
+    def add(self, jobs: list):
+        with self._condition:
+            for job in jobs:
+                self._pending.setdefault(job.benchmark, deque()).append(job)
+                self._model_in_flight.setdefault(job.benchmark, 0)
+            self._condition.notify_all()
+
+    # Function to count the jobs not handed out yet
+    def remaining(self) -> int:
+        with self._condition:
+            return sum(len(jobs) for jobs in self._pending.values())
+
+    # Function to pick the benchmark whose next job should run, or None if every model is at its cap
+    def _pick(self):
+        candidates = []
+        for benchmark, jobs in self._pending.items():
+            if not jobs:
+                continue
+            if self.model_concurrency and self._model_in_flight[benchmark] >= self.model_concurrency:
+                continue
+            # Do not queue more work for an endpoint than its rate limiter currently lets through
+            endpoint = benchmark.llm.endpoint
+            if self._endpoint_in_flight.get(endpoint, 0) >= RateLimiter.for_endpoint(endpoint).limit:
+                continue
+            candidates.append(benchmark)
+        if not candidates:
+            return None
+        # Slowest expected latency first (unknown counts as slowest), then the least busy model
+        return min(candidates, key=lambda benchmark: (
+            -self.expected_latency.get(benchmark, float("inf")),
+            self._model_in_flight[benchmark]
+        ))
+
+    # Function to hand out the next job, waiting while every model is at its cap
+    def next_job(self, stop: threading.Event):
+        """Return the next job, or None once the queue is empty or stop is set."""
+        with self._condition:
+            while not stop.is_set():
+                if not any(self._pending.values()):
+                    return None
+                benchmark = self._pick()
+                if benchmark is not None:
+                    job = self._pending[benchmark].popleft()
+                    endpoint = benchmark.llm.endpoint
+                    self._model_in_flight[benchmark] += 1
+                    self._endpoint_in_flight[endpoint] = self._endpoint_in_flight.get(endpoint, 0) + 1
+                    job.scheduled = True
+                    return job
+                self._condition.wait(timeout=0.1)
+        return None
+
+    # Function to record that a job has left the generation stage
+    def job_done(self, job, generation_seconds: float = None):
+        with self._condition:
+            if not getattr(job, "scheduled", False):
+                return
+            job.scheduled = False
+            benchmark = job.benchmark
+            self._model_in_flight[benchmark] -= 1
+            self._endpoint_in_flight[benchmark.llm.endpoint] -= 1
+            # Update the model's expected latency
+            if generation_seconds is not None:
+                previous = self.expected_latency.get(benchmark)
+                if previous is None:
+                    self.expected_latency[benchmark] = generation_seconds
+                else:
+                    self.expected_latency[benchmark] = (
+                        self.latency_smoothing * generation_seconds + (1 - self.latency_smoothing) * previous
+                    )
+            self._condition.notify_all()
@@ -0,0 +1,247 @@
+import argparse
+import itertools
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# Add the src directory to the path so we can import from benchmark
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from benchmark.benchmark import Benchmark
+from benchmark.mock_server import MockLLMServer
+from utils.content_cache import ContentCache
+from utils.render_backends import RENDERER_BACKENDS
+from utils.svg_renderer import SVGRenderer
+
+# Cache settings the harness can sweep
+CACHE_MODES = ("off", "cold", "warm")
+
+# Function to get the peak resident set size from a resource usage record, in MB
+def _peak_rss_mb(usage) -> float:
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return usage.ru_maxrss / divisor
+
+# Function to run one configuration in this process and measure it
+def run_configuration(
+        endpoint: str,
+        workers: int,
+        renderer: str,
+        cache_mode: str,
+        run_full_benchmark: bool = True,
+        render_workers: int = None,
+        judge_batch_size: int = 1,
+        stream: bool = False
+) -> dict:
+    """
+    Run the benchmark once against a mock endpoint and measure it. Results and the cache
+    go to a temporary directory, so the real results are never touched.
+
+    Args:
+        endpoint (str): Mock endpoint used for both generation and judging
+        workers (int): Generation (and evaluation) workers
+        renderer (str): Renderer backend name
+        cache_mode (str): "off", "cold" (empty cache) or "warm" (cache filled by an untimed run first)
+        run_full_benchmark (bool): Use questions.json instead of test_questions.json
+        render_workers (int): Render processes (default: number of CPUs)
+        judge_batch_size (int): Rendered images graded per judge request
+        stream (bool): Stream generations
+
+    Returns:
+        dict: The configuration and its questions/sec, CPU time, peak RSS and stage latencies
+    """
+    SVGRenderer.set_backend(renderer)
+    work_dir = tempfile.mkdtemp(prefix="svgbench-harness-")
+    try:
+        cache = ContentCache(cache_dir=None if cache_mode == "off" else os.path.join(work_dir, "cache"))
+
+        # Function to create a benchmark writing to a directory of the temporary work directory
+        def create_benchmark(name: str) -> Benchmark:
+            return Benchmark(
+                model="mock/model",
+                endpoint=endpoint,
+                api_key="mock",
+                open_router_endpoint=endpoint,
+                judge_model="mock/judge",
+                cache=cache,
+                stream=stream,
+                results_root=os.path.join(work_dir, name)
+            )
+
+        run_options = {
+            "run_full_benchmark": run_full_benchmark,
+            "max_workers": workers,
+            "render_workers": render_workers,
+            "judge_batch_size": judge_batch_size
+        }
+        # Fill the cache without measuring
+        if cache_mode == "warm":
+            create_benchmark("warmup").run(**run_options)
+        # Measure the run (render processes are children, counted once they exit with the pipeline)
+        self_before = resource.getrusage(resource.RUSAGE_SELF)
+        children_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+        start = time.perf_counter()
+        results = create_benchmark("results").run(**run_options)
+        wall_seconds = time.perf_counter() - start
+        self_after = resource.getrusage(resource.RUSAGE_SELF)
+        children_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    cpu_seconds = (
+        (self_after.ru_utime - self_before.ru_utime) + (self_after.ru_stime - self_before.ru_stime)
+        + (children_after.ru_utime - children_before.ru_utime) + (children_after.ru_stime - children_before.ru_stime)
+    )
+    questions = len(results["question_scores"])
+    return {
+        "workers": workers,
+        "renderer": renderer,
+        "cache": cache_mode,
+        "questions": questions,
+        "errors": sum(1 for item in results["question_scores"] if "error" in item),
+        "wall_seconds": round(wall_seconds, 3),
+        "questions_per_second": round(questions / wall_seconds, 3) if wall_seconds else 0.0,
+        "cpu_seconds": round(cpu_seconds, 3),
+        "cpu_seconds_per_question": round(cpu_seconds / questions, 4) if questions else 0.0,
+        "peak_rss_mb": round(_peak_rss_mb(self_after), 1),
+        "peak_render_rss_mb": round(_peak_rss_mb(children_after), 1),
+        "stage_latency": results.get("stage_latency", {})
+    }
+
+# Function to run every combination of settings, each in a fresh process
+def sweep(
+        workers: list,
+        renderers: list,
+        cache_modes: list,
+        run_full_benchmark: bool = True,
+        render_workers: int = None,
+        judge_batch_size: int = 1,
+        stream: bool = False,
+        verbose: bool = False,
+        **server_options
+) -> list:
+    """
+    Start a mock endpoint and measure every combination of workers, renderer and cache
+    setting. Each configuration runs in its own process so its CPU time and peak RSS
+    are not mixed with the others'.
+
+    Args:
+        workers (list): Worker counts to try
+        renderers (list): Renderer backends to try (unavailable ones are skipped)
+        cache_modes (list): Cache settings to try ("off", "cold", "warm")
+        run_full_benchmark (bool): Use questions.json instead of test_questions.json
+        render_workers (int): Render processes (default: number of CPUs)
+        judge_batch_size (int): Rendered images graded per judge request
+        stream (bool): Stream generations
+        verbose (bool): Show the benchmark's own output
+        **server_options: Options for MockLLMServer (latencies, error rates, ...)
+
+    Returns:
+        list: One metrics dict per configuration
+    """
+    for renderer in renderers:
+        if not RENDERER_BACKENDS[renderer].is_available():
+            print(f"Skipping renderer '{renderer}': not available")
+    renderers = [renderer for renderer in renderers if RENDERER_BACKENDS[renderer].is_available()]
+    server = MockLLMServer(**server_options).start()
+    reports = []
+    try:
+        for worker_count, renderer, cache_mode in itertools.product(workers, renderers, cache_modes):
+            config = {
+                "endpoint": server.endpoint,
+                "workers": worker_count,
+                "renderer": renderer,
+                "cache_mode": cache_mode,
+                "run_full_benchmark": run_full_benchmark,
+                "render_workers": render_workers,
+                "judge_batch_size": judge_batch_size,
+                "stream": stream
+            }
+            with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as metrics_file:
+                metrics_path = metrics_file.name
+            try:
+                output = None if verbose else subprocess.DEVNULL
+                completed = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--run-config", json.dumps(config), "--metrics-file", metrics_path],
+                    stdout=output,
+                    stderr=output
+                )
+                if completed.returncode != 0:
+                    print(f"Configuration failed (exit code {completed.returncode}): workers={worker_count} renderer={renderer} cache={cache_mode}")
+                    continue
+                with open(metrics_path, "r") as file:
+                    report = json.load(file)
+            finally:
+                os.remove(metrics_path)
+            reports.append(report)
+            print(_format_row(report))
+    finally:
+        server.shutdown()
+    return reports
+
+# Function to format one report as a table row
+def _format_row(report: dict) -> str:
+    return (
+        f"workers={report['workers']:<4} renderer={report['renderer']:<9} cache={report['cache']:<5} "
+        f"{report['questions_per_second']:>8.2f} q/s  {report['cpu_seconds']:>8.2f}s CPU  "
+        f"{report['peak_rss_mb']:>7.1f}MB RSS ({report['peak_render_rss_mb']:.1f}MB render)  "
+        f"{report['errors']} errors"
+    )
+
+# Run the harness from the command line
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Measure pipeline throughput offline against a mock OpenAI compatible endpoint.')
+    parser.add_argument('--workers', default='1,8,25', help='Comma-separated worker counts to sweep (default: 1,8,25)')
+    parser.add_argument('--renderers', default='chrome', help=f'Comma-separated renderer backends to sweep, from: {", ".join(RENDERER_BACKENDS)} (default: chrome)')
+    parser.add_argument('--cache', default='off', help='Comma-separated cache settings to sweep, from: off, cold, warm (default: off)')
+    parser.add_argument('--test-questions', action='store_true', help='Use the small test question set instead of the full benchmark')
+    parser.add_argument('--render-workers', type=int, help='Number of render processes (default: number of CPUs)')
+    parser.add_argument('--judge-batch-size', type=int, default=1, help='Rendered images graded per judge request (default: 1)')
+    parser.add_argument('--stream', action='store_true', help='Stream generations')
+    parser.add_argument('--generation-latency', default='fixed:0.5', help='Mock generation latency, e.g. fixed:0.5, uniform:0.2,1.5, lognormal:0.8,0.5, exponential:0.5 (default: fixed:0.5)')
+    parser.add_argument('--judge-latency', default='fixed:0.3', help='Mock judge latency distribution (default: fixed:0.3)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of mock requests answered with HTTP 500 (default: 0)')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Fraction of mock requests answered with HTTP 429 (default: 0)')
+    parser.add_argument('--seed', type=int, help='Random seed for the mock endpoint')
+    parser.add_argument('--output', help='Write the reports to this JSON file')
+    parser.add_argument('--verbose', action='store_true', help="Show the benchmark's own output")
+    # Internal: run one configuration in this process
+    parser.add_argument('--run-config', help=argparse.SUPPRESS)
+    parser.add_argument('--metrics-file', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.run_config:
+        report = run_configuration(**json.loads(args.run_config))
+        with open(args.metrics_file, "w") as file:
+            json.dump(report, file)
+        sys.exit(0)
+    # Validate the sweep
+    renderers = args.renderers.split(",")
+    cache_modes = args.cache.split(",")
+    for renderer in renderers:
+        if renderer not in RENDERER_BACKENDS:
+            parser.error(f"Unknown renderer '{renderer}'")
+    for cache_mode in cache_modes:
+        if cache_mode not in CACHE_MODES:
+            parser.error(f"Unknown cache setting '{cache_mode}'")
+    reports = sweep(
+        workers=[int(value) for value in args.workers.split(",")],
+        renderers=renderers,
+        cache_modes=cache_modes,
+        run_full_benchmark=not args.test_questions,
+        render_workers=args.render_workers,
+        judge_batch_size=args.judge_batch_size,
+        stream=args.stream,
+        verbose=args.verbose,
+        generation_latency=args.generation_latency,
+        judge_latency=args.judge_latency,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        seed=args.seed
+    )
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(reports, file, indent=2)
+        print(f"Reports saved to: {args.output}")
@@ -0,0 +1,91 @@
+import argparse
+import json
+import os
+import sys
+
+# Add the src directory to the path so we can import from benchmark
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from benchmark.journal import ResultsJournal
+from benchmark.questions import question_id
+
+# Artifact extensions renamed with each question
+ARTIFACT_EXTENSIONS = ("png", "svg", "thumb.webp")
+
+# Function to migrate one model's results directory to question IDs
+def migrate_model(model_dir: str, dry_run: bool = False) -> dict:
+    """
+    Add question IDs to a model's results and journal, and rename its question_<index>
+    artifacts to question_<id>. Entries that already have an ID are left alone, so the
+    migration can be run again safely.
+
+    Args:
+        model_dir (str): A results/<model> directory
+        dry_run (bool): Report what would change without changing anything
+
+    Returns:
+        dict: Number of entries given an ID and artifacts renamed
+    """
+    report = {"entries": 0, "artifacts": 0}
+    results_path = os.path.join(model_dir, "benchmark_results.json")
+    results = None
+    if os.path.exists(results_path):
+        with open(results_path, "r") as file:
+            results = json.load(file)
+    journal = ResultsJournal(model_dir)
+    journal_entries = journal.replay()
+    # Map every index used by an entry without an ID to the ID of its content
+    renames = {}
+    entries = (results or {}).get("question_scores", []) + journal_entries
+    for entry in entries:
+        if "question_id" in entry:
+            continue
+        qid = question_id(entry)
+        if renames.get(entry["question_index"], qid) != qid:
+            print(f"Warning: {model_dir}: question {entry['question_index']} has results for two different questions; keeping the first")
+            continue
+        renames[entry["question_index"]] = qid
+        entry["question_id"] = qid
+        report["entries"] += 1
+    # Rename the artifacts (all renames are checked first, so a name is never overwritten)
+    moves = []
+    for index, qid in renames.items():
+        for extension in ARTIFACT_EXTENSIONS:
+            source = os.path.join(model_dir, f"question_{index}.{extension}")
+            target = os.path.join(model_dir, f"question_{qid}.{extension}")
+            if os.path.exists(source) and not os.path.exists(target):
+                moves.append((source, target))
+    report["artifacts"] = len(moves)
+    if dry_run or not renames:
+        return report
+    for source, target in moves:
+        os.replace(source, target)
+    if results is not None:
+        ResultsJournal.write_json_atomic(results_path, results)
+    if journal_entries:
+        # Rewrite the journal with the IDs added
+        temp_path = f"{journal.path}.tmp"
+        with open(temp_path, "w") as file:
+            for entry in journal_entries:
+                file.write(json.dumps(entry) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, journal.path)
+    return report
+
+# Run the migration from the command line
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Migrate results keyed by question index to stable question IDs.')
+    parser.add_argument('--results-dir', default='results', help='Directory holding the results/<model> directories (default: results)')
+    parser.add_argument('--dry-run', action='store_true', help='Report what would change without changing anything')
+    args = parser.parse_args()
+    if not os.path.isdir(args.results_dir):
+        print(f"Error: {args.results_dir} is not a directory")
+        sys.exit(1)
+    for name in sorted(os.listdir(args.results_dir)):
+        model_dir = os.path.join(args.results_dir, name)
+        if name == "webUI" or not os.path.isdir(model_dir):
+            continue
+        report = migrate_model(model_dir, dry_run=args.dry_run)
+        if report["entries"] or report["artifacts"]:
+            action = "Would migrate" if args.dry_run else "Migrated"
+            print(f"{action} {name}: {report['entries']} entries, {report['artifacts']} artifacts renamed")
@@ -0,0 +1,255 @@
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from dotenv import load_dotenv
+from tqdm import tqdm
+
+# Add the src directory to the path so we can import from benchmark
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from benchmark.benchmark import Benchmark
+from benchmark.journal import ResultsJournal
+from benchmark.pipeline import PipelineJob
+from utils.artifact_store import ArtifactStore
+from utils.content_cache import ContentCache
+from utils.image_upload import ImagePreparer, IMAGE_FORMATS
+from utils.rate_limit import RateLimiter
+
+# Function to find the models with results in a results directory
+def find_models(results_root: str) -> list:
+    """Return the model names of every results/<model> directory holding a benchmark_results.json."""
+    models = []
+    for name in sorted(os.listdir(results_root)):
+        results_path = os.path.join(results_root, name, "benchmark_results.json")
+        if name == "webUI" or not os.path.exists(results_path):
+            continue
+        with open(results_path, "r") as file:
+            models.append(json.load(file)["model"])
+    return models
+
+# Function to read the rendered image of a results entry, or None if there is none
+def _read_render(benchmark: Benchmark, entry: dict, store: ArtifactStore):
+    # Artifacts are named by question ID, or by index for results that were never migrated
+    for name in (entry.get("question_id"), entry["question_index"]):
+        if name is None:
+            continue
+        path = os.path.join(benchmark.results_dir, f"question_{name}.png")
+        if os.path.exists(path):
+            with open(path, "rb") as file:
+                return file.read()
+        # Renders written with --artifact-store packed
+        data = store.get(f"question_{name}.png") if store is not None else None
+        if data is not None:
+            return data
+    return None
+
+# Function to collect the questions of one model that can be judged again
+def collect_jobs(benchmark: Benchmark) -> tuple:
+    """
+    Read a model's results and pair each question with its rendered image.
+
+    Returns:
+        tuple: (results, jobs, kept, skipped) where jobs are PipelineJobs with png_bytes set,
+            kept are entries scored without the judge (SVGs rejected before rendering) and
+            skipped counts questions without a render (e.g. failed generations)
+    """
+    with open(os.path.join(benchmark.results_dir, "benchmark_results.json"), "r") as file:
+        results = json.load(file)
+    store = ArtifactStore.open_existing(benchmark.results_dir)
+    jobs, kept, skipped = [], [], 0
+    for entry in results["question_scores"]:
+        if "rejected" in entry:
+            kept.append(entry)
+            continue
+        png_bytes = _read_render(benchmark, entry, store) if "error" not in entry else None
+        if png_bytes is None:
+            skipped += 1
+            continue
+        job = PipelineJob(benchmark, entry["question_index"], entry)
+        job.png_bytes = png_bytes
+        jobs.append(job)
+    if store is not None:
+        store.close()
+    return results, jobs, kept, skipped
+
+# Function to judge one job (unless an identical image was already graded with the same judge and prompt)
+def judge_job(job: PipelineJob) -> PipelineJob:
+    benchmark = job.benchmark
+    try:
+        job.score = benchmark.load_cached_verdict(job.png_bytes, job.requirements, job.index)
+        if job.score is None:
+            job.score = benchmark.evaluate_svg(job.question, job.index, job.requirements, job.requirements_num, png_bytes=job.png_bytes)
+    except Exception as e:
+        job.error = e
+    return job
+
+# Function to judge a batch of jobs in one request, falling back to one at a time for any the judge missed
+def judge_batch(jobs: list) -> list:
+    pending = []
+    for job in jobs:
+        job.score = job.benchmark.load_cached_verdict(job.png_bytes, job.requirements, job.index)
+        if job.score is None:
+            pending.append(job)
+    if len(pending) > 1:
+        try:
+            scores = pending[0].benchmark.evaluate_svg_batch(pending)
+        except Exception as e:
+            tqdm.write(f"Batch judge request failed ({e}); grading one at a time.")
+            scores = [None] * len(pending)
+        for job, score in zip(pending, scores):
+            job.score = score
+    for job in pending:
+        if job.score is None:
+            judge_job(job)
+    return jobs
+
+# Function to write a model's judge-specific score file
+def save_scores(benchmark: Benchmark, results: dict, jobs: list, kept: list, skipped: int, start_time: datetime) -> dict:
+    entries = []
+    for job in jobs:
+        entry = {
+            "question_index": job.index,
+            "question_id": job.question.get("question_id"),
+            "prompt": job.question["prompt"],
+            "requirements": job.question["requirements"],
+            "score": job.score if job.error is None else 0.0,
+            "original_score": job.question["score"]
+        }
+        with benchmark._stats_lock:
+            entry.update(benchmark.question_stats.pop(job.index, {}))
+        if job.error is not None:
+            entry["error"] = str(job.error)
+        entries.append(entry)
+    for item in kept:
+        entries.append({
+            "question_index": item["question_index"],
+            "question_id": item.get("question_id"),
+            "prompt": item["prompt"],
+            "requirements": item["requirements"],
+            "score": 0.0,
+            "original_score": item["score"],
+            "rejected": item["rejected"]
+        })
+    entries.sort(key=lambda item: item["question_index"])
+    scores = {
+        "model": results["model"],
+        "judge_model": benchmark.judge_model,
+        "judge_endpoint": benchmark.judge_endpoint,
+        "judge_image": benchmark.image_preparer.settings,
+        "results_timestamp": results.get("end_timestamp"),
+        "start_timestamp": start_time.isoformat(),
+        "end_timestamp": datetime.now().isoformat(),
+        "total_questions": results.get("total_questions", len(results["question_scores"])),
+        "skipped_questions": skipped,
+        "question_scores": entries,
+        "average_score": sum(item["score"] for item in entries) / len(entries) if entries else 0.0,
+        "original_average_score": results.get("average_score")
+    }
+    token_usage = {}
+    for item in entries:
+        for key, value in item.get("judge_usage", {}).items():
+            token_usage[key] = token_usage.get(key, 0) + value
+    if token_usage:
+        scores["token_usage"] = {"judging": token_usage}
+    ResultsJournal.write_json_atomic(benchmark.judge_scores_path, scores)
+    return scores
+
+# Function to judge the existing renders of several models again
+def rejudge(benchmarks: list, max_workers: int = 25, judge_batch_size: int = 1) -> list:
+    """
+    Grade the rendered images already in each model's results directory with the
+    benchmarks' judge, without generating or rendering anything. Every model's
+    questions share one pool of judge workers. Each model's scores are written to its
+    judge_scores_<judge>.json (benchmark_results.json is left alone); verdicts are cached
+    as they arrive, so an interrupted re-judge picks up where it stopped.
+
+    Args:
+        benchmarks (list): Benchmark instances, one per model, configured with the new judge
+        max_workers (int): Judge requests in flight
+        judge_batch_size (int): Images graded per judge request
+
+    Returns:
+        list: The score summary of each model, in the order of benchmarks
+    """
+    start_time = datetime.now()
+    collected = [collect_jobs(benchmark) for benchmark in benchmarks]
+    jobs = [job for _, model_jobs, _, _ in collected for job in model_jobs]
+    # Batch images of the same model together, so a failed batch only affects one model
+    batches = []
+    for _, model_jobs, _, _ in collected:
+        batches.extend(model_jobs[i:i + judge_batch_size] for i in range(0, len(model_jobs), judge_batch_size))
+    with tqdm(total=len(jobs), desc="Judging") as progress_bar:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(judge_batch, batch) if len(batch) > 1 else executor.submit(judge_job, batch[0])
+                for batch in batches
+            ]
+            for future in as_completed(futures):
+                finished = future.result()
+                progress_bar.update(len(finished) if isinstance(finished, list) else 1)
+    summaries = []
+    for benchmark, (results, model_jobs, kept, skipped) in zip(benchmarks, collected):
+        for job in model_jobs:
+            if job.error is not None:
+                tqdm.write(f"Failed to judge question {job.index} of {benchmark.llm.model}: {job.error}")
+        scores = save_scores(benchmark, results, model_jobs, kept, skipped, start_time)
+        summaries.append(scores)
+        original = scores["original_average_score"]
+        print(
+            f"{benchmark.llm.model}: {scores['average_score']:.3f} with {benchmark.judge_model}"
+            + (f" (was {original:.3f})" if original is not None else "")
+            + (f", {skipped} questions without a render skipped" if skipped else "")
+        )
+        print(f"Scores saved to: {benchmark.judge_scores_path}")
+    return summaries
+
+# Run the re-judge from the command line
+if __name__ == "__main__":
+    # Load environment variables from .env file
+    load_dotenv()
+    parser = argparse.ArgumentParser(description='Grade the existing renders of benchmarked models with a (new) judge, without generating anything.')
+    parser.add_argument('--model', help='Models to re-judge, separated by semicolons (default: every model in --results-dir)')
+    parser.add_argument('--results-dir', default='results', help='Directory holding the results/<model> directories (default: results)')
+    parser.add_argument('--judge-model', default='google/gemini-2.5-flash', help='The model used to grade rendered SVGs (default: google/gemini-2.5-flash)')
+    parser.add_argument('--judge-endpoint', default='https://openrouter.ai/api/v1', help='The OpenAI compatible endpoint for the judge model (default: https://openrouter.ai/api/v1)')
+    parser.add_argument('--judge-api-key', default=os.getenv('OPENROUTER_API_KEY'), help='API key for the judge endpoint')
+    parser.add_argument('--workers', type=int, default=25, help='Number of concurrent judge requests (default: 25)')
+    parser.add_argument('--judge-batch-size', type=int, default=1, help='Grade this many images per judge request (default: 1, no batching)')
+    parser.add_argument('--judge-image-max-edge', type=int, default=0, help='Downscale images to this many pixels on their longest edge (default: 0, full size)')
+    parser.add_argument('--judge-image-format', choices=list(IMAGE_FORMATS), default='png', help='Format images are re-encoded to before sending them to the judge; jpeg and webp are lossy (default: png, lossless)')
+    parser.add_argument('--requests-per-second', type=float, help='Maximum judge request rate (default: unlimited, paced only by 429 responses)')
+    parser.add_argument('--cache-dir', default='cache', help='Directory of the content-addressed cache (default: cache)')
+    parser.add_argument('--no-cache', action='store_true', help='Grade every image again, even if it was already graded with the same judge and prompt')
+    args = parser.parse_args()
+    if args.judge_batch_size < 1:
+        parser.error("--judge-batch-size must be at least 1")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if not args.judge_api_key:
+        print("Error: API key must be provided via --judge-api-key argument or OPENROUTER_API_KEY environment variable")
+        sys.exit(1)
+    RateLimiter.set_defaults(requests_per_second=args.requests_per_second)
+    models = args.model.split(";") if args.model else find_models(args.results_dir)
+    if not models:
+        print(f"No results found in {args.results_dir}")
+        sys.exit(1)
+    cache = ContentCache(cache_dir=None if args.no_cache else args.cache_dir)
+    image_preparer = ImagePreparer(max_edge=args.judge_image_max_edge, image_format=args.judge_image_format)
+    # The model under test is never called, so its client points at the judge endpoint
+    benchmarks = [
+        Benchmark(
+            model=model,
+            endpoint=args.judge_endpoint,
+            api_key=args.judge_api_key,
+            judge_model=args.judge_model,
+            judge_endpoint=args.judge_endpoint,
+            judge_api_key=args.judge_api_key,
+            cache=cache,
+            results_root=args.results_dir,
+            image_preparer=image_preparer
+        )
+        for model in models
+    ]
+    rejudge(benchmarks, max_workers=args.workers, judge_batch_size=args.judge_batch_size)
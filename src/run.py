@@ -1,13 +1,20 @@
 import argparse
+import asyncio
 import os
 import sys
-import shutil
-import subprocess
 from dotenv import load_dotenv
 
 # Add the src directory to the path so we can import from benchmark
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from benchmark.benchmark import Benchmark
+from benchmark.benchmark import Benchmark, ARTIFACT_STORES
+from utils.svg_renderer import SVGRenderer
+from utils.render_backends import RENDERER_BACKENDS
+from utils.content_cache import ContentCache
+from utils.rate_limit import RateLimiter
+from utils.svg_validation import SVGValidator
+from utils.image_upload import ImagePreparer, IMAGE_FORMATS
+from utils.thumbnails import generate_all_thumbnails
+from utils.results_server import ResultsServer
 
 # Main function to run the benchmark
 def main():
@@ -56,8 +63,147 @@ def main():
         type=int,
         help='Maximum number of output tokens for the response'
     )
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Stream generations and stop as soon as a complete SVG has arrived, skipping any text the model writes after it'
+    )
+    parser.add_argument(
+        '--renderer',
+        choices=list(RENDERER_BACKENDS),
+        default='chrome',
+        help='The SVG rasterizer to use: "chrome" for browser-exact output, "cairosvg" for fast in-process rendering (default: chrome)'
+    )
+    parser.add_argument(
+        '--generation-workers',
+        type=int,
+        default=25,
+        help='Number of concurrent requests to the model under test (default: 25)'
+    )
+    parser.add_argument(
+        '--render-workers',
+        type=int,
+        help='Number of render processes (default: number of CPUs)'
+    )
+    parser.add_argument(
+        '--evaluation-workers',
+        type=int,
+        help='Number of concurrent evaluation requests (default: --judge-concurrency if set, otherwise --generation-workers)'
+    )
+    parser.add_argument(
+        '--model-concurrency',
+        type=int,
+        help='Maximum questions being generated per model when testing several models (default: no cap)'
+    )
+    parser.add_argument(
+        '--judge-model',
+        default='google/gemini-2.5-flash',
+        help='The model used to grade rendered SVGs (default: google/gemini-2.5-flash)'
+    )
+    parser.add_argument(
+        '--judge-endpoint',
+        help='The OpenAI compatible endpoint for the judge model (default: --open-router-endpoint)'
+    )
+    parser.add_argument(
+        '--judge-api-key',
+        help='API key for the judge endpoint (default: --open-router-api-key)'
+    )
+    parser.add_argument(
+        '--judge-concurrency',
+        type=int,
+        help='Maximum judge requests in flight across all models, separate from generation concurrency (default: unlimited)'
+    )
+    parser.add_argument(
+        '--judge-batch-size',
+        type=int,
+        default=1,
+        help='Grade this many rendered images per judge request, falling back to one at a time for any it misses (default: 1, no batching)'
+    )
+    parser.add_argument(
+        '--judge-image-max-edge',
+        type=int,
+        default=0,
+        help='Downscale rendered images to this many pixels on their longest edge before sending them to the judge (default: 0, full size)'
+    )
+    parser.add_argument(
+        '--judge-image-format',
+        choices=list(IMAGE_FORMATS),
+        default='png',
+        help='Format rendered images are re-encoded to before sending them to the judge; jpeg and webp are lossy (default: png, lossless)'
+    )
+    parser.add_argument(
+        '--requests-per-second',
+        type=float,
+        help='Maximum request rate per endpoint (default: unlimited, paced only by 429 responses)'
+    )
+    parser.add_argument(
+        '--endpoint-concurrency',
+        type=int,
+        default=64,
+        help='Starting and maximum number of requests in flight per endpoint; halved on every 429 and regrown on success (default: 64)'
+    )
+    parser.add_argument(
+        '--max-retries',
+        type=int,
+        default=5,
+        help='Retries of rate-limited, timed-out or server-error requests, with exponential backoff (default: 5)'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        default='cache',
+        help='Directory for the content-addressed cache of generations, renders and judge verdicts (default: cache)'
+    )
+    parser.add_argument(
+        '--cache-max-mb',
+        type=int,
+        default=1024,
+        help='Maximum cache size in MB before the least recently used entries are evicted (default: 1024)'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Always call the models and the renderer instead of reusing cached results'
+    )
+    parser.add_argument(
+        '--max-svg-kb',
+        type=int,
+        default=1024,
+        help='Reject generated SVGs larger than this many KB without rendering them (default: 1024)'
+    )
+    parser.add_argument(
+        '--max-svg-elements',
+        type=int,
+        default=10000,
+        help='Reject generated SVGs with more elements than this without rendering them (default: 10000)'
+    )
+    parser.add_argument(
+        '--max-canvas-size',
+        type=int,
+        default=4096,
+        help='Longest canvas edge in pixels; larger canvases are scaled down (default: 4096)'
+    )
+    parser.add_argument(
+        '--reject-large-canvas',
+        action='store_true',
+        help='Reject SVGs whose canvas exceeds --max-canvas-size instead of scaling them down'
+    )
+    parser.add_argument(
+        '--artifact-store',
+        choices=list(ARTIFACT_STORES),
+        default='files',
+        help='Save each question\'s SVG and render as loose files, or "packed" into one SQLite file per model (default: files)'
+    )
+    parser.add_argument(
+        '--async',
+        dest='use_async',
+        action='store_true',
+        help='Run all models concurrently on one asyncio event loop instead of worker threads'
+    )
     # Parse arguments
     args = parser.parse_args()
+    # The asyncio runner has no judge batching and no per-model cap, so don't silently ignore them
+    if args.use_async and (args.judge_batch_size != 1 or args.model_concurrency is not None):
+        parser.error("--judge-batch-size and --model-concurrency are not supported with --async")
     # Get API key from argument or environment variable
     api_key = args.api_key or os.getenv('OPENROUTER_API_KEY')
     if not api_key:
@@ -65,10 +211,37 @@ def main():
         sys.exit(1)
     # Get OpenRouter API key from argument or use the main API key as fallback
     open_router_api_key = args.open_router_api_key or api_key
+    # Select the SVG rasterizer
+    try:
+        SVGRenderer.set_backend(args.renderer)
+    except (ValueError, ImportError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    # Configure the per-endpoint rate limiters before any client is created
+    RateLimiter.set_defaults(
+        requests_per_second=args.requests_per_second,
+        max_concurrency=args.endpoint_concurrency,
+        max_retries=args.max_retries
+    )
+    # Share one cache between all models
+    cache = ContentCache(
+        cache_dir=None if args.no_cache else args.cache_dir,
+        max_bytes=args.cache_max_mb * 1024 * 1024
+    )
+    # Check every generated SVG against the same limits before rendering
+    validator = SVGValidator(
+        max_bytes=args.max_svg_kb * 1024,
+        max_elements=args.max_svg_elements,
+        max_canvas_edge=args.max_canvas_size,
+        max_canvas_pixels=args.max_canvas_size * args.max_canvas_size,
+        clamp_canvas=not args.reject_large_canvas
+    )
+    # Prepare every image sent to the judge the same way (and encode each one once)
+    image_preparer = ImagePreparer(max_edge=args.judge_image_max_edge, image_format=args.judge_image_format)
     # Create benchmark instance for each model
     models = args.model.split(";")
-    for model in models:
-        benchmark = Benchmark(
+    benchmarks = [
+        Benchmark(
             model=model,
             endpoint=args.endpoint,
             api_key=api_key,
@@ -76,10 +249,44 @@ def main():
             open_router_endpoint=args.open_router_endpoint,
             reasoning_effort=args.reasoning_effort,
             reasoning_max_tokens=args.reasoning_max_tokens,
-            max_output_tokens=args.max_output_tokens
+            max_output_tokens=args.max_output_tokens,
+            judge_model=args.judge_model,
+            judge_endpoint=args.judge_endpoint,
+            judge_api_key=args.judge_api_key,
+            judge_concurrency=args.judge_concurrency,
+            cache=cache,
+            stream=args.stream,
+            validator=validator,
+            image_preparer=image_preparer,
+            artifact_store=args.artifact_store
+        )
+        for model in models
+    ]
+    if args.use_async:
+        # Run every model at once on a single event loop
+        asyncio.run(Benchmark.run_all_async(
+            benchmarks,
+            run_full_benchmark=True,
+            max_concurrency=args.generation_workers,
+            evaluation_concurrency=args.evaluation_workers,
+            render_workers=args.render_workers
+        ))
+    else:
+        # Interleave every model's questions in one pipeline, slowest model first
+        Benchmark.run_all(
+            benchmarks,
+            run_full_benchmark=True,
+            max_workers=args.generation_workers,
+            render_workers=args.render_workers,
+            evaluation_workers=args.evaluation_workers,
+            judge_batch_size=args.judge_batch_size,
+            model_concurrency=args.model_concurrency
         )
-        # Run the benchmark
-        benchmark.run(run_full_benchmark=True)
+    
+    # Create the webUI's preview thumbnails of the new renders
+    count = generate_all_thumbnails([benchmark.results_dir for benchmark in benchmarks])
+    if count:
+        print(f"Created {count} preview thumbnails for webUI.")
     
     # Update the models list for the webUI
     try:
@@ -107,18 +314,10 @@ def main():
     
     # Run the webUI with user confirmation
     if input("Run the webUI? (y/n): ").lower() == "y":
-        # Start the server from the results directory
-        if shutil.which("python"):
-            # Notify the user that the server is running
-            print("WebUI started at http://localhost:8000/webUI")
-            subprocess.run(["python", "-m", "http.server", "8000"], cwd="results/")
-        elif shutil.which("python3"):
-            # Notify the user that the server is running
-            print("WebUI started at http://localhost:8000/webUI")
-            subprocess.run(["python3", "-m", "http.server", "8000"], cwd="results/")
-        else:
-            print("Error: Neither 'python' nor 'python3' command found")
-            sys.exit(1)
+        # Serve the results directory (threaded, compressed and cacheable) until interrupted
+        server = ResultsServer(results_root="results", port=8000)
+        print(f"WebUI started at {server.url}/webUI")
+        server.serve_forever()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,191 @@
+import argparse
+import os
+import sqlite3
+import threading
+import time
+
+# Name of the packed store in a model's results directory
+STORE_FILENAME = "artifacts.sqlite"
+
+# Bytes of the store SQLite may memory-map for reads
+MMAP_BYTES = 256 * 1024 * 1024
+
+# Class storing a model's artifacts (SVGs, renders, thumbnails) in one SQLite file
+class ArtifactStore:
+
+    # Function to initialize the store
+    def __init__(self, path: str):
+        """
+        Packed alternative to writing each question's SVG and PNG as separate files.
+        Artifacts keep their file names (e.g. question_<id>.png) as keys, so tools can look
+        them up the same way in either layout. Reads are memory-mapped, ranges are read
+        without loading the whole artifact, and each thread gets its own connection (the
+        database is in WAL mode, so readers never wait for a writer).
+
+        Args:
+            path (str): Path of the SQLite file (created on first write)
+        """
+        self.path = path
+        self._local = threading.local()
+        # Every thread's connection, so close() can close them all
+        self._connections = []
+        self._connections_lock = threading.Lock()
+
+    # Function to open the store of a results directory if it has one
+    @classmethod
+    def open_existing(cls, results_dir: str):
+        path = os.path.join(results_dir, STORE_FILENAME)
+        return cls(path) if os.path.exists(path) else None
+
+    # Function to get this thread's connection
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # Each connection is only used by its own thread, but close() may close it from another one
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(f"PRAGMA mmap_size={MMAP_BYTES}")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS artifacts (name TEXT PRIMARY KEY, data BLOB NOT NULL, size INTEGER NOT NULL, mtime REAL NOT NULL)"
+            )
+            self._local.connection = connection
+            with self._connections_lock:
+                self._connections.append(connection)
+        return connection
+
+    # Function to write artifacts in one transaction (all of them are stored, or none)
+    def put_many(self, items: list, mtime: float = None):
+        """
+        Args:
+            items (list): (name, data) pairs
+            mtime (float): Modification time to record (default: now)
+        """
+        mtime = time.time() if mtime is None else mtime
+        connection = self._connection()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.executemany(
+                "INSERT OR REPLACE INTO artifacts (name, data, size, mtime) VALUES (?, ?, ?, ?)",
+                [(name, sqlite3.Binary(data), len(data), mtime) for name, data in items]
+            )
+
+    # Function to write one artifact
+    def put(self, name: str, data: bytes, mtime: float = None):
+        self.put_many([(name, data)], mtime=mtime)
+
+    # Function to read an artifact, or None if it is not stored
+    def get(self, name: str):
+        row = self._connection().execute("SELECT data FROM artifacts WHERE name = ?", (name,)).fetchone()
+        return bytes(row[0]) if row is not None else None
+
+    # Function to get the (size, mtime) of an artifact, or None if it is not stored
+    def stat(self, name: str):
+        return self._connection().execute("SELECT size, mtime FROM artifacts WHERE name = ?", (name,)).fetchone()
+
+    # Function to read part of an artifact
+    def read_range(self, name: str, start: int, length: int) -> bytes:
+        # substr() on a blob is 1-based and only reads the pages it needs
+        row = self._connection().execute("SELECT substr(data, ?, ?) FROM artifacts WHERE name = ?", (start + 1, length, name)).fetchone()
+        return bytes(row[0]) if row is not None else b""
+
+    # Function to list the names of the stored artifacts, with their modification times
+    def list(self) -> list:
+        return self._connection().execute("SELECT name, mtime FROM artifacts ORDER BY name").fetchall()
+
+    # Function to fold the write-ahead log back into the store file and close every connection
+    def close(self):
+        """
+        Call once nothing reads or writes the store any more (e.g. at the end of a run). The
+        store is then a single file again, without -wal and -shm files next to it, ready to
+        be synced or backed up. Using the store afterwards opens new connections.
+        """
+        with self._connections_lock:
+            connections = self._connections
+            self._connections = []
+            self._local = threading.local()
+        if connections:
+            connections[0].execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        # SQLite removes the -wal and -shm files when the last connection closes
+        for connection in connections:
+            connection.close()
+
+# Function to move a results directory's loose artifacts into its store
+def pack_directory(results_dir: str, remove: bool = False) -> int:
+    """
+    Add every question_* file of a results directory to its store, keeping their
+    modification times.
+
+    Args:
+        results_dir (str): A results/<model> directory
+        remove (bool): Delete the loose files once they are stored
+
+    Returns:
+        int: Number of files packed
+    """
+    names = sorted(name for name in os.listdir(results_dir) if name.startswith("question_") and not name.endswith(".tmp"))
+    if not names:
+        return 0
+    store = ArtifactStore(os.path.join(results_dir, STORE_FILENAME))
+    for name in names:
+        path = os.path.join(results_dir, name)
+        with open(path, "rb") as file:
+            store.put(name, file.read(), mtime=os.path.getmtime(path))
+    store.close()
+    if remove:
+        for name in names:
+            os.remove(os.path.join(results_dir, name))
+    return len(names)
+
+# Function to write a results directory's stored artifacts back out as loose files
+def export_store(results_dir: str, output_dir: str = None, overwrite: bool = False) -> int:
+    """
+    Args:
+        results_dir (str): A results/<model> directory with a store
+        output_dir (str): Where to write the files (default: results_dir)
+        overwrite (bool): Replace files that already exist
+
+    Returns:
+        int: Number of files written
+    """
+    store = ArtifactStore.open_existing(results_dir)
+    if store is None:
+        return 0
+    output_dir = output_dir or results_dir
+    os.makedirs(output_dir, exist_ok=True)
+    written = 0
+    for name, mtime in store.list():
+        path = os.path.join(output_dir, name)
+        if os.path.exists(path) and not overwrite:
+            continue
+        with open(path, "wb") as file:
+            file.write(store.get(name))
+        os.utime(path, (mtime, mtime))
+        written += 1
+    store.close()
+    return written
+
+# Pack or export artifacts from the command line
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Pack results artifacts into one SQLite store per model, or export them back to loose files.')
+    parser.add_argument('command', choices=['pack', 'export'], help='"pack" loose files into the store, "export" the store to loose files')
+    parser.add_argument('--results-dir', default='results', help='Directory holding the results/<model> directories (default: results)')
+    parser.add_argument('--model', help='Only this results/<model> directory name (default: every model)')
+    parser.add_argument('--output-dir', help='export: write each model\'s files to <output-dir>/<model> instead of next to the store')
+    parser.add_argument('--remove', action='store_true', help='pack: delete the loose files once they are stored')
+    parser.add_argument('--overwrite', action='store_true', help='export: replace files that already exist')
+    args = parser.parse_args()
+    names = [args.model] if args.model else sorted(
+        name for name in os.listdir(args.results_dir)
+        if name != "webUI" and os.path.isdir(os.path.join(args.results_dir, name))
+    )
+    for name in names:
+        model_dir = os.path.join(args.results_dir, name)
+        if args.command == "pack":
+            count = pack_directory(model_dir, remove=args.remove)
+            action = "Packed"
+        else:
+            output_dir = os.path.join(args.output_dir, name) if args.output_dir else None
+            count = export_store(model_dir, output_dir=output_dir, overwrite=args.overwrite)
+            action = "Exported"
+        if count:
+            print(f"{action} {count} artifacts of {name}")
@@ -0,0 +1,137 @@
+import hashlib
+import json
+import os
+import threading
+
+# Class to store generations, renders and judge verdicts by the hash of their inputs
+class ContentCache:
+
+    # Cache layers
+    LAYERS = ("generations", "renders", "verdicts")
+
+    # Function to initialize the cache
+    def __init__(self, cache_dir: str = "cache", max_bytes: int = 1024 * 1024 * 1024):
+        """
+        Content-addressed cache on disk. Entries are keyed by a hash of everything
+        that determines them, so editing or reordering questions never returns a
+        stale entry, and identical SVGs are only rendered and judged once.
+
+        Args:
+            cache_dir (str): Directory holding the cache, or None to disable caching
+            max_bytes (int): Size above which the least recently used entries are evicted
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = 0
+        if self.enabled:
+            for layer in self.LAYERS:
+                os.makedirs(os.path.join(cache_dir, layer), exist_ok=True)
+            self._size = sum(size for _, _, size in self._entries())
+
+    # Property to check whether caching is enabled
+    @property
+    def enabled(self) -> bool:
+        return self.cache_dir is not None
+
+    # Function to compute a cache key from any mix of strings, bytes and JSON-serializable values
+    @staticmethod
+    def key(*parts) -> str:
+        digest = hashlib.sha256()
+        for part in parts:
+            if isinstance(part, bytes):
+                data = part
+            elif isinstance(part, str):
+                data = part.encode("utf-8")
+            else:
+                data = json.dumps(part, sort_keys=True).encode("utf-8")
+            # Length-prefix each part so ("ab", "c") and ("a", "bc") hash differently
+            digest.update(len(data).to_bytes(8, "big"))
+            digest.update(data)
+        return digest.hexdigest()
+
+    # Function to get the path of an entry
+    def _path(self, layer: str, key: str) -> str:
+        return os.path.join(self.cache_dir, layer, key[:2], key)
+
+    # Function to list every entry as (path, last_used, size)
+    def _entries(self) -> list:
+        entries = []
+        for layer in self.LAYERS:
+            for root, _, files in os.walk(os.path.join(self.cache_dir, layer)):
+                for name in files:
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((path, stat.st_mtime, stat.st_size))
+        return entries
+
+    # Function to read an entry, or None on a miss
+    def get(self, layer: str, key: str) -> bytes:
+        if not self.enabled:
+            return None
+        path = self._path(layer, key)
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+            # Mark the entry as recently used for eviction
+            os.utime(path)
+        except OSError:
+            return None
+        return data
+
+    # Function to write an entry, evicting old entries if the cache is over its size limit
+    def put(self, layer: str, key: str, data: bytes):
+        if not self.enabled:
+            return
+        path = self._path(layer, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first so readers never see a partial entry
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as file:
+            file.write(data)
+        try:
+            replaced_size = os.path.getsize(path)
+        except OSError:
+            replaced_size = 0
+        os.replace(temp_path, path)
+        with self._lock:
+            self._size += len(data) - replaced_size
+            over_limit = self._size > self.max_bytes
+        if over_limit:
+            self._evict()
+
+    # Function to remove an entry
+    def delete(self, layer: str, key: str):
+        if not self.enabled:
+            return
+        path = self._path(layer, key)
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return
+        with self._lock:
+            self._size -= size
+
+    # Function to evict least recently used entries until the cache is at 90% of its limit
+    def _evict(self):
+        with self._lock:
+            entries = sorted(self._entries(), key=lambda entry: entry[1])
+            self._size = sum(size for _, _, size in entries)
+            target = self.max_bytes * 0.9
+            for path, _, size in entries:
+                if self._size <= target:
+                    break
+                try:
+                    os.remove(path)
+                    self._size -= size
+                except OSError:
+                    continue
+
+    # Function to get the total size of the cache in bytes
+    def size(self) -> int:
+        with self._lock:
+            return self._size
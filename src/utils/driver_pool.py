@@ -0,0 +1,160 @@
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+# Class to manage a bounded pool of long-lived headless Chrome drivers
+class ChromeDriverPool:
+
+    # Function to initialize the driver pool
+    def __init__(
+            self,
+            size: int = 4,
+            max_renders_per_driver: int = 200,
+            checkout_timeout: float = 300
+    ):
+        """
+        Create a pool of headless Chrome drivers that are started lazily,
+        checked out by worker threads and recycled after a number of renders.
+
+        Args:
+            size (int): Maximum number of Chrome processes alive at once
+            max_renders_per_driver (int): Renders after which a driver is quit and replaced
+            checkout_timeout (float): Seconds to wait for a free driver before giving up
+        """
+        self.size = max(1, size)
+        self.max_renders_per_driver = max_renders_per_driver
+        self.checkout_timeout = checkout_timeout
+        # Idle drivers ready to be checked out (most recently used first)
+        self._idle = queue.LifoQueue()
+        # Bounds the number of drivers checked out or idle at any time
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._render_counts = {}
+        self._closed = False
+        # Statistics
+        self.drivers_started = 0
+        self.drivers_recycled = 0
+        self.renders = 0
+        self.render_seconds = 0.0
+
+    # Function to launch a new headless Chrome driver
+    @staticmethod
+    def create_driver(width: int = 800, height: int = 600):
+        try:
+            from selenium import webdriver
+            from selenium.webdriver.chrome.options import Options
+        except ImportError:
+            raise ImportError("Please install selenium: pip install selenium")
+        # Setup Chrome options with device emulation for exact dimensions
+        chrome_options = Options()
+        chrome_options.add_argument('--headless')
+        chrome_options.add_argument('--no-sandbox')
+        chrome_options.add_argument('--disable-dev-shm-usage')
+        chrome_options.add_argument('--disable-gpu')
+        chrome_options.add_argument('--hide-scrollbars')
+        chrome_options.add_argument('--disable-web-security')
+        chrome_options.add_argument(f'--window-size={width},{height}')
+        chrome_options.add_argument(f'--force-device-scale-factor=1')
+        return webdriver.Chrome(options=chrome_options)
+
+    # Function to check that a driver is still responsive
+    @staticmethod
+    def is_healthy(driver) -> bool:
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    # Function to quit a driver, ignoring errors from dead sessions
+    def _quit(self, driver):
+        with self._lock:
+            self._render_counts.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    # Function to check out a driver from the pool
+    def acquire(self):
+        if self._closed:
+            raise RuntimeError("Driver pool has been shut down")
+        if not self._slots.acquire(timeout=self.checkout_timeout):
+            raise TimeoutError(f"No Chrome driver became available within {self.checkout_timeout}s")
+        try:
+            # Reuse an idle driver if a healthy one is available
+            while True:
+                try:
+                    driver = self._idle.get_nowait()
+                except queue.Empty:
+                    break
+                if self.is_healthy(driver):
+                    return driver
+                self._quit(driver)
+            # Otherwise launch a new one
+            driver = self.create_driver()
+            with self._lock:
+                self._render_counts[id(driver)] = 0
+                self.drivers_started += 1
+            return driver
+        except Exception:
+            self._slots.release()
+            raise
+
+    # Function to return a driver to the pool
+    def release(self, driver, healthy: bool = True):
+        try:
+            with self._lock:
+                count = self._render_counts.get(id(driver), 0) + 1
+                self._render_counts[id(driver)] = count
+            # Recycle drivers that failed or reached their render budget
+            if self._closed or not healthy or count >= self.max_renders_per_driver:
+                if healthy and not self._closed:
+                    with self._lock:
+                        self.drivers_recycled += 1
+                self._quit(driver)
+            else:
+                self._idle.put(driver)
+        finally:
+            self._slots.release()
+
+    # Context manager to check out a driver for the duration of one render
+    @contextmanager
+    def driver(self):
+        driver = self.acquire()
+        healthy = True
+        start = time.perf_counter()
+        try:
+            yield driver
+        except Exception:
+            healthy = False
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.renders += 1
+                self.render_seconds += elapsed
+            self.release(driver, healthy=healthy)
+
+    # Function to get pool statistics
+    def stats(self, wall_seconds: float = None) -> dict:
+        with self._lock:
+            stats = {
+                "renders": self.renders,
+                "render_seconds": round(self.render_seconds, 3),
+                "drivers_started": self.drivers_started,
+                "drivers_recycled": self.drivers_recycled,
+                "mean_render_seconds": round(self.render_seconds / self.renders, 3) if self.renders else 0.0
+            }
+        stats["renders_per_second"] = round(self.renders / wall_seconds, 3) if wall_seconds else 0.0
+        return stats
+
+    # Function to quit every idle driver and refuse further checkouts
+    def shutdown(self):
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._quit(driver)
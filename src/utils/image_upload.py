@@ -0,0 +1,126 @@
+import base64
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+# Pillow names of the formats images can be re-encoded to
+IMAGE_FORMATS = {"jpeg": "JPEG", "png": "PNG", "webp": "WEBP"}
+
+# Function to detect the MIME type of an image from its first bytes
+def detect_image_mime_type(image_bytes: bytes) -> str:
+    if image_bytes.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if image_bytes.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if image_bytes[:4] == b"RIFF" and image_bytes[8:12] == b"WEBP":
+        return "image/webp"
+    if image_bytes.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    # Renders are PNGs unless something above says otherwise
+    return "image/png"
+
+# Function to encode an image as a data URL labelled with its actual type
+def image_data_url(image_bytes: bytes) -> str:
+    base64_image = base64.b64encode(image_bytes).decode('utf-8')
+    return f"data:{detect_image_mime_type(image_bytes)};base64,{base64_image}"
+
+# Class to shrink rendered images before they are uploaded to the judge
+class ImagePreparer:
+
+    # Function to initialize the image preparer
+    def __init__(
+            self,
+            max_edge: int = None,
+            image_format: str = "png",
+            quality: int = 90,
+            cache_entries: int = 256
+    ):
+        """
+        Downscales images to at most max_edge pixels on their longest edge, flattens
+        transparency onto white (as the Chrome renderer draws it) and re-encodes them,
+        keeping the original whenever re-encoding does not make it smaller. Prepared
+        images are cached by content, so an image graded again (e.g. after a batch miss)
+        is not encoded twice. The defaults are lossless (full size PNG), so the judge sees
+        exactly the rendered pixels unless downscaling or a lossy format is asked for.
+        Requires Pillow; without it images are uploaded as they are.
+
+        Args:
+            max_edge (int): Longest edge in pixels (default: None or 0, keep the rendered size)
+            image_format (str): "jpeg", "png" (default) or "webp"
+            quality (int): Quality for lossy formats (1-100)
+            cache_entries (int): Prepared images kept in memory
+        """
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError(f"Unknown image format '{image_format}'. Available formats: {', '.join(IMAGE_FORMATS)}")
+        self.max_edge = max_edge or None
+        self.image_format = image_format
+        self.quality = quality
+        self.cache_entries = cache_entries
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._warned = False
+
+    # Property with the settings that change what the judge sees (part of the verdict cache key)
+    @property
+    def settings(self) -> dict:
+        return {"max_edge": self.max_edge, "format": self.image_format, "quality": self.quality}
+
+    # Function to prepare an image for upload
+    def prepare(self, image_bytes: bytes) -> bytes:
+        """
+        Return the image to upload in place of image_bytes (possibly image_bytes itself).
+        """
+        key = hashlib.sha256(image_bytes).digest()
+        with self._lock:
+            data = self._cache.get(key)
+            if data is not None:
+                self._cache.move_to_end(key)
+                return data
+        data = self._encode(image_bytes)
+        with self._lock:
+            self._cache[key] = data
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+        return data
+
+    # Function to downscale and re-encode an image
+    def _encode(self, image_bytes: bytes) -> bytes:
+        try:
+            from PIL import Image
+        except ImportError:
+            # Only worth a warning if the images were meant to be shrunk
+            if not self._warned and (self.max_edge or self.image_format != "png"):
+                self._warned = True
+                print("Warning: Pillow is not installed (pip install Pillow); judge images are uploaded at full size.")
+            return image_bytes
+        try:
+            image = Image.open(io.BytesIO(image_bytes))
+            image.load()
+        except (OSError, ValueError):
+            # Not an image Pillow can read: upload it unchanged
+            return image_bytes
+        # Flatten transparency onto white
+        flattened = False
+        if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, "white")
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+            flattened = True
+        elif image.mode != "RGB":
+            image = image.convert("RGB")
+        resized = False
+        if self.max_edge and max(image.size) > self.max_edge:
+            image.thumbnail((self.max_edge, self.max_edge), Image.LANCZOS)
+            resized = True
+        output = io.BytesIO()
+        if self.image_format == "png":
+            image.save(output, "PNG", optimize=True)
+        else:
+            image.save(output, IMAGE_FORMATS[self.image_format], quality=self.quality)
+        data = output.getvalue()
+        # A small opaque render may already be smaller than its re-encoding
+        if not resized and not flattened and len(data) >= len(image_bytes):
+            return image_bytes
+        return data
@@ -1,12 +1,27 @@
-from openai import OpenAI
-import base64
+from openai import OpenAI, AsyncOpenAI
 import os
 import requests
+from requests.adapters import HTTPAdapter
+from contextlib import nullcontext
+import sys
+import threading
+import time
 import json
 
+# Import the rate limiter and the image encoder
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from utils.rate_limit import RateLimiter, APIResponseError, TRANSIENT_STATUS_CODES, is_transient
+from utils.image_upload import image_data_url
+
 # Class to interact with OpenAI compatible APIs
 class LLM:
 
+    # Shared clients keyed by (endpoint, API key), so connections are reused across instances
+    _clients = {}
+    # Shared instances keyed by (model, endpoint, API key), see get_shared
+    _shared_instances = {}
+    _registry_lock = threading.RLock()
+
     # Function to initialize the LLM class
     def __init__(
             self, 
@@ -15,13 +30,11 @@ class LLM:
             api_key: str,
             reasoning_effort: str = None,
             reasoning_max_tokens: int = None,
-            max_output_tokens: int = None
+            max_output_tokens: int = None,
+            max_concurrency: int = None
     ):
         # Initialize the OpenAI client
-        self.client = OpenAI(
-            api_key=api_key, 
-            base_url=endpoint
-        )
+        self.client = self._create_client(api_key, endpoint)
         # Set the model
         self.model = model
         # Store reasoning parameters
@@ -31,18 +44,261 @@ class LLM:
         # Store endpoint and API key for direct requests when needed
         self.endpoint = endpoint
         self.api_key = api_key
+        # Shared HTTP session for direct requests, so connections are kept alive between calls
+        self._session = None
+        self._session_lock = threading.Lock()
+        # Optional limit on the number of requests in flight from all threads using this instance
+        self._concurrency = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        # Pacing and retries shared by everything calling this endpoint
+        self.rate_limiter = RateLimiter.for_endpoint(endpoint)
+
+    # Function to get an instance shared by every caller in the process with the same model, endpoint and key
+    @classmethod
+    def get_shared(
+            cls,
+            model: str,
+            endpoint: str,
+            api_key: str,
+            max_concurrency: int = None
+    ):
+        """
+        Return a process-wide instance for (model, endpoint, api_key), creating it on first use.
+        The instance is safe to use from many threads; max_concurrency only applies when it is created.
+        """
+        key = (cls, model, endpoint, api_key)
+        with LLM._registry_lock:
+            if key not in LLM._shared_instances:
+                LLM._shared_instances[key] = cls(
+                    model=model,
+                    endpoint=endpoint,
+                    api_key=api_key,
+                    max_concurrency=max_concurrency
+                )
+            return LLM._shared_instances[key]
+
+    # Function to create the API client (shared per endpoint and key; the OpenAI client is thread-safe)
+    def _create_client(self, api_key: str, endpoint: str):
+        with LLM._registry_lock:
+            key = (endpoint, api_key)
+            if key not in LLM._clients:
+                LLM._clients[key] = OpenAI(
+                    api_key=api_key, 
+                    base_url=endpoint,
+                    # Retries are handled by the endpoint's RateLimiter
+                    max_retries=0
+                )
+            return LLM._clients[key]
+
+    # Function to get the shared HTTP session used for direct requests
+    def _get_session(self) -> requests.Session:
+        with self._session_lock:
+            if self._session is None:
+                self._session = requests.Session()
+                # Keep enough pooled connections for every worker thread
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=64)
+                self._session.mount("https://", adapter)
+                self._session.mount("http://", adapter)
+                self._session.headers.update({
+                    'Authorization': f'Bearer {self.api_key}',
+                    'Content-Type': 'application/json'
+                })
+            return self._session
 
     # Function to generate text from a prompt and an optional image
     def generate_text(
             self, 
             prompt: str, 
             image_path: str = None,
-            json_schema: dict = None
+            json_schema: dict = None,
+            image_bytes: bytes = None,
+            images: list = None,
+            usage: dict = None
     ) -> str:
-        # If image_path is provided, add it to the message content
-        if image_path:
+        """Generate text. If a usage dict is given, token usage and the number of requests sent are added to it."""
+        # Prepare the request parameters
+        request_params = self._build_request_params(prompt, image_path, json_schema, image_bytes, images)
+        # Generate text (waiting for a free slot if a concurrency limit is set)
+        with self._concurrency or nullcontext():
+            # Use direct HTTP request if reasoning parameters are specified
+            if self.reasoning_effort or self.reasoning_max_tokens:
+                return self.rate_limiter.call(lambda: self._generate_with_reasoning(dict(request_params), self._count_request(usage)))
+            else:
+                return self.rate_limiter.call(lambda: self._generate(request_params, self._count_request(usage)))
+
+    # Function to send a request through the OpenAI client
+    def _generate(self, request_params: dict, usage: dict = None) -> str:
+        response = self.client.chat.completions.create(**request_params)
+        self._add_usage(usage, response.usage)
+        return response.choices[0].message.content
+
+    # Function to count a request (including retries) in a usage dict
+    @staticmethod
+    def _count_request(usage: dict = None) -> dict:
+        if usage is not None:
+            usage["requests"] = usage.get("requests", 0) + 1
+        return usage
+
+    # Function to add the token usage reported by the API to a usage dict
+    @staticmethod
+    def _add_usage(usage: dict, response_usage):
+        if usage is None or response_usage is None:
+            return
+        if not isinstance(response_usage, dict):
+            response_usage = response_usage.model_dump()
+        details = response_usage.get("completion_tokens_details") or {}
+        for key, value in (
+            ("prompt_tokens", response_usage.get("prompt_tokens")),
+            ("completion_tokens", response_usage.get("completion_tokens")),
+            ("reasoning_tokens", details.get("reasoning_tokens") or response_usage.get("reasoning_tokens"))
+        ):
+            if value:
+                usage[key] = usage.get(key, 0) + value
+
+    # Function to stream text from a prompt, stopping as soon as the caller has what it needs
+    def generate_text_stream(
+            self,
+            prompt: str,
+            stop_condition = None,
+            usage: dict = None
+    ) -> tuple:
+        """
+        Stream a completion, closing the stream once stop_condition says the response is complete.
+
+        Args:
+            prompt (str): The prompt
+            stop_condition (callable): Called with the text received so far after every chunk. Returns the
+                offset to cut the text at once it is complete, or None to keep reading
+            usage (dict): If given, token usage (when the stream reaches its end) and requests sent are added to it
+
+        Returns:
+            tuple: (text, stats) where stats has "first_token_seconds", "stop_seconds", "seconds",
+                "stream_tokens" (content chunks received) and "stopped_early"
+        """
+        # Prepare the request parameters
+        request_params = self._build_request_params(prompt)
+        request_params["stream"] = True
+        # OpenAI compatible endpoints only report token usage (on the last chunk) when asked to
+        request_params["stream_options"] = {"include_usage": True}
+        # Stream text (waiting for a free slot if a concurrency limit is set)
+        with self._concurrency or nullcontext():
+            if self.reasoning_effort or self.reasoning_max_tokens:
+                return self.rate_limiter.call(lambda: self._stream_with_reasoning(dict(request_params), stop_condition, self._count_request(usage)))
+            else:
+                return self.rate_limiter.call(lambda: self._stream(request_params, stop_condition, usage=self._count_request(usage)))
+
+    # Function to stream a request through the OpenAI client
+    def _stream(self, request_params: dict, stop_condition = None, start: float = None, usage: dict = None) -> tuple:
+        start = start or time.perf_counter()
+        request_params.pop("reasoning", None)
+        stream = self.client.chat.completions.create(**request_params)
+        try:
+            return self._read_stream(self._iter_chunks(stream, usage), stop_condition, start)
+        finally:
+            # Closing the stream stops the generation early
+            stream.close()
+
+    # Function to stream a request with reasoning parameters over server-sent events
+    def _stream_with_reasoning(self, request_params: dict, stop_condition = None, usage: dict = None) -> tuple:
+        start = time.perf_counter()
+        response = self._get_session().post(
+            f"{self.endpoint}/chat/completions",
+            json=request_params,
+            timeout=1800,
+            stream=True
+        )
+        try:
+            if response.status_code == 200:
+                response.encoding = "utf-8"
+                return self._read_stream(self._iter_events(response, usage), stop_condition, start)
+            elif response.status_code in TRANSIENT_STATUS_CODES or response.status_code >= 500:
+                # Rate limits and server errors are retried by the rate limiter, not worked around
+                raise APIResponseError(response.status_code, response.text, dict(response.headers))
+            else:
+                print(f"Warning: Direct API call failed (HTTP {response.status_code}: {response.text}). Falling back to OpenAI client without reasoning.")
+        finally:
+            response.close()
+        # Fallback to OpenAI client without reasoning
+        return self._stream(request_params, stop_condition, start, usage)
+
+    # Function to get the content deltas from a client stream
+    @classmethod
+    def _iter_chunks(cls, stream, usage: dict = None):
+        for chunk in stream:
+            # Usage (requested with stream_options) arrives with the last chunk, so it is only known for streams read to the end
+            cls._add_usage(usage, getattr(chunk, "usage", None))
+            if chunk.choices:
+                yield chunk.choices[0].delta.content
+
+    # Function to get the content deltas from a server-sent event stream
+    @classmethod
+    def _iter_events(cls, response: requests.Response, usage: dict = None):
+        for line in response.iter_lines(decode_unicode=True):
+            # Skip keep-alive comments and blank separator lines
+            if not line or not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                return
+            event = json.loads(data)
+            if "error" in event:
+                code = event["error"].get("code")
+                raise APIResponseError(code if isinstance(code, int) else 500, event["error"].get("message", data))
+            cls._add_usage(usage, event.get("usage"))
+            choices = event.get("choices") or []
+            if choices:
+                yield (choices[0].get("delta") or {}).get("content")
+
+    # Function to read content deltas until the stream ends or stop_condition finds the end of the response
+    @staticmethod
+    def _read_stream(deltas, stop_condition, start: float) -> tuple:
+        # Reset the stop condition in case this is a retry
+        if hasattr(stop_condition, "reset"):
+            stop_condition.reset()
+        text = ""
+        stats = {"first_token_seconds": None, "stop_seconds": None, "seconds": None, "stream_tokens": 0, "stopped_early": False}
+        for delta in deltas:
+            if not delta:
+                continue
+            if stats["first_token_seconds"] is None:
+                stats["first_token_seconds"] = round(time.perf_counter() - start, 3)
+            stats["stream_tokens"] += 1
+            text += delta
+            end = stop_condition(text) if stop_condition else None
+            if end is not None:
+                stats["stop_seconds"] = round(time.perf_counter() - start, 3)
+                stats["stopped_early"] = True
+                text = text[:end]
+                break
+        stats["seconds"] = round(time.perf_counter() - start, 3)
+        return text, stats
+
+    # Function to build the chat completion request parameters
+    def _build_request_params(
+            self, 
+            prompt: str, 
+            image_path: str = None,
+            json_schema: dict = None,
+            image_bytes: bytes = None,
+            images: list = None
+    ) -> dict:
+        # If image_path is provided, read the image from disk
+        if image_path and image_bytes is None:
             with open(image_path, "rb") as image_file:
-                base64_image = base64.b64encode(image_file.read()).decode('utf-8')
+                image_bytes = image_file.read()
+        # If several images are provided, label each one so the prompt can refer to it by number
+        if images:
+            content = [{"type": "text", "text": prompt}]
+            for number, image in enumerate(images, start=1):
+                content.append({"type": "text", "text": f"Image {number}:"})
+                content.append({
+                    "type": "image_url",
+                    "image_url": {
+                        "url": image_data_url(image)
+                    }
+                })
+            messages = [{"role": "user", "content": content}]
+        # If an image is provided, add it to the message content
+        elif image_bytes is not None:
             messages = [
                 {
                     "role": "user",
@@ -51,7 +307,7 @@ class LLM:
                         {
                             "type": "image_url",
                             "image_url": {
-                                "url": f"data:image/jpeg;base64,{base64_image}"
+                                "url": image_data_url(image_bytes)
                             }
                         }
                     ]
@@ -89,49 +345,189 @@ class LLM:
             if self.reasoning_max_tokens:
                 reasoning_config["max_tokens"] = self.reasoning_max_tokens
             request_params["reasoning"] = reasoning_config
-        # Generate text
-        # Use direct HTTP request if reasoning parameters are specified
-        if self.reasoning_effort or self.reasoning_max_tokens:
-            return self._generate_with_reasoning(request_params)
-        else:
-            response = self.client.chat.completions.create(**request_params)
-            return response.choices[0].message.content
+        return request_params
     
-    def _generate_with_reasoning(self, request_params):
+    def _generate_with_reasoning(self, request_params, usage: dict = None):
         """Generate text using direct HTTP request to support reasoning parameters"""
-        headers = {
-            'Authorization': f'Bearer {self.api_key}',
-            'Content-Type': 'application/json'
-        }
-        
         try:
-            response = requests.post(
+            response = self._get_session().post(
                 f"{self.endpoint}/chat/completions",
-                headers=headers,
                 json=request_params,
                 timeout=1800
             )
             
             if response.status_code == 200:
                 result = response.json()
+                self._add_usage(usage, result.get('usage'))
                 return result['choices'][0]['message']['content']
+            elif response.status_code in TRANSIENT_STATUS_CODES or response.status_code >= 500:
+                # Rate limits and server errors are retried by the rate limiter, not worked around
+                raise APIResponseError(response.status_code, response.text, dict(response.headers))
             else:
                 error_msg = f"HTTP {response.status_code}: {response.text}"
                 print(f"Warning: Direct API call failed ({error_msg}). Falling back to OpenAI client without reasoning.")
                 # Fallback to OpenAI client without reasoning
                 if "reasoning" in request_params:
                     del request_params["reasoning"]
-                fallback_response = self.client.chat.completions.create(**request_params)
-                return fallback_response.choices[0].message.content
+                return self._generate(request_params, usage)
                 
         except Exception as e:
+            if is_transient(e):
+                raise
             print(f"Warning: Direct API call failed ({e}). Falling back to OpenAI client without reasoning.")
             # Fallback to OpenAI client without reasoning
             if "reasoning" in request_params:
                 del request_params["reasoning"]
-            fallback_response = self.client.chat.completions.create(**request_params)
-            return fallback_response.choices[0].message.content
+            return self._generate(request_params, usage)
     
+# Class to interact with OpenAI compatible APIs from asyncio code
+class AsyncLLM(LLM):
+
+    # Shared async clients keyed by (endpoint, API key), so connections are reused across instances
+    _clients = {}
+
+    # Function to initialize the AsyncLLM class
+    def __init__(
+            self, 
+            model: str, 
+            endpoint: str,
+            api_key: str,
+            reasoning_effort: str = None,
+            reasoning_max_tokens: int = None,
+            max_output_tokens: int = None,
+            max_concurrency: int = None
+    ):
+        super().__init__(
+            model=model,
+            endpoint=endpoint,
+            api_key=api_key,
+            reasoning_effort=reasoning_effort,
+            reasoning_max_tokens=reasoning_max_tokens,
+            max_output_tokens=max_output_tokens,
+            max_concurrency=max_concurrency
+        )
+
+    # Function to get the shared async client for this endpoint and key
+    def _create_client(self, api_key: str, endpoint: str):
+        with AsyncLLM._registry_lock:
+            key = (endpoint, api_key)
+            if key not in AsyncLLM._clients:
+                AsyncLLM._clients[key] = AsyncOpenAI(
+                    api_key=api_key,
+                    base_url=endpoint,
+                    # Retries are handled by the endpoint's RateLimiter
+                    max_retries=0
+                )
+            return AsyncLLM._clients[key]
+
+    # Function to generate text from a prompt and an optional image
+    async def generate_text(
+            self, 
+            prompt: str, 
+            image_path: str = None,
+            json_schema: dict = None,
+            image_bytes: bytes = None,
+            images: list = None,
+            usage: dict = None
+    ) -> str:
+        # Prepare the request parameters
+        request_params = self._build_request_params(prompt, image_path, json_schema, image_bytes, images)
+        # Reasoning parameters are not part of the OpenAI schema, so send them in the request body
+        reasoning_config = request_params.pop("reasoning", None)
+        # Pace and retry the request with the limiter shared by everything calling this endpoint
+        return await self.rate_limiter.call_async(lambda: self._generate(request_params, reasoning_config, self._count_request(usage)))
+
+    # Function to send one request, falling back to no reasoning if the endpoint rejects it
+    async def _generate(self, request_params: dict, reasoning_config: dict = None, usage: dict = None) -> str:
+        if reasoning_config:
+            try:
+                response = await self.client.chat.completions.create(
+                    **request_params,
+                    extra_body={"reasoning": reasoning_config},
+                    timeout=1800
+                )
+                self._add_usage(usage, response.usage)
+                return response.choices[0].message.content
+            except Exception as e:
+                # Rate limits and server errors are retried by the rate limiter, not worked around
+                if is_transient(e):
+                    raise
+                print(f"Warning: API call with reasoning failed ({e}). Falling back to request without reasoning.")
+        response = await self.client.chat.completions.create(**request_params)
+        self._add_usage(usage, response.usage)
+        return response.choices[0].message.content
+
+    # Function to stream text from a prompt, stopping as soon as the caller has what it needs
+    async def generate_text_stream(
+            self,
+            prompt: str,
+            stop_condition = None,
+            usage: dict = None
+    ) -> tuple:
+        """Stream a completion on the event loop. See LLM.generate_text_stream."""
+        # Prepare the request parameters
+        request_params = self._build_request_params(prompt)
+        request_params["stream"] = True
+        # OpenAI compatible endpoints only report token usage (on the last chunk) when asked to
+        request_params["stream_options"] = {"include_usage": True}
+        # Reasoning parameters are not part of the OpenAI schema, so send them in the request body
+        reasoning_config = request_params.pop("reasoning", None)
+        return await self.rate_limiter.call_async(lambda: self._stream_async(request_params, stop_condition, reasoning_config, self._count_request(usage)))
+
+    # Function to stream one request, falling back to no reasoning if the endpoint rejects it
+    async def _stream_async(self, request_params: dict, stop_condition = None, reasoning_config: dict = None, usage: dict = None) -> tuple:
+        start = time.perf_counter()
+        # Reset the stop condition in case this is a retry
+        if hasattr(stop_condition, "reset"):
+            stop_condition.reset()
+        stream = None
+        if reasoning_config:
+            try:
+                stream = await self.client.chat.completions.create(
+                    **request_params,
+                    extra_body={"reasoning": reasoning_config},
+                    timeout=1800
+                )
+            except Exception as e:
+                # Rate limits and server errors are retried by the rate limiter, not worked around
+                if is_transient(e):
+                    raise
+                print(f"Warning: API call with reasoning failed ({e}). Falling back to request without reasoning.")
+        if stream is None:
+            stream = await self.client.chat.completions.create(**request_params)
+        text = ""
+        stats = {"first_token_seconds": None, "stop_seconds": None, "seconds": None, "stream_tokens": 0, "stopped_early": False}
+        try:
+            async for chunk in stream:
+                self._add_usage(usage, getattr(chunk, "usage", None))
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                if stats["first_token_seconds"] is None:
+                    stats["first_token_seconds"] = round(time.perf_counter() - start, 3)
+                stats["stream_tokens"] += 1
+                text += delta
+                end = stop_condition(text) if stop_condition else None
+                if end is not None:
+                    stats["stop_seconds"] = round(time.perf_counter() - start, 3)
+                    stats["stopped_early"] = True
+                    text = text[:end]
+                    break
+        finally:
+            # Closing the stream stops the generation early
+            await stream.close()
+        stats["seconds"] = round(time.perf_counter() - start, 3)
+        return text, stats
+
+    # Function to close every shared async client
+    @staticmethod
+    async def close_all():
+        with AsyncLLM._registry_lock:
+            clients = list(AsyncLLM._clients.values())
+            AsyncLLM._clients.clear()
+        for client in clients:
+            await client.close()
+
 # Example usage
 if __name__ == "__main__":
     # Get the directory two levels up from the current file
@@ -0,0 +1,280 @@
+import asyncio
+import email.utils
+import random
+import threading
+import time
+import openai
+import requests
+from tqdm import tqdm
+
+# HTTP status codes worth retrying (everything else, e.g. 400 or 401, fails immediately)
+TRANSIENT_STATUS_CODES = {408, 409, 425, 429, 500, 502, 503, 504, 520, 522, 524, 529}
+
+# Error raised for a non-200 response to a direct HTTP request
+class APIResponseError(Exception):
+
+    # Function to initialize the error
+    def __init__(self, status_code: int, message: str, headers: dict = None):
+        super().__init__(f"HTTP {status_code}: {message}")
+        self.status_code = status_code
+        self.headers = headers or {}
+
+# Function to get the HTTP status code of an API error, if it has one
+def error_status_code(error: Exception):
+    if isinstance(error, (openai.APIStatusError, APIResponseError)):
+        return error.status_code
+    return None
+
+# Function to check whether an error means the endpoint is throttling us
+def is_rate_limited(error: Exception) -> bool:
+    return isinstance(error, openai.RateLimitError) or error_status_code(error) == 429
+
+# Function to check whether an error is worth retrying
+def is_transient(error: Exception) -> bool:
+    """Rate limits, server errors, timeouts and dropped connections are transient; anything else is permanent."""
+    # APITimeoutError is a subclass of APIConnectionError
+    if isinstance(error, (openai.APIConnectionError, requests.ConnectionError, requests.Timeout)):
+        return True
+    status_code = error_status_code(error)
+    return status_code is not None and (status_code in TRANSIENT_STATUS_CODES or status_code >= 500)
+
+# Function to read how long the server asked us to wait, in seconds
+def retry_after_seconds(error: Exception):
+    """Parse the Retry-After (or retry-after-ms) header of an API error. Returns None if absent."""
+    if isinstance(error, openai.APIStatusError):
+        headers = error.response.headers
+    elif isinstance(error, APIResponseError):
+        headers = error.headers
+    else:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return max(0.0, float(headers["retry-after-ms"]) / 1000)
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        # Retry-After is either a number of seconds or an HTTP date
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+# Class to pace and retry requests to one endpoint, shared by every model and thread using it
+class RateLimiter:
+
+    # Shared limiters keyed by endpoint
+    _limiters = {}
+    _registry_lock = threading.Lock()
+    # Settings for limiters created from now on, see set_defaults
+    defaults = {
+        "requests_per_second": None,
+        "max_concurrency": 64,
+        "max_retries": 5
+    }
+
+    # Function to initialize the rate limiter
+    def __init__(
+            self,
+            endpoint: str,
+            requests_per_second: float = None,
+            max_concurrency: int = 64,
+            min_concurrency: int = 1,
+            max_retries: int = 5,
+            base_delay: float = 1.0,
+            max_delay: float = 60.0
+    ):
+        """
+        Token bucket plus an AIMD concurrency limit. The limit grows by one request per
+        window of successful requests and halves on every 429, so the number of
+        requests in flight settles just under what the provider accepts. A Retry-After
+        from the provider pauses the whole endpoint, not just the request that got it.
+
+        Args:
+            endpoint (str): The endpoint being limited (used in reports)
+            requests_per_second (float): Sustained request rate (None for no rate limit)
+            max_concurrency (int): Upper bound of the concurrency limit (also its starting value)
+            min_concurrency (int): Lower bound of the concurrency limit
+            max_retries (int): Retries of a transient error before giving up
+            base_delay (float): Backoff before the first retry, doubled on each retry
+            max_delay (float): Longest backoff between retries
+        """
+        self.endpoint = endpoint
+        self.requests_per_second = requests_per_second
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._condition = threading.Condition()
+        self._limit = float(self.max_concurrency)
+        self._in_flight = 0
+        self._tokens = 1.0
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        # Statistics
+        self.requests = 0
+        self.throttled = 0
+        self.retries = 0
+        self.failures = 0
+        self.wait_seconds = 0.0
+        self.lowest_limit = self.max_concurrency
+
+    # Function to get the limiter shared by everything calling an endpoint
+    @classmethod
+    def for_endpoint(cls, endpoint: str):
+        with cls._registry_lock:
+            if endpoint not in cls._limiters:
+                cls._limiters[endpoint] = cls(endpoint=endpoint, **cls.defaults)
+            return cls._limiters[endpoint]
+
+    # Function to change the settings of limiters created from now on
+    @classmethod
+    def set_defaults(cls, requests_per_second: float = None, max_concurrency: int = 64, max_retries: int = 5):
+        cls.defaults = {
+            "requests_per_second": requests_per_second,
+            "max_concurrency": max_concurrency,
+            "max_retries": max_retries
+        }
+
+    # Function to get the statistics of every limiter in use
+    @classmethod
+    def all_stats(cls) -> dict:
+        with cls._registry_lock:
+            limiters = list(cls._limiters.values())
+        return {limiter.endpoint: limiter.stats() for limiter in limiters}
+
+    # Property with the current concurrency limit
+    @property
+    def limit(self) -> int:
+        with self._condition:
+            return int(self._limit)
+
+    # Function to take a request slot if one is free; returns 0 on success, otherwise seconds to wait (None: until a release)
+    def _try_acquire(self):
+        now = time.monotonic()
+        if now < self._paused_until:
+            return self._paused_until - now
+        if self._in_flight >= int(self._limit):
+            return None
+        if self.requests_per_second:
+            # Refill the bucket, holding at most one second of burst
+            self._tokens = min(
+                max(1.0, self.requests_per_second),
+                self._tokens + (now - self._last_refill) * self.requests_per_second
+            )
+            self._last_refill = now
+            if self._tokens < 1:
+                return (1 - self._tokens) / self.requests_per_second
+            self._tokens -= 1
+        self._in_flight += 1
+        self.requests += 1
+        return 0
+
+    # Function to wait for a request slot (from a thread)
+    def acquire(self):
+        start = time.monotonic()
+        with self._condition:
+            while True:
+                wait = self._try_acquire()
+                if wait == 0:
+                    break
+                self._condition.wait(timeout=wait if wait is not None else 1.0)
+            self.wait_seconds += time.monotonic() - start
+
+    # Function to wait for a request slot (from a coroutine, without blocking the event loop)
+    async def acquire_async(self):
+        start = time.monotonic()
+        while True:
+            with self._condition:
+                wait = self._try_acquire()
+                if wait == 0:
+                    self.wait_seconds += time.monotonic() - start
+                    return
+            await asyncio.sleep(min(wait, 1.0) if wait is not None else 0.05)
+
+    # Function to return a request slot and adjust the concurrency limit
+    def release(self, throttled: bool = False):
+        with self._condition:
+            self._in_flight -= 1
+            if throttled:
+                # Multiplicative decrease
+                self.throttled += 1
+                self._limit = max(float(self.min_concurrency), self._limit / 2)
+                self.lowest_limit = min(self.lowest_limit, int(self._limit))
+            else:
+                # Additive increase (one more slot per full window of successes)
+                self._limit = min(float(self.max_concurrency), self._limit + 1 / self._limit)
+            self._condition.notify_all()
+
+    # Function to stop sending requests to the endpoint for a while
+    def pause(self, seconds: float):
+        with self._condition:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    # Function to decide how long to wait before retrying an error, or None to give up
+    def _retry_delay(self, error: Exception, attempt: int):
+        with self._condition:
+            if not is_transient(error) or attempt >= self.max_retries:
+                self.failures += 1
+                return None
+            self.retries += 1
+        # Honor the server's Retry-After, otherwise back off exponentially with jitter
+        delay = retry_after_seconds(error)
+        if delay is None:
+            delay = min(self.max_delay, self.base_delay * 2 ** attempt) * random.uniform(0.5, 1.0)
+        if is_rate_limited(error):
+            self.pause(delay)
+            # Written above the progress bars instead of through them
+            tqdm.write(f"Warning: Rate limited by {self.endpoint}; concurrency limit now {int(self._limit)}, retrying in {delay:.1f}s")
+        return delay
+
+    # Function to call a function that makes one request, pacing and retrying it
+    def call(self, function):
+        attempt = 0
+        while True:
+            self.acquire()
+            try:
+                result = function()
+            except Exception as e:
+                self.release(throttled=is_rate_limited(e))
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            self.release()
+            return result
+
+    # Function to await a coroutine function that makes one request, pacing and retrying it
+    async def call_async(self, function):
+        attempt = 0
+        while True:
+            await self.acquire_async()
+            try:
+                result = await function()
+            except Exception as e:
+                self.release(throttled=is_rate_limited(e))
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            self.release()
+            return result
+
+    # Function to get throttling statistics
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "retries": self.retries,
+                "failures": self.failures,
+                "wait_seconds": round(self.wait_seconds, 3),
+                "concurrency_limit": int(self._limit),
+                "lowest_concurrency_limit": self.lowest_limit
+            }
@@ -0,0 +1,147 @@
+import os
+import sys
+import threading
+import time
+
+# Import the ChromeDriverPool class
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from utils.driver_pool import ChromeDriverPool
+
+# Base class for rasterizer backends used by SVGRenderer
+class RendererBackend:
+
+    # Name used to select the backend (e.g. with --renderer)
+    name = None
+
+    # Function to initialize the backend
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.renders = 0
+        self.render_seconds = 0.0
+
+    # Function to check whether the backend's dependencies are installed
+    @classmethod
+    def is_available(cls) -> bool:
+        return True
+
+    # Function to prepare the backend for a run with the given render concurrency
+    def start(self, concurrency: int = 1, **kwargs):
+        pass
+
+    # Function to release any resources held by the backend
+    def shutdown(self):
+        pass
+
+    # Function to rasterize SVG code to PNG bytes at the given size
+    def render(self, svg_code: str, width: int, height: int) -> bytes:
+        start = time.perf_counter()
+        try:
+            return self._render(svg_code, width, height)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.renders += 1
+                self.render_seconds += elapsed
+
+    # Function implemented by each backend to do the actual rasterization
+    def _render(self, svg_code: str, width: int, height: int) -> bytes:
+        raise NotImplementedError
+
+    # Function to get render statistics
+    def stats(self, wall_seconds: float = None) -> dict:
+        with self._lock:
+            stats = {
+                "backend": self.name,
+                "renders": self.renders,
+                "render_seconds": round(self.render_seconds, 3),
+                "mean_render_seconds": round(self.render_seconds / self.renders, 3) if self.renders else 0.0
+            }
+        stats["renders_per_second"] = round(self.renders / wall_seconds, 3) if wall_seconds else 0.0
+        return stats
+
+# Backend that renders through headless Chrome (browser-exact output)
+class ChromeBackend(RendererBackend):
+
+    name = "chrome"
+
+    # Function to initialize the backend
+    def __init__(self):
+        super().__init__()
+        self.driver_pool = None
+
+    @classmethod
+    def is_available(cls) -> bool:
+        try:
+            import selenium
+            return True
+        except ImportError:
+            return False
+
+    # Function to start a shared pool of long-lived Chrome drivers
+    def start(self, concurrency: int = 1, max_renders_per_driver: int = 200, **kwargs):
+        from utils.svg_renderer import SVGRenderer
+        self.driver_pool = ChromeDriverPool(
+            size=concurrency,
+            max_renders_per_driver=max_renders_per_driver
+        )
+        SVGRenderer.set_driver_pool(self.driver_pool)
+
+    # Function to quit the pooled drivers
+    def shutdown(self):
+        from utils.svg_renderer import SVGRenderer
+        if self.driver_pool is not None:
+            SVGRenderer.set_driver_pool(None)
+            self.driver_pool.shutdown()
+
+    def _render(self, svg_code: str, width: int, height: int) -> bytes:
+        from utils.svg_renderer import SVGRenderer
+        return SVGRenderer.svg_to_png_selenium(svg_code, width=width, height=height)
+
+    def stats(self, wall_seconds: float = None) -> dict:
+        stats = super().stats(wall_seconds)
+        if self.driver_pool is not None:
+            pool_stats = self.driver_pool.stats()
+            stats["drivers_started"] = pool_stats["drivers_started"]
+            stats["drivers_recycled"] = pool_stats["drivers_recycled"]
+        return stats
+
+# Backend that rasterizes in-process with cairosvg (no browser)
+class CairoSVGBackend(RendererBackend):
+
+    name = "cairosvg"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        try:
+            import cairosvg
+            return True
+        except (ImportError, OSError):
+            return False
+
+    def _render(self, svg_code: str, width: int, height: int) -> bytes:
+        try:
+            import cairosvg
+        except (ImportError, OSError):
+            raise ImportError("Please install cairosvg: pip install cairosvg")
+        return cairosvg.svg2png(
+            bytestring=svg_code.encode("utf-8"),
+            output_width=width,
+            output_height=height,
+            background_color="white",
+            unsafe=False
+        )
+
+# Registry of available backends by name
+RENDERER_BACKENDS = {
+    ChromeBackend.name: ChromeBackend,
+    CairoSVGBackend.name: CairoSVGBackend
+}
+
+# Function to create a backend by name
+def create_backend(name: str) -> RendererBackend:
+    if name not in RENDERER_BACKENDS:
+        raise ValueError(f"Unknown renderer '{name}'. Choose from: {', '.join(RENDERER_BACKENDS)}")
+    backend_class = RENDERER_BACKENDS[name]
+    if not backend_class.is_available():
+        raise ImportError(f"Renderer '{name}' is not available. Install its dependencies first.")
+    return backend_class()
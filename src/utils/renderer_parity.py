@@ -0,0 +1,108 @@
+import argparse
+import glob
+import io
+import os
+import sys
+
+# Import the SVGRenderer class and the rasterizer backends
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from utils.render_backends import RENDERER_BACKENDS, create_backend
+from utils.svg_renderer import SVGRenderer
+
+# Default corpus of SVGs used to compare backends
+DEFAULT_CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'assets', 'parity')
+
+# Function to compute the fraction of pixels that differ between two PNG images
+def pixel_diff(png_a: bytes, png_b: bytes, channel_threshold: int = 32) -> float:
+    """
+    Compare two PNG images pixel by pixel.
+
+    Args:
+        png_a (bytes): First PNG image
+        png_b (bytes): Second PNG image
+        channel_threshold (int): Minimum per-channel difference (0-255) for a pixel to count as different
+
+    Returns:
+        float: Fraction of pixels that differ (1.0 if the sizes do not match)
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        raise ImportError("Please install Pillow: pip install Pillow")
+    image_a = Image.open(io.BytesIO(png_a)).convert("RGB")
+    image_b = Image.open(io.BytesIO(png_b)).convert("RGB")
+    if image_a.size != image_b.size:
+        return 1.0
+    pixels_a = image_a.getdata()
+    pixels_b = image_b.getdata()
+    differing = sum(
+        1 for a, b in zip(pixels_a, pixels_b)
+        if max(abs(a[0] - b[0]), abs(a[1] - b[1]), abs(a[2] - b[2])) > channel_threshold
+    )
+    return differing / (image_a.size[0] * image_a.size[1])
+
+# Function to check a backend against a reference backend on a fixed corpus
+def check_parity(
+        backend_name: str,
+        reference_name: str = "chrome",
+        corpus_dir: str = DEFAULT_CORPUS_DIR,
+        tolerance: float = 0.02,
+        channel_threshold: int = 32
+) -> dict:
+    """
+    Render every SVG in the corpus with both backends and compare the results.
+
+    Args:
+        backend_name (str): Backend under test
+        reference_name (str): Backend whose output is treated as ground truth
+        corpus_dir (str): Directory containing the .svg corpus
+        tolerance (float): Maximum fraction of differing pixels allowed per SVG
+        channel_threshold (int): Minimum per-channel difference for a pixel to count as different
+
+    Returns:
+        dict: Mapping of SVG file name to {"diff": float, "passed": bool}
+    """
+    backend = create_backend(backend_name)
+    reference = create_backend(reference_name)
+    backend.start()
+    reference.start()
+    report = {}
+    try:
+        for svg_path in sorted(glob.glob(os.path.join(corpus_dir, "*.svg"))):
+            with open(svg_path, "r") as file:
+                svg_code = file.read()
+            # Render both at the same canvas size
+            width, height = SVGRenderer.calculate_svg_bounds(svg_code)
+            diff = pixel_diff(
+                backend.render(svg_code, width, height),
+                reference.render(svg_code, width, height),
+                channel_threshold=channel_threshold
+            )
+            report[os.path.basename(svg_path)] = {"diff": diff, "passed": diff <= tolerance}
+    finally:
+        backend.shutdown()
+        reference.shutdown()
+    return report
+
+# Run the parity check from the command line
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Check that a renderer backend matches a reference backend on a fixed SVG corpus.')
+    parser.add_argument('--backend', required=True, choices=list(RENDERER_BACKENDS), help='The backend to check')
+    parser.add_argument('--reference', default='chrome', choices=list(RENDERER_BACKENDS), help='The reference backend (default: chrome)')
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS_DIR, help='Directory of SVG files to render (default: assets/parity)')
+    parser.add_argument('--tolerance', type=float, default=0.02, help='Maximum fraction of differing pixels per SVG (default: 0.02)')
+    parser.add_argument('--channel-threshold', type=int, default=32, help='Per-channel difference (0-255) for a pixel to count as different (default: 32)')
+    args = parser.parse_args()
+    # Run the check and print a report
+    report = check_parity(
+        backend_name=args.backend,
+        reference_name=args.reference,
+        corpus_dir=args.corpus,
+        tolerance=args.tolerance,
+        channel_threshold=args.channel_threshold
+    )
+    for name, result in report.items():
+        status = "PASS" if result["passed"] else "FAIL"
+        print(f"{status}  {name}: {result['diff'] * 100:.2f}% pixels differ")
+    # Exit with a non-zero status if any SVG exceeded the tolerance
+    sys.exit(0 if report and all(result["passed"] for result in report.values()) else 1)
@@ -0,0 +1,497 @@
+import argparse
+import email.utils
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+# Brotli is optional; without it responses are gzip-compressed
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Import the question IDs, the artifact store and the leaderboard summary used by the webUI index
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'results', 'webUI'))
+from benchmark.questions import question_id
+from utils.artifact_store import ArtifactStore
+from generate_models_list import summarize_results
+
+# Content types worth compressing (images other than SVG are already compressed)
+COMPRESSIBLE_TYPES = {
+    "application/json", "image/svg+xml", "text/html", "text/css",
+    "text/javascript", "application/javascript", "text/plain"
+}
+
+# Files smaller than this are sent uncompressed
+MIN_COMPRESS_BYTES = 1024
+
+# Largest page of questions the API returns
+MAX_PAGE_SIZE = 200
+
+# Class holding every model's results, reloaded only when a results file changes
+class ResultsIndex:
+
+    # Function to initialize the index
+    def __init__(self, results_root: str, rescan_interval: float = 1.0):
+        """
+        In-memory index of the benchmark_results.json files under results_root, for the
+        server's JSON endpoints. The directory is rescanned at most every rescan_interval
+        seconds, and a model's results are only read again when their file changes.
+
+        Args:
+            results_root (str): Directory holding the results/<model> directories
+            rescan_interval (float): Seconds between checks for new or changed results
+        """
+        self.results_root = results_root
+        self.rescan_interval = rescan_interval
+        self._models = {}
+        self._questions = None
+        self._last_scan = 0.0
+        self._lock = threading.Lock()
+
+    # Function to pick up new, changed and removed results files
+    def _refresh(self):
+        now = time.monotonic()
+        if now - self._last_scan < self.rescan_interval:
+            return
+        self._last_scan = now
+        found = {}
+        for name in sorted(os.listdir(self.results_root)):
+            path = os.path.join(self.results_root, name, "benchmark_results.json")
+            if name == "webUI" or not os.path.isfile(path):
+                continue
+            mtime = os.stat(path).st_mtime_ns
+            cached = self._models.get(name)
+            if cached is not None and cached[0] == mtime:
+                found[name] = cached
+                continue
+            try:
+                with open(path, "r") as file:
+                    data = json.load(file)
+                found[name] = (mtime, data, summarize_results(data))
+            except (json.JSONDecodeError, KeyError, OSError) as e:
+                print(f"Warning: Could not read {path} ({e})")
+        if found.keys() != self._models.keys() or any(found[name][0] != self._models[name][0] for name in found):
+            # The cross-model question index is rebuilt on next use
+            self._questions = None
+        self._models = found
+
+    # Function to get the leaderboard (the same entries as webUI/leaderboard.json)
+    def leaderboard(self) -> dict:
+        with self._lock:
+            self._refresh()
+            return {"models": {name: summary for name, (_, _, summary) in self._models.items()}}
+
+    # Function to get one page of a model's questions
+    def model_questions(
+            self,
+            model: str,
+            offset: int = 0,
+            limit: int = 50,
+            query: str = "",
+            min_score: float = None,
+            max_score: float = None
+    ) -> dict:
+        """
+        Return a page of a model's questions, optionally filtered by a search term (matched
+        against prompts and requirements) and a score range, or None for an unknown model.
+        """
+        with self._lock:
+            self._refresh()
+            cached = self._models.get(model)
+        if cached is None:
+            return None
+        query = query.lower()
+        questions = [
+            entry for entry in cached[1].get("question_scores", [])
+            if (not query or query in entry["prompt"].lower() or any(query in req.lower() for req in entry["requirements"]))
+            and (min_score is None or entry["score"] >= min_score)
+            and (max_score is None or entry["score"] <= max_score)
+        ]
+        return {
+            "model": model,
+            "total": len(questions),
+            "offset": offset,
+            "limit": limit,
+            "questions": questions[offset:offset + limit]
+        }
+
+    # Function to get how every model did on one question
+    def question(self, qid: str) -> dict:
+        """Return the question with each model's score and artifact paths, best first, or None if no model answered it."""
+        with self._lock:
+            self._refresh()
+            if self._questions is None:
+                self._questions = {}
+                for name, (_, data, _) in self._models.items():
+                    for entry in data.get("question_scores", []):
+                        self._questions.setdefault(entry.get("question_id") or question_id(entry), []).append((name, entry))
+            answers = self._questions.get(qid)
+        if not answers:
+            return None
+        _, first = answers[0]
+        results = []
+        for name, entry in answers:
+            artifact = f"/{urllib.parse.quote(name)}/question_{entry.get('question_id') or entry['question_index']}"
+            result = {"model": name, "score": entry["score"], "svg": f"{artifact}.svg", "thumbnail": f"{artifact}.thumb.webp"}
+            for key in ("rejected", "error"):
+                if key in entry:
+                    result[key] = entry[key]
+            results.append(result)
+        results.sort(key=lambda item: item["score"], reverse=True)
+        return {"question_id": qid, "prompt": first["prompt"], "requirements": first["requirements"], "results": results}
+
+# Class to serve the results directory and the webUI
+class ResultsServer:
+
+    # Function to initialize the results server
+    def __init__(
+            self,
+            results_root: str = "results",
+            host: str = "0.0.0.0",
+            port: int = 8000,
+            compression_cache_mb: int = 64,
+            quiet: bool = False
+    ):
+        """
+        Threaded HTTP server for the results directory, replacing python -m http.server.
+        JSON, SVG and the webUI's files are gzip- or brotli-compressed (compressed files are
+        cached in memory); every file is sent with an ETag and Last-Modified so browsers
+        revalidate instead of downloading again; byte ranges are supported. A file missing
+        from a model's directory is served from its packed artifact store, if it has one.
+        It also serves JSON endpoints computed from a ResultsIndex:
+
+            /api/leaderboard                    every model's averages and per-question scores
+            /api/models/<model>/questions       a page of a model's questions (offset, limit, q, min_score, max_score)
+            /api/questions/<question_id>        every model's score and artifacts for one question
+
+        Args:
+            results_root (str): Directory to serve (holding the results/<model> directories and webUI)
+            host (str): Interface to listen on
+            port (int): Port to listen on (0 picks a free port)
+            compression_cache_mb (int): Memory for compressed files, in MB
+            quiet (bool): Do not log requests
+        """
+        self.results_root = os.path.abspath(results_root)
+        self.index = ResultsIndex(self.results_root)
+        self.compression_cache_bytes = compression_cache_mb * 1024 * 1024
+        self.quiet = quiet
+        self._compressed = OrderedDict()
+        self._compressed_bytes = 0
+        self._stores = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    # Property with the base URL of the server
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{'localhost' if host in ('0.0.0.0', '') else host}:{port}"
+
+    # Function to start serving in a background thread
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    # Function to serve in the calling thread until interrupted
+    def serve_forever(self):
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._server.server_close()
+
+    # Function to stop serving
+    def shutdown(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    # Function to get the packed artifact store of a results directory, if it has one
+    def store_for(self, directory: str):
+        with self._lock:
+            store = self._stores.get(directory)
+            if store is None:
+                store = ArtifactStore.open_existing(directory)
+                if store is not None:
+                    self._stores[directory] = store
+            return store
+
+    # Function to get a file or stored artifact compressed with an encoding, compressing it on first request
+    def compressed(self, source: str, size: int, mtime: float, read, encoding: str) -> bytes:
+        key = (source, mtime, size, encoding)
+        with self._lock:
+            data = self._compressed.get(key)
+            if data is not None:
+                self._compressed.move_to_end(key)
+                return data
+        data = compress(read(0, size), encoding)
+        with self._lock:
+            if key not in self._compressed:
+                self._compressed[key] = data
+                self._compressed_bytes += len(data)
+            while self._compressed_bytes > self.compression_cache_bytes and self._compressed:
+                _, evicted = self._compressed.popitem(last=False)
+                self._compressed_bytes -= len(evicted)
+        return data
+
+    # Function to create the request handler class bound to this server
+    def _make_handler(self):
+        server = self
+
+        class Handler(SimpleHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, directory=server.results_root, **kwargs)
+
+            def log_message(self, format, *args):
+                if not server.quiet:
+                    super().log_message(format, *args)
+
+            def do_GET(self):
+                self._handle(send_body=True)
+
+            def do_HEAD(self):
+                self._handle(send_body=False)
+
+            # Function to pick the compression for a response from the Accept-Encoding header
+            def _choose_encoding(self, content_type: str, size: int):
+                if content_type.split(";")[0] not in COMPRESSIBLE_TYPES or size < MIN_COMPRESS_BYTES:
+                    return None
+                accepted = set()
+                for part in self.headers.get("Accept-Encoding", "").split(","):
+                    name, _, params = part.strip().partition(";")
+                    if params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+                        accepted.add(name.strip().lower())
+                if brotli is not None and "br" in accepted:
+                    return "br"
+                if "gzip" in accepted:
+                    return "gzip"
+                return None
+
+            # Function to check the conditional request headers against a response's validators
+            def _not_modified(self, etag: str, mtime: float = None) -> bool:
+                if_none_match = self.headers.get("If-None-Match")
+                if if_none_match is not None:
+                    return if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]
+                if_modified_since = self.headers.get("If-Modified-Since")
+                if if_modified_since and mtime is not None:
+                    try:
+                        since = email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+                    except (TypeError, ValueError, IndexError, OverflowError):
+                        return False
+                    return int(mtime) <= since
+                return False
+
+            # Function to send a response's status and headers, and its body for GET requests
+            def _send(self, status: int, headers: dict, body: bytes, send_body: bool):
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if send_body:
+                    self.wfile.write(body)
+
+            def _handle(self, send_body: bool):
+                parsed = urllib.parse.urlsplit(self.path)
+                if parsed.path.startswith("/api/"):
+                    self._handle_api(parsed, send_body)
+                    return
+                path = self.translate_path(self.path)
+                if os.path.isdir(path):
+                    if not parsed.path.endswith("/"):
+                        location = urllib.parse.urlunsplit(("", "", parsed.path + "/", parsed.query, ""))
+                        self._send(301, {"Location": location}, b"", send_body)
+                        return
+                    index_path = os.path.join(path, "index.html")
+                    if not os.path.isfile(index_path):
+                        # Directory listing, as http.server does
+                        super().do_GET() if send_body else super().do_HEAD()
+                        return
+                    path = index_path
+                if os.path.isfile(path):
+                    stat = os.stat(path)
+
+                    # Function to read part of the file
+                    def read(start: int, length: int) -> bytes:
+                        with open(path, "rb") as file:
+                            file.seek(start)
+                            return file.read(length)
+
+                    self._send_file(path, stat.st_size, stat.st_mtime, read, send_body)
+                    return
+                # Artifacts written with --artifact-store packed
+                name = os.path.basename(path)
+                store = server.store_for(os.path.dirname(path))
+                stored = store.stat(name) if store is not None else None
+                if stored is None:
+                    self.send_error(404, "File not found")
+                    return
+                size, mtime = stored
+                self._send_file(
+                    f"{store.path}:{name}", size, mtime,
+                    lambda start, length: store.read_range(name, start, length), send_body
+                )
+
+            # Function to send a file or stored artifact, compressed or as the requested byte range
+            def _send_file(self, source: str, size: int, mtime: float, read, send_body: bool):
+                """
+                Args:
+                    source (str): Path of the file (or store and artifact name), for its content type and the compression cache
+                    size (int): Size in bytes
+                    mtime (float): Modification time
+                    read (callable): Function returning length bytes from offset start
+                    send_body (bool): Send the body (False for HEAD requests)
+                """
+                content_type = self.guess_type(source)
+                etag = f'"{int(mtime * 1e6):x}-{size:x}"'
+                byte_range = self._parse_range(size, etag)
+                # Ranges refer to the file itself, so they are never compressed
+                encoding = self._choose_encoding(content_type, size) if byte_range is None else None
+                if encoding is not None:
+                    etag = f'{etag[:-1]}-{encoding}"'
+                headers = {
+                    "Content-Type": content_type,
+                    "ETag": etag,
+                    "Last-Modified": email.utils.formatdate(mtime, usegmt=True),
+                    "Cache-Control": "no-cache",
+                    "Accept-Ranges": "bytes"
+                }
+                if content_type.split(";")[0] in COMPRESSIBLE_TYPES:
+                    headers["Vary"] = "Accept-Encoding"
+                if self._not_modified(etag, mtime):
+                    self.send_response(304)
+                    for name in ("ETag", "Last-Modified", "Cache-Control", "Vary"):
+                        if name in headers:
+                            self.send_header(name, headers[name])
+                    self.end_headers()
+                    return
+                if byte_range == "unsatisfiable":
+                    self._send(416, {"Content-Range": f"bytes */{size}"}, b"", send_body)
+                    return
+                if encoding is not None:
+                    headers["Content-Encoding"] = encoding
+                    self._send(200, headers, server.compressed(source, size, mtime, read, encoding), send_body)
+                    return
+                start, end = byte_range if byte_range is not None else (0, size - 1)
+                length = max(0, end - start + 1)
+                if byte_range is not None:
+                    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+                self.send_response(206 if byte_range is not None else 200)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(length))
+                self.end_headers()
+                # Send large bodies in chunks rather than reading them into memory at once
+                offset = start
+                while send_body and offset <= end:
+                    chunk = read(offset, min(1024 * 1024, end - offset + 1))
+                    if not chunk:
+                        break
+                    self.wfile.write(chunk)
+                    offset += len(chunk)
+
+            # Function to parse a single-range Range header into (start, end), "unsatisfiable" or None for the whole file
+            def _parse_range(self, size: int, etag: str):
+                header = self.headers.get("Range")
+                if not header or not header.startswith("bytes=") or "," in header:
+                    return None
+                # A range of an older version of the file is not useful: send the whole file
+                if_range = self.headers.get("If-Range")
+                if if_range is not None and if_range.strip() != etag:
+                    return None
+                first, _, last = header[len("bytes="):].strip().partition("-")
+                try:
+                    if first:
+                        start = int(first)
+                        end = min(int(last), size - 1) if last else size - 1
+                    else:
+                        # Suffix range: the last N bytes
+                        start = max(0, size - int(last))
+                        end = size - 1
+                except ValueError:
+                    return None
+                if start >= size or start > end:
+                    return "unsatisfiable"
+                return (start, end)
+
+            # Function to answer a request to the JSON endpoints
+            def _handle_api(self, parsed, send_body: bool):
+                parts = [urllib.parse.unquote(part) for part in parsed.path.split("/")[2:] if part]
+                params = urllib.parse.parse_qs(parsed.query)
+                try:
+                    if parts == ["leaderboard"]:
+                        payload = server.index.leaderboard()
+                    elif len(parts) == 3 and parts[0] == "models" and parts[2] == "questions":
+                        payload = server.index.model_questions(
+                            parts[1],
+                            offset=max(0, int(params.get("offset", ["0"])[0])),
+                            limit=min(MAX_PAGE_SIZE, max(1, int(params.get("limit", ["50"])[0]))),
+                            query=params.get("q", [""])[0],
+                            min_score=float(params["min_score"][0]) if "min_score" in params else None,
+                            max_score=float(params["max_score"][0]) if "max_score" in params else None
+                        )
+                    elif len(parts) == 2 and parts[0] == "questions":
+                        payload = server.index.question(parts[1])
+                    else:
+                        self._send_json(404, {"error": "Unknown endpoint"}, send_body)
+                        return
+                except ValueError as e:
+                    self._send_json(400, {"error": f"Invalid parameter: {e}"}, send_body)
+                    return
+                if payload is None:
+                    self._send_json(404, {"error": "Not found"}, send_body)
+                    return
+                self._send_json(200, payload, send_body)
+
+            # Function to send a JSON response, compressed and with an ETag of its content
+            def _send_json(self, status: int, payload: dict, send_body: bool):
+                body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+                headers = {"Content-Type": "application/json", "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+                if status == 200:
+                    headers["ETag"] = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+                    if self._not_modified(headers["ETag"]):
+                        self.send_response(304)
+                        for name, value in headers.items():
+                            self.send_header(name, value)
+                        self.end_headers()
+                        return
+                encoding = self._choose_encoding("application/json", len(body))
+                if encoding is not None:
+                    headers["Content-Encoding"] = encoding
+                    body = compress(body, encoding)
+                self._send(status, headers, body, send_body)
+
+        return Handler
+
+# Function to compress data with an HTTP content encoding ("gzip" or "br")
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        # Quality 5 compresses about as well as gzip -9, many times faster than brotli's default of 11
+        return brotli.compress(data, quality=5)
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+# Run the results server from the command line
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Serve the benchmark results and the webUI.')
+    parser.add_argument('--results-dir', default='results', help='Directory to serve (default: results)')
+    parser.add_argument('--host', default='0.0.0.0', help='Interface to listen on (default: all interfaces)')
+    parser.add_argument('--port', type=int, default=8000, help='Port to listen on (default: 8000)')
+    parser.add_argument('--quiet', action='store_true', help='Do not log requests')
+    args = parser.parse_args()
+    server = ResultsServer(results_root=args.results_dir, host=args.host, port=args.port, quiet=args.quiet)
+    print(f"WebUI started at {server.url}/webUI")
+    server.serve_forever()
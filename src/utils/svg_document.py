@@ -0,0 +1,247 @@
+import html.entities
+import os
+import re
+import sys
+import xml.etree.ElementTree as ET
+from functools import cached_property
+
+# Import the geometry analyzer
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from utils.svg_geometry import compute_bounds
+
+# Canvas size used when nothing in the SVG gives one
+DEFAULT_DIMENSIONS = (800, 600)
+
+# Entities predefined by XML (any other named entity, e.g. &nbsp;, is an error)
+XML_ENTITIES = {"amp", "lt", "gt", "quot", "apos"}
+
+# Namespaces of prefixes models use without declaring them
+KNOWN_NAMESPACES = {
+    "xlink": "http://www.w3.org/1999/xlink",
+    "svg": "http://www.w3.org/2000/svg",
+    "xhtml": "http://www.w3.org/1999/xhtml",
+    "sodipodi": "http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd",
+    "inkscape": "http://www.inkscape.org/namespaces/inkscape"
+}
+
+_AMPERSAND_RE = re.compile(r"&(?!#\d+;|#x[0-9a-fA-F]+;|[A-Za-z][\w.-]*;)")
+_NAMED_ENTITY_RE = re.compile(r"&([A-Za-z][\w.-]*);")
+_PREFIX_RE = re.compile(r"(?:</?|\s)([A-Za-z_][\w.-]*):[A-Za-z_][\w.-]*")
+_DECLARED_PREFIX_RE = re.compile(r"xmlns:([A-Za-z_][\w.-]*)\s*=")
+
+# Function to parse a dimension string into pixels
+def parse_dimension(dim_str):
+    """
+    Parse dimension string and convert to pixels.
+
+    Args:
+        dim_str (str): Dimension string like "100px", "50%", "2in", etc.
+
+    Returns:
+        int: Dimension in pixels, or None if cannot parse
+    """
+    if not dim_str:
+        return None
+    # Remove whitespace
+    dim_str = dim_str.strip()
+    # Handle percentage (relative to a 1000px base)
+    if dim_str.endswith('%'):
+        try:
+            return int(1000 * float(dim_str[:-1]) / 100)
+        except ValueError:
+            return None
+    # Handle units
+    unit_multipliers = {
+        'px': 1,
+        'pt': 1.33,  # 1 pt = 1.33 px
+        'pc': 16,    # 1 pc = 16 px
+        'mm': 3.78,  # 1 mm = 3.78 px
+        'cm': 37.8,  # 1 cm = 37.8 px
+        'in': 96,    # 1 in = 96 px
+    }
+    match = re.match(r'^(\d+(?:\.\d+)?)\s*([a-z%]*)$', dim_str.lower())
+    if match:
+        value = float(match.group(1))
+        unit = match.group(2) or 'px'
+        return int(value * unit_multipliers.get(unit, 1))
+    # If no unit, assume pixels
+    try:
+        return int(float(dim_str))
+    except ValueError:
+        return None
+
+# Function to fix the mistakes that most often make generated SVGs invalid XML
+def repair_svg(code: str) -> str:
+    """
+    Repair common, recoverable XML errors in generated SVG code: text after the closing
+    </svg>, unescaped ampersands, HTML entities such as &nbsp; and namespace prefixes
+    (usually xlink:) used without being declared. Browsers are lenient about some of
+    these, so the repaired code sizes the SVG the way it will actually be drawn.
+
+    Args:
+        code (str): SVG code as a string
+
+    Returns:
+        str: The repaired code (unchanged if there was nothing to repair)
+    """
+    # Drop anything after the last closing tag
+    end = code.rfind("</svg>")
+    if end != -1:
+        code = code[:end + len("</svg>")]
+    # Escape bare ampersands, and turn HTML entities into character references
+    code = _AMPERSAND_RE.sub("&amp;", code)
+    code = _NAMED_ENTITY_RE.sub(_replace_entity, code)
+    # Declare undeclared namespace prefixes on the root element
+    declared = set(_DECLARED_PREFIX_RE.findall(code))
+    missing = sorted(
+        prefix for prefix in set(_PREFIX_RE.findall(code))
+        if prefix not in declared and prefix not in ("xml", "xmlns")
+    )
+    if missing:
+        declarations = "".join(
+            f' xmlns:{prefix}="{KNOWN_NAMESPACES.get(prefix, "urn:undeclared:" + prefix)}"' for prefix in missing
+        )
+        match = re.search(r"<svg\b", code)
+        if match:
+            code = code[:match.end()] + declarations + code[match.end():]
+    return code
+
+# Function to replace one named entity with something XML accepts
+def _replace_entity(match) -> str:
+    name = match.group(1)
+    if name in XML_ENTITIES:
+        return match.group()
+    codepoint = html.entities.name2codepoint.get(name)
+    if codepoint is None:
+        return f"&amp;{name};"
+    return f"&#{codepoint};"
+
+# Class holding an SVG parsed once and shared by sizing, validation and rendering
+class SVGDocument:
+
+    # Function to initialize the document
+    def __init__(self, code: str):
+        """
+        Generated SVG code with its parse tree, dimensions and bounds, each computed
+        once on first use. Pass the document (rather than the code) between stages so
+        large SVGs are not parsed again. Pickling drops the tree but keeps everything
+        already computed, so a render worker receiving the document does not re-parse
+        it to size the canvas.
+
+        Args:
+            code (str): SVG code as a string
+        """
+        self.code = code.strip()
+        # Error of the first parse attempt, and whether the repaired code parsed instead (code
+        # then holds the repaired code, so the tree and the code always describe the same SVG)
+        self.parse_error = None
+        self.recovered = False
+
+    # Function to wrap SVG code in a document (documents are returned as they are)
+    @classmethod
+    def of(cls, svg):
+        return svg if isinstance(svg, cls) else cls(svg)
+
+    # Function to create a document from an already parsed (e.g. sanitized) tree
+    @classmethod
+    def from_tree(cls, root):
+        document = cls(ET.tostring(root, encoding="unicode"))
+        # Fill the cached property instead of parsing the serialized code again
+        document.root = root
+        return document
+
+    # Property with the XML root element (None if the code could not be parsed, even after repairs)
+    @cached_property
+    def root(self):
+        try:
+            return ET.fromstring(self.code)
+        except ET.ParseError as e:
+            self.parse_error = str(e)
+        repaired = repair_svg(self.code)
+        if repaired != self.code:
+            try:
+                root = ET.fromstring(repaired)
+                self.recovered = True
+                # Render and save what was parsed, not the malformed original
+                self.code = repaired
+                return root
+            except ET.ParseError:
+                pass
+        return None
+
+    # Function to read an attribute of the root element (from the raw code if it does not parse)
+    def _root_attribute(self, name: str):
+        if self.root is not None:
+            return self.root.get(name)
+        match = re.search(rf'(?<![\w:-]){name}\s*=\s*["\']([^"\']*)["\']', self.code)
+        return match.group(1) if match else None
+
+    # Property with the explicit width and height in pixels, or None
+    @cached_property
+    def explicit_size(self):
+        width = parse_dimension(self._root_attribute("width"))
+        height = parse_dimension(self._root_attribute("height"))
+        if width and height:
+            return (width, height)
+        return None
+
+    # Property with the viewBox as (min_x, min_y, width, height), or None
+    @cached_property
+    def viewbox(self):
+        viewbox = self._root_attribute("viewBox")
+        if not viewbox:
+            return None
+        parts = re.split(r"[\s,]+", viewbox.strip())
+        if len(parts) < 4:
+            return None
+        try:
+            return tuple(float(part) for part in parts[:4])
+        except ValueError:
+            return None
+
+    # Property with the bounds of the drawn geometry as (min_x, min_y, max_x, max_y), or None
+    @cached_property
+    def bounds(self):
+        if self.root is None:
+            return None
+        return compute_bounds(self.root)
+
+    # Property with the declared size of the SVG
+    @cached_property
+    def dimensions(self) -> tuple:
+        """(width, height) in pixels from width/height or the viewBox (at least 200px), or (800, 600) as default."""
+        if self.explicit_size:
+            return self.explicit_size
+        if self.viewbox:
+            return (max(int(self.viewbox[2]), 200), max(int(self.viewbox[3]), 200))
+        return DEFAULT_DIMENSIONS
+
+    # Property with the canvas size to render at
+    @cached_property
+    def canvas_size(self) -> tuple:
+        """(width, height) from width/height, else the viewBox expanded to fit the content, else the content bounds."""
+        if self.explicit_size:
+            return self.explicit_size
+        viewbox = self.viewbox
+        bounds = self.bounds
+        if viewbox:
+            _, _, vb_width, vb_height = viewbox
+            if bounds is None:
+                return (int(vb_width), int(vb_height))
+            min_x, min_y, max_x, max_y = bounds
+            # Use viewBox as minimum, but expand if content is larger
+            final_width = max(vb_width, max_x - min_x + abs(min_x) * 2)
+            final_height = max(vb_height, max_y - min_y + abs(min_y) * 2)
+            return (int(final_width), int(final_height))
+        if bounds is not None:
+            # Add some margin around the content
+            min_x, min_y, max_x, max_y = bounds
+            margin = 20
+            return (max(int(max_x - min_x + margin * 2), 200), max(int(max_y - min_y + margin * 2), 200))
+        return DEFAULT_DIMENSIONS
+
+    # Function to drop the parse tree when pickling (e.g. to send the document to a render process)
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("root", None)
+        return state
@@ -0,0 +1,554 @@
+import argparse
+import glob
+import math
+import os
+import re
+import sys
+import time
+import xml.etree.ElementTree as ET
+
+# Add the src directory to the path so the benchmark can import the renderer
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+# Affine transform (a, b, c, d, e, f), mapping (x, y) to (a*x + c*y + e, b*x + d*y + f)
+IDENTITY = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+# Number of arguments taken by each path command
+PATH_ARGUMENTS = {"M": 2, "L": 2, "H": 1, "V": 1, "C": 6, "S": 4, "Q": 4, "T": 2, "A": 7, "Z": 0}
+
+# Elements whose children are never drawn directly (only referenced, e.g. by <use> or fill="url(#...)")
+NON_RENDERED_TAGS = {
+    "defs", "symbol", "clipPath", "mask", "marker", "pattern", "linearGradient", "radialGradient",
+    "filter", "style", "script", "title", "desc", "metadata"
+}
+
+# Pixels per unit of absolute lengths
+UNIT_MULTIPLIERS = {"": 1.0, "px": 1.0, "pt": 96 / 72, "pc": 16.0, "mm": 96 / 25.4, "cm": 96 / 2.54, "in": 96.0}
+
+# Distance of the control points of a cubic Bezier approximating a quarter ellipse
+KAPPA = 4 * (math.sqrt(2) - 1) / 3
+
+# Deepest chain of <use> references followed
+MAX_USE_DEPTH = 8
+
+_NUMBER_RE = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+_COMMAND_RE = re.compile(r"[MmZzLlHhVvCcSsQqTtAa]")
+_SEPARATOR_RE = re.compile(r"[\s,]*")
+_FLAG_RE = re.compile(r"[01]")
+_LENGTH_RE = re.compile(r"\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*([a-zA-Z%]*)\s*$")
+_TRANSFORM_RE = re.compile(r"(matrix|translate|scale|rotate|skewX|skewY)\s*\(([^)]*)\)")
+
+# Function to combine two transforms (the result applies second, then first)
+def multiply(first: tuple, second: tuple) -> tuple:
+    a1, b1, c1, d1, e1, f1 = first
+    a2, b2, c2, d2, e2, f2 = second
+    return (
+        a1 * a2 + c1 * b2,
+        b1 * a2 + d1 * b2,
+        a1 * c2 + c1 * d2,
+        b1 * c2 + d1 * d2,
+        a1 * e2 + c1 * f2 + e1,
+        b1 * e2 + d1 * f2 + f1
+    )
+
+# Function to parse a transform attribute such as "translate(10 20) rotate(45 50 50)"
+def parse_transform(text: str) -> tuple:
+    """
+    Parse an SVG transform list into one matrix. Malformed entries are ignored.
+
+    Args:
+        text (str): Value of a transform attribute
+
+    Returns:
+        tuple: The matrix (a, b, c, d, e, f)
+    """
+    matrix = IDENTITY
+    for name, arguments in _TRANSFORM_RE.findall(text or ""):
+        values = [float(value) for value in _NUMBER_RE.findall(arguments)]
+        if name == "matrix" and len(values) == 6:
+            step = tuple(values)
+        elif name == "translate" and len(values) in (1, 2):
+            step = (1.0, 0.0, 0.0, 1.0, values[0], values[1] if len(values) == 2 else 0.0)
+        elif name == "scale" and len(values) in (1, 2):
+            step = (values[0], 0.0, 0.0, values[-1], 0.0, 0.0)
+        elif name == "rotate" and len(values) in (1, 3):
+            angle = math.radians(values[0])
+            cos, sin = math.cos(angle), math.sin(angle)
+            step = (cos, sin, -sin, cos, 0.0, 0.0)
+            if len(values) == 3:
+                # Rotate about (cx, cy)
+                cx, cy = values[1], values[2]
+                step = multiply(multiply((1.0, 0.0, 0.0, 1.0, cx, cy), step), (1.0, 0.0, 0.0, 1.0, -cx, -cy))
+        elif name == "skewX" and len(values) == 1:
+            step = (1.0, 0.0, math.tan(math.radians(values[0])), 1.0, 0.0, 0.0)
+        elif name == "skewY" and len(values) == 1:
+            step = (1.0, math.tan(math.radians(values[0])), 0.0, 1.0, 0.0, 0.0)
+        else:
+            continue
+        matrix = multiply(matrix, step)
+    return matrix
+
+# Function to parse a length attribute in pixels
+def parse_length(value: str, default=0.0):
+    """
+    Parse a length such as "12", "12px" or "1in". Returns default if the attribute is
+    missing, and None if it cannot be resolved statically (percentages, em, malformed).
+    """
+    if value is None:
+        return default
+    match = _LENGTH_RE.match(value)
+    if not match:
+        return None
+    multiplier = UNIT_MULTIPLIERS.get(match.group(2).lower())
+    if multiplier is None:
+        return None
+    return float(match.group(1)) * multiplier
+
+# Function to split path data into commands
+def parse_path(d: str):
+    """
+    Tokenize path data into (command, arguments) pairs. Repeated argument groups are
+    split into separate commands (an implicit repeat after M/m becomes L/l), compact
+    forms such as "1.5.5", "1-2" and arc flags written without separators ("a1 1 0 011 1")
+    are handled, and tokenizing stops at the first error, as browsers stop drawing there.
+
+    Args:
+        d (str): Value of a path's d attribute
+
+    Yields:
+        tuple: (command letter, tuple of float arguments)
+    """
+    position = 0
+    length = len(d)
+    command = None
+    while True:
+        position = _SEPARATOR_RE.match(d, position).end()
+        if position >= length:
+            return
+        match = _COMMAND_RE.match(d, position)
+        if match:
+            command = match.group()
+            position = match.end()
+            if command in "Zz":
+                yield command, ()
+                continue
+        elif command is None or command in "Zz":
+            # Numbers without a command (or after a closepath) are an error
+            return
+        arguments = []
+        for argument_index in range(PATH_ARGUMENTS[command.upper()]):
+            position = _SEPARATOR_RE.match(d, position).end()
+            # The large-arc and sweep flags are single digits
+            pattern = _FLAG_RE if command in "Aa" and argument_index in (3, 4) else _NUMBER_RE
+            number = pattern.match(d, position)
+            if number is None:
+                return
+            arguments.append(float(number.group()))
+            position = number.end()
+        yield command, tuple(arguments)
+        if command == "M":
+            command = "L"
+        elif command == "m":
+            command = "l"
+
+# Class to accumulate the bounding box of transformed geometry
+class BoundsAccumulator:
+
+    # Function to initialize an empty bounding box
+    def __init__(self):
+        self.min_x = self.min_y = math.inf
+        self.max_x = self.max_y = -math.inf
+
+    # Property with the bounds as (min_x, min_y, max_x, max_y), or None if nothing was added
+    @property
+    def bounds(self):
+        if self.min_x > self.max_x:
+            return None
+        return (self.min_x, self.min_y, self.max_x, self.max_y)
+
+    # Function to add a point already in the output coordinate system
+    def _extend(self, x: float, y: float):
+        if not (math.isfinite(x) and math.isfinite(y)):
+            return
+        self.min_x = min(self.min_x, x)
+        self.min_y = min(self.min_y, y)
+        self.max_x = max(self.max_x, x)
+        self.max_y = max(self.max_y, y)
+
+    # Function to add a point
+    def point(self, matrix: tuple, x: float, y: float):
+        a, b, c, d, e, f = matrix
+        self._extend(a * x + c * y + e, b * x + d * y + f)
+
+    # Function to add a cubic Bezier curve, including its extrema
+    def cubic(self, matrix: tuple, x0, y0, x1, y1, x2, y2, x3, y3):
+        # Beziers are affine invariant: transform the control points, then find the extrema
+        a, b, c, d, e, f = matrix
+        xs = (a * x0 + c * y0 + e, a * x1 + c * y1 + e, a * x2 + c * y2 + e, a * x3 + c * y3 + e)
+        ys = (b * x0 + d * y0 + f, b * x1 + d * y1 + f, b * x2 + d * y2 + f, b * x3 + d * y3 + f)
+        self._extend(xs[0], ys[0])
+        self._extend(xs[3], ys[3])
+        for t in _cubic_extrema(*xs) + _cubic_extrema(*ys):
+            mt = 1 - t
+            self._extend(
+                mt ** 3 * xs[0] + 3 * mt * mt * t * xs[1] + 3 * mt * t * t * xs[2] + t ** 3 * xs[3],
+                mt ** 3 * ys[0] + 3 * mt * mt * t * ys[1] + 3 * mt * t * t * ys[2] + t ** 3 * ys[3]
+            )
+
+    # Function to add a quadratic Bezier curve, including its extrema
+    def quadratic(self, matrix: tuple, x0, y0, x1, y1, x2, y2):
+        # Degree elevation gives the same curve as a cubic
+        self.cubic(
+            matrix,
+            x0, y0,
+            x0 + 2 / 3 * (x1 - x0), y0 + 2 / 3 * (y1 - y0),
+            x2 + 2 / 3 * (x1 - x2), y2 + 2 / 3 * (y1 - y2),
+            x2, y2
+        )
+
+    # Function to add an elliptical arc given in SVG endpoint form
+    def arc(self, matrix: tuple, x0, y0, rx, ry, rotation, large_arc, sweep, x, y):
+        rx, ry = abs(rx), abs(ry)
+        if (x0 == x and y0 == y) or rx == 0 or ry == 0:
+            # Degenerate arcs are straight lines (or nothing)
+            self.point(matrix, x0, y0)
+            self.point(matrix, x, y)
+            return
+        # Convert to center form (SVG implementation notes, F.6.5 and F.6.6)
+        phi = math.radians(rotation)
+        cos_phi, sin_phi = math.cos(phi), math.sin(phi)
+        dx, dy = (x0 - x) / 2, (y0 - y) / 2
+        x1p = cos_phi * dx + sin_phi * dy
+        y1p = -sin_phi * dx + cos_phi * dy
+        # Scale up radii too small to reach the end point
+        scale = (x1p / rx) ** 2 + (y1p / ry) ** 2
+        if scale > 1:
+            rx, ry = rx * math.sqrt(scale), ry * math.sqrt(scale)
+        numerator = rx * rx * ry * ry - rx * rx * y1p * y1p - ry * ry * x1p * x1p
+        denominator = rx * rx * y1p * y1p + ry * ry * x1p * x1p
+        factor = math.sqrt(max(0.0, numerator / denominator)) if denominator else 0.0
+        if large_arc == sweep:
+            factor = -factor
+        cxp, cyp = factor * rx * y1p / ry, -factor * ry * x1p / rx
+        cx = cos_phi * cxp - sin_phi * cyp + (x0 + x) / 2
+        cy = sin_phi * cxp + cos_phi * cyp + (y0 + y) / 2
+        start = math.atan2((y1p - cyp) / ry, (x1p - cxp) / rx)
+        delta = math.atan2((-y1p - cyp) / ry, (-x1p - cxp) / rx) - start
+        if sweep and delta < 0:
+            delta += 2 * math.pi
+        elif not sweep and delta > 0:
+            delta -= 2 * math.pi
+        # Approximate each quarter (or less) of the arc with a cubic Bezier
+        segments = max(1, math.ceil(abs(delta) / (math.pi / 2) - 1e-9))
+        step = delta / segments
+        k = 4 / 3 * math.tan(step / 4)
+        ellipse = multiply(matrix, (rx * cos_phi, rx * sin_phi, -ry * sin_phi, ry * cos_phi, cx, cy))
+        angle = start
+        for _ in range(segments):
+            cos1, sin1 = math.cos(angle), math.sin(angle)
+            cos2, sin2 = math.cos(angle + step), math.sin(angle + step)
+            self.cubic(
+                ellipse,
+                cos1, sin1,
+                cos1 - k * sin1, sin1 + k * cos1,
+                cos2 + k * sin2, sin2 - k * cos2,
+                cos2, sin2
+            )
+            angle += step
+
+    # Function to add an axis-aligned ellipse
+    def ellipse(self, matrix: tuple, cx, cy, rx, ry):
+        ellipse = multiply(matrix, (rx, 0.0, 0.0, ry, cx, cy))
+        quarters = ((1, 0), (0, 1), (-1, 0), (0, -1), (1, 0))
+        for (x1, y1), (x2, y2) in zip(quarters, quarters[1:]):
+            self.cubic(ellipse, x1, y1, x1 - KAPPA * y1, y1 + KAPPA * x1, x2 + KAPPA * y2, y2 - KAPPA * x2, x2, y2)
+
+    # Function to add path data
+    def path(self, matrix: tuple, d: str):
+        x = y = start_x = start_y = 0.0
+        # Reflected control point for S/s and T/t
+        control = None
+        previous = None
+        for command, arguments in parse_path(d):
+            upper = command.upper()
+            relative = command != upper
+            if upper == "Z":
+                x, y = start_x, start_y
+                control = None
+                previous = upper
+                continue
+            if upper == "M":
+                x, y = (x + arguments[0], y + arguments[1]) if relative else arguments
+                start_x, start_y = x, y
+                self.point(matrix, x, y)
+                control = None
+            elif upper == "L":
+                x, y = (x + arguments[0], y + arguments[1]) if relative else arguments
+                self.point(matrix, x, y)
+                control = None
+            elif upper == "H":
+                x = x + arguments[0] if relative else arguments[0]
+                self.point(matrix, x, y)
+                control = None
+            elif upper == "V":
+                y = y + arguments[0] if relative else arguments[0]
+                self.point(matrix, x, y)
+                control = None
+            elif upper in "CS":
+                if upper == "C":
+                    x1, y1, x2, y2, end_x, end_y = arguments
+                    if relative:
+                        x1, y1, x2, y2 = x + x1, y + y1, x + x2, y + y2
+                else:
+                    x2, y2, end_x, end_y = arguments
+                    if relative:
+                        x2, y2 = x + x2, y + y2
+                    x1, y1 = (2 * x - control[0], 2 * y - control[1]) if control and previous in "CS" else (x, y)
+                if relative:
+                    end_x, end_y = x + end_x, y + end_y
+                self.cubic(matrix, x, y, x1, y1, x2, y2, end_x, end_y)
+                control = (x2, y2)
+                x, y = end_x, end_y
+            elif upper in "QT":
+                if upper == "Q":
+                    x1, y1, end_x, end_y = arguments
+                    if relative:
+                        x1, y1 = x + x1, y + y1
+                else:
+                    end_x, end_y = arguments
+                    x1, y1 = (2 * x - control[0], 2 * y - control[1]) if control and previous in "QT" else (x, y)
+                if relative:
+                    end_x, end_y = x + end_x, y + end_y
+                self.quadratic(matrix, x, y, x1, y1, end_x, end_y)
+                control = (x1, y1)
+                x, y = end_x, end_y
+            elif upper == "A":
+                rx, ry, rotation, large_arc, sweep, end_x, end_y = arguments
+                if relative:
+                    end_x, end_y = x + end_x, y + end_y
+                self.arc(matrix, x, y, rx, ry, rotation, large_arc, sweep, end_x, end_y)
+                x, y = end_x, end_y
+                control = None
+            previous = upper
+
+# Function to find the parameters in (0, 1) where one coordinate of a cubic Bezier has an extremum
+def _cubic_extrema(p0: float, p1: float, p2: float, p3: float) -> tuple:
+    # The derivative is the quadratic a*t^2 + b*t + c
+    a = -p0 + 3 * p1 - 3 * p2 + p3
+    b = 2 * (p0 - 2 * p1 + p2)
+    c = p1 - p0
+    if abs(a) < 1e-12:
+        roots = (-c / b,) if abs(b) > 1e-12 else ()
+    else:
+        discriminant = b * b - 4 * a * c
+        if discriminant < 0:
+            return ()
+        root = math.sqrt(discriminant)
+        roots = ((-b + root) / (2 * a), (-b - root) / (2 * a))
+    return tuple(t for t in roots if 0 < t < 1)
+
+# Function to get the local name of an element (without its namespace)
+def _local_name(element) -> str:
+    tag = element.tag
+    if not isinstance(tag, str):
+        # Comments and processing instructions
+        return ""
+    return tag.rsplit("}", 1)[-1]
+
+# Function to get the id an href points to
+def _href_id(element):
+    for name, value in element.attrib.items():
+        if name == "href" or name.endswith("}href"):
+            return value[1:] if value.startswith("#") else None
+    return None
+
+# Function to parse the numbers of a points attribute into (x, y) pairs
+def _points(text: str) -> list:
+    values = [float(value) for value in _NUMBER_RE.findall(text or "")]
+    return list(zip(values[0::2], values[1::2]))
+
+# Function to add the geometry of one element (not its children)
+def _add_shape(accumulator: BoundsAccumulator, element, name: str, matrix: tuple):
+    get = element.get
+    if name == "path":
+        accumulator.path(matrix, get("d", ""))
+    elif name == "rect" or name == "image" or name == "foreignObject":
+        x, y = parse_length(get("x")), parse_length(get("y"))
+        width, height = parse_length(get("width"), None), parse_length(get("height"), None)
+        if None in (x, y, width, height) or width < 0 or height < 0:
+            return
+        for corner_x, corner_y in ((x, y), (x + width, y), (x, y + height), (x + width, y + height)):
+            accumulator.point(matrix, corner_x, corner_y)
+    elif name == "circle":
+        cx, cy, r = parse_length(get("cx")), parse_length(get("cy")), parse_length(get("r"))
+        if None not in (cx, cy, r) and r > 0:
+            accumulator.ellipse(matrix, cx, cy, r, r)
+    elif name == "ellipse":
+        cx, cy = parse_length(get("cx")), parse_length(get("cy"))
+        rx, ry = parse_length(get("rx"), None), parse_length(get("ry"), None)
+        # A missing radius takes the value of the other one
+        rx, ry = (rx if rx is not None else ry), (ry if ry is not None else rx)
+        if None not in (cx, cy, rx, ry) and rx > 0 and ry > 0:
+            accumulator.ellipse(matrix, cx, cy, rx, ry)
+    elif name == "line":
+        coordinates = [parse_length(get(attribute)) for attribute in ("x1", "y1", "x2", "y2")]
+        if None not in coordinates:
+            accumulator.point(matrix, coordinates[0], coordinates[1])
+            accumulator.point(matrix, coordinates[2], coordinates[3])
+    elif name == "polyline" or name == "polygon":
+        for x, y in _points(get("points")):
+            accumulator.point(matrix, x, y)
+    elif name == "text":
+        # Estimate the text box (the font metrics are unknown): 0.6em per character, one em tall above the baseline
+        x = _first_length(get("x"))
+        y = _first_length(get("y"))
+        font_size = parse_length(get("font-size"), 16.0) or 16.0
+        width = len("".join(element.itertext()).strip()) * 0.6 * font_size
+        anchor = get("text-anchor", "start")
+        left = x - width / 2 if anchor == "middle" else x - width if anchor == "end" else x
+        for corner_x, corner_y in ((left, y - font_size), (left + width, y - font_size), (left, y), (left + width, y)):
+            accumulator.point(matrix, corner_x, corner_y)
+
+# Function to parse the first value of a coordinate list (e.g. a text's x="10 20 30")
+def _first_length(text: str) -> float:
+    if not text:
+        return 0.0
+    value = parse_length(text.replace(",", " ").split()[0])
+    return value if value is not None else 0.0
+
+# Function to compute the bounds of everything drawn in an SVG
+def compute_bounds(root):
+    """
+    Compute the bounding box of the drawn geometry of an SVG in the root's user space,
+    in one walk over the tree. Transforms on groups and elements are applied, curves and
+    arcs contribute their extrema, <use> references are followed, and definitions
+    (<defs>, <symbol>, gradients, clip paths, ...) and display="none" subtrees are
+    skipped. Strokes are not included.
+
+    Args:
+        root: XML root element of the SVG
+
+    Returns:
+        tuple: (min_x, min_y, max_x, max_y), or None if nothing is drawn
+    """
+    accumulator = BoundsAccumulator()
+    elements_by_id = None
+    stack = [(child, IDENTITY, 0) for child in reversed(list(root))]
+    while stack:
+        element, matrix, depth = stack.pop()
+        name = _local_name(element)
+        if not name or name in NON_RENDERED_TAGS or element.get("display") == "none":
+            continue
+        if element.get("transform"):
+            matrix = multiply(matrix, parse_transform(element.get("transform")))
+        if name == "use":
+            target_id = _href_id(element)
+            if target_id is None or depth >= MAX_USE_DEPTH:
+                continue
+            # Index the ids the first time a <use> is found
+            if elements_by_id is None:
+                elements_by_id = {item.get("id"): item for item in root.iter() if item.get("id")}
+            target = elements_by_id.get(target_id)
+            if target is None:
+                continue
+            offset = (1.0, 0.0, 0.0, 1.0, parse_length(element.get("x")) or 0.0, parse_length(element.get("y")) or 0.0)
+            matrix = multiply(matrix, offset)
+            # A referenced <symbol> is drawn like a group
+            children = list(target) if _local_name(target) == "symbol" else [target]
+            stack.extend((child, matrix, depth + 1) for child in reversed(children))
+            continue
+        if name == "svg":
+            # Nested viewports are positioned at (x, y); their own viewBox scaling is ignored
+            offset = (1.0, 0.0, 0.0, 1.0, parse_length(element.get("x")) or 0.0, parse_length(element.get("y")) or 0.0)
+            matrix = multiply(matrix, offset)
+        _add_shape(accumulator, element, name, matrix)
+        if name != "text":
+            stack.extend((child, matrix, depth) for child in reversed(list(element)))
+    return accumulator.bounds
+
+# Function to collect the SVG files to analyze
+def _collect_svg_files(paths: list) -> list:
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "**", "*.svg"), recursive=True)))
+        elif os.path.isfile(path):
+            files.append(path)
+    return files
+
+# Function to benchmark the analyzer on a corpus of SVGs
+def benchmark(paths: list, repeat: int = 20) -> dict:
+    """
+    Time compute_bounds and the canvas size chosen by the renderer on a corpus of SVGs
+    (e.g. the question_*.svg files saved in results/).
+
+    Args:
+        paths (list): SVG files and directories (searched recursively)
+        repeat (int): Timed passes over the corpus
+
+    Returns:
+        dict: Corpus size, parse errors, timings and canvas statistics
+    """
+    # Imported here because the renderer imports this module
+    from utils.svg_renderer import SVGRenderer
+    documents = []
+    parse_errors = 0
+    for svg_path in _collect_svg_files(paths):
+        with open(svg_path, "r", errors="replace") as file:
+            svg_code = file.read()
+        try:
+            documents.append((svg_path, svg_code, ET.fromstring(svg_code.strip())))
+        except ET.ParseError:
+            parse_errors += 1
+    if not documents:
+        return {"svgs": 0, "parse_errors": parse_errors}
+    # Time the analysis alone, on already parsed trees
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for _, _, root in documents:
+            compute_bounds(root)
+    analysis_seconds = (time.perf_counter() - start) / (repeat * len(documents))
+    # Time the whole canvas size calculation, including parsing
+    start = time.perf_counter()
+    canvases = []
+    for _ in range(repeat):
+        canvases = [(svg_path, SVGRenderer.calculate_svg_bounds(svg_code)) for svg_path, svg_code, _ in documents]
+    canvas_seconds = (time.perf_counter() - start) / (repeat * len(documents))
+    largest_path, (largest_width, largest_height) = max(canvases, key=lambda item: item[1][0] * item[1][1])
+    return {
+        "svgs": len(documents),
+        "parse_errors": parse_errors,
+        "bounds_microseconds": round(analysis_seconds * 1e6, 1),
+        "canvas_microseconds": round(canvas_seconds * 1e6, 1),
+        "mean_canvas_megapixels": round(sum(width * height for _, (width, height) in canvases) / len(canvases) / 1e6, 3),
+        "largest_canvas": {"path": largest_path, "width": largest_width, "height": largest_height}
+    }
+
+# Run the benchmark from the command line
+if __name__ == "__main__":
+    root_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+    parser = argparse.ArgumentParser(description='Benchmark the static SVG geometry analyzer on generated SVGs.')
+    parser.add_argument('paths', nargs='*', default=[os.path.join(root_dir, 'results'), os.path.join(root_dir, 'assets', 'parity')],
+                        help='SVG files or directories to analyze (default: results/ and assets/parity/)')
+    parser.add_argument('--repeat', type=int, default=20, help='Timed passes over the corpus (default: 20)')
+    parser.add_argument('--verbose', action='store_true', help='Print the bounds and canvas size of every SVG')
+    args = parser.parse_args()
+    if args.verbose:
+        from utils.svg_renderer import SVGRenderer
+        for svg_path in _collect_svg_files(args.paths):
+            with open(svg_path, "r", errors="replace") as file:
+                svg_code = file.read()
+            try:
+                bounds = compute_bounds(ET.fromstring(svg_code.strip()))
+            except ET.ParseError as e:
+                print(f"{svg_path}: parse error ({e})")
+                continue
+            print(f"{svg_path}: bounds={bounds} canvas={SVGRenderer.calculate_svg_bounds(svg_code)}")
+    report = benchmark(args.paths, repeat=args.repeat)
+    print(f"SVGs: {report['svgs']} ({report['parse_errors']} parse errors)")
+    if report["svgs"]:
+        print(f"Bounds analysis: {report['bounds_microseconds']}us per SVG")
+        print(f"Canvas size (parse + analysis): {report['canvas_microseconds']}us per SVG")
+        print(f"Mean canvas: {report['mean_canvas_megapixels']} megapixels")
+        largest = report["largest_canvas"]
+        print(f"Largest canvas: {largest['width']}x{largest['height']} ({largest['path']})")
@@ -0,0 +1,61 @@
+import re
+
+# Opening and closing svg tags (the opening tag may still be incomplete)
+SVG_TAG_PATTERN = re.compile(r"<svg\b|</svg\s*>")
+
+# Class to find where the first complete <svg> element ends in a streamed response
+class SVGStreamExtractor:
+
+    # Function to initialize the extractor
+    def __init__(self):
+        """
+        Incremental scanner for streamed model output. Call it with the text received
+        so far after every chunk; it only scans the new part of the text and returns
+        the end offset of the first complete top-level <svg> element once its closing
+        tag has arrived, or None until then.
+        """
+        self.reset()
+
+    # Function to start over (e.g. when a request is retried from scratch)
+    def reset(self):
+        self._scanned = 0
+        self._depth = 0
+        self._started = False
+        self.end = None
+
+    # Function to scan the text received so far
+    def __call__(self, text: str):
+        if self.end is not None:
+            return self.end
+        # A shorter text means the stream was restarted
+        if len(text) < self._scanned:
+            self.reset()
+        # Rescan from the end of the last complete tag, so a tag split across chunks is found once whole
+        position = self._scanned
+        while True:
+            match = SVG_TAG_PATTERN.search(text, position)
+            if match is None:
+                break
+            if match.group().startswith("</"):
+                position = self._scanned = match.end()
+                if not self._started:
+                    continue
+                self._depth -= 1
+                if self._depth == 0:
+                    self.end = match.end()
+                    return self.end
+                continue
+            # Wait for the rest of an opening tag before deciding whether it is self-closing
+            tag_end = text.find(">", match.end())
+            if tag_end == -1:
+                self._scanned = match.start()
+                return None
+            position = self._scanned = tag_end + 1
+            # A self-closing <svg/> does not change the nesting (and at the top level is more likely prose than an answer)
+            if text[tag_end - 1] == "/":
+                continue
+            self._started = True
+            self._depth += 1
+        # Keep a possibly partial tag at the end of the text for the next scan
+        self._scanned = max(self._scanned, len(text) - len("</svg >") + 1)
+        return None
@@ -0,0 +1,153 @@
+import os
+import re
+import sys
+import xml.etree.ElementTree as ET
+
+# Import the SVGDocument class
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from utils.svg_document import SVGDocument
+
+# Namespaces, registered so sanitized documents serialize without ns0: prefixes
+SVG_NAMESPACE = "http://www.w3.org/2000/svg"
+XLINK_NAMESPACE = "http://www.w3.org/1999/xlink"
+ET.register_namespace("", SVG_NAMESPACE)
+ET.register_namespace("xlink", XLINK_NAMESPACE)
+
+# Elements that run code or load external content
+UNSAFE_TAGS = {"script", "iframe", "object", "embed", "link", "meta", "audio", "video"}
+
+# References to anything outside the document (url(#id) is kept)
+_EXTERNAL_URL_RE = re.compile(r"url\(\s*(?![\s'\"]*#)[^)]*\)", re.IGNORECASE)
+_IMPORT_RE = re.compile(r"@import[^;]*;?", re.IGNORECASE)
+
+# Error raised for an SVG that is not worth rendering
+class SVGValidationError(ValueError):
+
+    # Function to initialize the error
+    def __init__(self, reason: str, message: str):
+        super().__init__(f"{reason}: {message}")
+        self.reason = reason
+
+# Function to get the local name of an element or attribute (without its namespace)
+def _local_name(name) -> str:
+    if not isinstance(name, str):
+        # Comments and processing instructions
+        return ""
+    return name.rsplit("}", 1)[-1]
+
+# Class to check generated SVGs against limits and strip unsafe content before rendering
+class SVGValidator:
+
+    # Function to initialize the validator
+    def __init__(
+            self,
+            max_bytes: int = 1024 * 1024,
+            max_elements: int = 10000,
+            max_canvas_edge: int = 4096,
+            max_canvas_pixels: int = 4096 * 4096,
+            clamp_canvas: bool = True
+    ):
+        """
+        Validation run on every extracted SVG before it is rendered. Documents that are
+        empty, malformed, not SVG, too large or too complex are rejected with a reason;
+        scripts, event handlers and external references are stripped; canvases larger
+        than the limits are scaled down (or rejected if clamp_canvas is False).
+
+        Args:
+            max_bytes (int): Largest accepted SVG code, in bytes
+            max_elements (int): Most elements accepted in one document
+            max_canvas_edge (int): Longest accepted canvas edge, in pixels
+            max_canvas_pixels (int): Largest accepted canvas area, in pixels
+            clamp_canvas (bool): Scale oversized canvases down instead of rejecting them
+        """
+        self.max_bytes = max_bytes
+        self.max_elements = max_elements
+        self.max_canvas_edge = max_canvas_edge
+        self.max_canvas_pixels = max_canvas_pixels
+        self.clamp_canvas = clamp_canvas
+
+    # Function to validate and sanitize a document
+    def validate(self, document: SVGDocument) -> tuple:
+        """
+        Check a document against the limits and sanitize it.
+
+        Args:
+            document (SVGDocument): The extracted SVG
+
+        Returns:
+            tuple: (document, changes), where document is the sanitized document (the same
+                object if nothing changed) and changes counts what was stripped or clamped
+
+        Raises:
+            SVGValidationError: If the document should not be rendered
+        """
+        if not document.code:
+            raise SVGValidationError("empty", "the SVG code is empty")
+        size = len(document.code.encode("utf-8"))
+        if size > self.max_bytes:
+            raise SVGValidationError("too_large", f"{size} bytes (limit {self.max_bytes})")
+        root = document.root
+        if root is None:
+            raise SVGValidationError("malformed_xml", document.parse_error or "the SVG code could not be parsed")
+        if _local_name(root.tag) != "svg":
+            raise SVGValidationError("not_svg", f"the root element is <{_local_name(root.tag)}>")
+        elements = sum(1 for _ in root.iter())
+        if elements > self.max_elements:
+            raise SVGValidationError("too_many_elements", f"{elements} elements (limit {self.max_elements})")
+        changes = self._sanitize(root)
+        if changes or document.recovered:
+            # Serialize the sanitized (or repaired) tree, so the render gets well-formed XML, keeping it parsed
+            document = SVGDocument.from_tree(root)
+        width, height = document.canvas_size
+        if width <= 0 or height <= 0:
+            raise SVGValidationError("empty_canvas", f"the canvas is {width}x{height}")
+        scale = min(1.0, self.max_canvas_edge / max(width, height), (self.max_canvas_pixels / (width * height)) ** 0.5)
+        if scale < 1.0:
+            if not self.clamp_canvas:
+                raise SVGValidationError(
+                    "canvas_too_large",
+                    f"{width}x{height} (limit {self.max_canvas_edge}px per edge, {self.max_canvas_pixels} pixels)"
+                )
+            document.canvas_size = (max(1, int(width * scale)), max(1, int(height * scale)))
+            changes["clamped_canvas"] = 1
+        return document, changes
+
+    # Function to strip scripts, event handlers and external references from a tree in place
+    @staticmethod
+    def _sanitize(root) -> dict:
+        changes = {}
+
+        # Function to count one change
+        def count(kind: str):
+            changes[kind] = changes.get(kind, 0) + 1
+
+        for parent in list(root.iter()):
+            for child in list(parent):
+                if _local_name(child.tag) in UNSAFE_TAGS:
+                    parent.remove(child)
+                    count("scripts" if _local_name(child.tag) == "script" else "unsafe_elements")
+        for element in root.iter():
+            for name, value in list(element.attrib.items()):
+                local = _local_name(name)
+                if local.lower().startswith("on"):
+                    del element.attrib[name]
+                    count("event_handlers")
+                elif local == "href":
+                    # Keep references within the document and embedded images
+                    stripped = value.strip()
+                    if not (stripped.startswith("#") or stripped.lower().startswith("data:image/")):
+                        del element.attrib[name]
+                        count("external_references")
+                elif "javascript:" in value.lower():
+                    del element.attrib[name]
+                    count("external_references")
+                elif "url(" in value.lower() and _EXTERNAL_URL_RE.search(value):
+                    element.attrib[name] = _EXTERNAL_URL_RE.sub("none", value)
+                    count("external_references")
+            # Style sheets can import or reference external resources too
+            if _local_name(element.tag) == "style" and element.text:
+                text = _IMPORT_RE.sub("", _EXTERNAL_URL_RE.sub("none", element.text))
+                if text != element.text:
+                    element.text = text
+                    count("external_references")
+        return changes
@@ -0,0 +1,122 @@
+import argparse
+import io
+import os
+import sys
+
+# Import the packed artifact store
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from utils.artifact_store import ArtifactStore
+
+# Suffix of thumbnail files, written next to each question_<id>.png
+THUMBNAIL_SUFFIX = ".thumb.webp"
+
+# Function to make a small WebP thumbnail of a rendered image
+def make_thumbnail(png_bytes: bytes, max_edge: int = 240, quality: int = 80) -> bytes:
+    """
+    Downscale a render to at most max_edge pixels on its longest edge, flattened onto
+    white, and encode it as WebP.
+
+    Args:
+        png_bytes (bytes): The rendered image
+        max_edge (int): Longest edge of the thumbnail in pixels
+        quality (int): WebP quality (1-100)
+
+    Returns:
+        bytes: The thumbnail
+
+    Raises:
+        ImportError: If Pillow is not installed
+        OSError: If the image cannot be read
+    """
+    from PIL import Image
+    image = Image.open(io.BytesIO(png_bytes))
+    image.load()
+    image = image.convert("RGBA")
+    background = Image.new("RGB", image.size, "white")
+    background.paste(image, mask=image.getchannel("A"))
+    background.thumbnail((max_edge, max_edge), Image.LANCZOS)
+    output = io.BytesIO()
+    background.save(output, "WEBP", quality=quality)
+    return output.getvalue()
+
+# Function to create the missing or outdated thumbnails of a results directory
+def generate_thumbnails(results_dir: str, max_edge: int = 240, quality: int = 80) -> int:
+    """
+    Write a thumbnail next to every question_*.png in a model's results directory for
+    the web UI's question grid. A thumbnail newer than its render is kept, so running
+    this after every benchmark run only encodes the new renders. Renders in the packed
+    store get their thumbnails in the store.
+
+    Args:
+        results_dir (str): A results/<model> directory
+        max_edge (int): Longest edge of the thumbnails in pixels
+        quality (int): WebP quality (1-100)
+
+    Returns:
+        int: Number of thumbnails written
+    """
+    written = 0
+    for name in sorted(os.listdir(results_dir)):
+        if not (name.startswith("question_") and name.endswith(".png")):
+            continue
+        png_path = os.path.join(results_dir, name)
+        thumbnail_path = png_path[:-len(".png")] + THUMBNAIL_SUFFIX
+        if os.path.exists(thumbnail_path) and os.path.getmtime(thumbnail_path) >= os.path.getmtime(png_path):
+            continue
+        with open(png_path, "rb") as file:
+            png_bytes = file.read()
+        try:
+            thumbnail = make_thumbnail(png_bytes, max_edge=max_edge, quality=quality)
+        except OSError as e:
+            print(f"Warning: Could not create a thumbnail of {png_path} ({e})")
+            continue
+        # Write to a temporary file first so the web UI never reads a partial thumbnail
+        temp_path = f"{thumbnail_path}.tmp"
+        with open(temp_path, "wb") as file:
+            file.write(thumbnail)
+        os.replace(temp_path, thumbnail_path)
+        written += 1
+    store = ArtifactStore.open_existing(results_dir)
+    if store is not None:
+        mtimes = dict(store.list())
+        for name, mtime in mtimes.items():
+            if not (name.startswith("question_") and name.endswith(".png")):
+                continue
+            thumbnail_name = name[:-len(".png")] + THUMBNAIL_SUFFIX
+            if mtimes.get(thumbnail_name, -1) >= mtime:
+                continue
+            try:
+                store.put(thumbnail_name, make_thumbnail(store.get(name), max_edge=max_edge, quality=quality))
+            except OSError as e:
+                print(f"Warning: Could not create a thumbnail of {name} in {store.path} ({e})")
+                continue
+            written += 1
+        store.close()
+    return written
+
+# Function to create thumbnails for several results directories, warning once if Pillow is missing
+def generate_all_thumbnails(results_dirs: list, max_edge: int = 240, quality: int = 80) -> int:
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        print("Warning: Pillow is not installed (pip install Pillow); the web UI will show full-size renders as previews.")
+        return 0
+    written = 0
+    for results_dir in results_dirs:
+        if os.path.isdir(results_dir):
+            written += generate_thumbnails(results_dir, max_edge=max_edge, quality=quality)
+    return written
+
+# Create thumbnails for existing results from the command line
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Create web UI thumbnails for the renders in a results directory.')
+    parser.add_argument('--results-dir', default='results', help='Directory holding the results/<model> directories (default: results)')
+    parser.add_argument('--max-edge', type=int, default=240, help='Longest thumbnail edge in pixels (default: 240)')
+    parser.add_argument('--quality', type=int, default=80, help='WebP quality (default: 80)')
+    args = parser.parse_args()
+    model_dirs = [
+        os.path.join(args.results_dir, name) for name in sorted(os.listdir(args.results_dir))
+        if name != "webUI"
+    ]
+    count = generate_all_thumbnails(model_dirs, max_edge=args.max_edge, quality=args.quality)
+    print(f"Created {count} thumbnails")